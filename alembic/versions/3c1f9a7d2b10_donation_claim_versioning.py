@@ -0,0 +1,39 @@
+"""donation claim versioning
+
+Revision ID: 3c1f9a7d2b10
+Revises: dbb5378a4ffe
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f9a7d2b10'
+down_revision: Union[str, Sequence[str], None] = 'dbb5378a4ffe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('donation') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('claimed_by', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+        batch_op.add_column(sa.Column('ngo_contact', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+        batch_op.add_column(sa.Column('claimed_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_donation_status'), ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('donation') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_donation_status'))
+        batch_op.drop_column('claimed_at')
+        batch_op.drop_column('ngo_contact')
+        batch_op.drop_column('claimed_by')
+        batch_op.drop_column('version')
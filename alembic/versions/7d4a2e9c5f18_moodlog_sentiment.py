@@ -0,0 +1,35 @@
+"""moodlog sentiment
+
+Revision ID: 7d4a2e9c5f18
+Revises: 5a7e0f3b9c21
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d4a2e9c5f18'
+down_revision: Union[str, Sequence[str], None] = '5a7e0f3b9c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('moodlog') as batch_op:
+        batch_op.add_column(sa.Column('sentiment', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+        batch_op.add_column(sa.Column('sentiment_score', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('sentiment_model', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('moodlog') as batch_op:
+        batch_op.drop_column('sentiment_model')
+        batch_op.drop_column('sentiment_score')
+        batch_op.drop_column('sentiment')
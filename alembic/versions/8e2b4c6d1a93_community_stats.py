@@ -0,0 +1,45 @@
+"""community stats
+
+Revision ID: 8e2b4c6d1a93
+Revises: 3c1f9a7d2b10
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2b4c6d1a93'
+down_revision: Union[str, Sequence[str], None] = '3c1f9a7d2b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('community_stats',
+    sa.Column('community_id', sa.Integer(), nullable=False),
+    sa.Column('need_level', sa.Integer(), nullable=False),
+    sa.Column('donations_received', sa.Integer(), nullable=False),
+    sa.Column('quantity_received', sa.Integer(), nullable=False),
+    sa.Column('delivered_quantity', sa.Integer(), nullable=False),
+    sa.Column('open_count', sa.Integer(), nullable=False),
+    sa.Column('claimed_count', sa.Integer(), nullable=False),
+    sa.Column('delivered_count', sa.Integer(), nullable=False),
+    sa.Column('severity', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('community_id')
+    )
+    with op.batch_alter_table('donation') as batch_op:
+        batch_op.create_index(batch_op.f('ix_donation_community_id'), ['community_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('donation') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_donation_community_id'))
+    op.drop_table('community_stats')
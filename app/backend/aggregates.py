@@ -0,0 +1,164 @@
+# app/backend/aggregates.py
+"""Materialised per-community donation aggregates.
+
+`community_stats` holds one row per community with donation counts by status,
+quantities and a severity score. Writes keep it current incrementally (same
+transaction as the donation change); `refresh_community_stats` rebuilds it
+from scratch with one GROUP BY when needed.
+"""
+import os
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import case, delete, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from app.backend import models
+
+# One unit of need (e.g. one food parcel) per this many residents
+PEOPLE_PER_NEED_UNIT = int(os.getenv("PEOPLE_PER_NEED_UNIT", "100"))
+
+
+# ---------- Helpers ----------
+# Status -> open/claimed/delivered. The incremental updates use status_bucket and
+# the rebuilds use status_bucket_expr, so the two must classify identically:
+# "delivered", anything starting with "claimed", and everything else is open.
+def status_bucket(status: Optional[str]) -> str:
+    s = (status or models.DonationStatus.PENDING.value).lower()
+    if s == models.DonationStatus.DELIVERED.value:
+        return "delivered"
+    if s.startswith(models.DonationStatus.CLAIMED.value):
+        return "claimed"
+    return "open"
+
+def status_bucket_expr(col):
+    """`status_bucket` as a SQL expression over a status column."""
+    s = func.lower(func.coalesce(col, models.DonationStatus.PENDING.value))
+    return case((s == models.DonationStatus.DELIVERED.value, "delivered"),
+                (s.like(f"{models.DonationStatus.CLAIMED.value}%"), "claimed"), else_="open")
+
+def _need_level(population):
+    return func.coalesce(population, 0) / PEOPLE_PER_NEED_UNIT
+
+def _severity(need, delivered):
+    """Unmet share of need in [0, 1], as a SQL expression (portable across SQLite/Postgres)."""
+    return case((need > delivered, (need - delivered) * 1.0 / need), else_=0.0)
+
+
+# ---------- Full refresh ----------
+def refresh_community_stats(session: Session) -> int:
+    """Rebuild community_stats with a single aggregate query; returns rows written."""
+    C, D, S = models.Community, models.Donation, models.CommunityStats
+    qty = func.coalesce(D.quantity, 0)
+    bucket = status_bucket_expr(D.status)
+    agg = (
+        select(
+            D.community_id.label("community_id"),
+            func.count().label("donations_received"),
+            func.sum(qty).label("quantity_received"),
+            func.sum(case((bucket == "delivered", qty), else_=0)).label("delivered_quantity"),
+            func.sum(case((bucket == "open", 1), else_=0)).label("open_count"),
+            func.sum(case((bucket == "claimed", 1), else_=0)).label("claimed_count"),
+            func.sum(case((bucket == "delivered", 1), else_=0)).label("delivered_count"),
+        )
+        .where(D.community_id.isnot(None))
+        .group_by(D.community_id)
+        .subquery()
+    )
+    need = _need_level(C.population)
+    delivered_qty = func.coalesce(agg.c.delivered_quantity, 0)
+    rows = select(
+        C.id,
+        need,
+        func.coalesce(agg.c.donations_received, 0),
+        func.coalesce(agg.c.quantity_received, 0),
+        delivered_qty,
+        func.coalesce(agg.c.open_count, 0),
+        func.coalesce(agg.c.claimed_count, 0),
+        func.coalesce(agg.c.delivered_count, 0),
+        _severity(need, delivered_qty),
+        literal(datetime.utcnow()),
+    ).select_from(C).outerjoin(agg, agg.c.community_id == C.id)
+
+    session.execute(delete(S))
+    result = session.execute(insert(S).from_select(
+        ["community_id", "need_level", "donations_received", "quantity_received", "delivered_quantity",
+         "open_count", "claimed_count", "delivered_count", "severity", "updated_at"],
+        rows,
+    ))
+    session.commit()
+    return result.rowcount
+
+def seed_community_stats(session: Session) -> int:
+    """Build community_stats once if it is empty but communities exist (first start after upgrading)."""
+    if session.execute(select(models.CommunityStats.community_id).limit(1)).first() is not None:
+        return 0
+    if session.execute(select(models.Community.id).limit(1)).first() is None:
+        return 0
+    try:
+        return refresh_community_stats(session)
+    except IntegrityError:
+        session.rollback()  # another worker seeded it at the same time
+        return 0
+
+
+# ---------- Incremental updates (caller commits) ----------
+def bump_community_stats(session: Session, community_id: Optional[int], *, received: int = 0, quantity: int = 0,
+                         delivered_quantity: int = 0, open: int = 0, claimed: int = 0, delivered: int = 0) -> None:
+    """Apply count/quantity deltas to one community's row in a single UPDATE."""
+    if community_id is None:
+        return
+    S = models.CommunityStats
+    values = dict(
+        donations_received=S.donations_received + received,
+        quantity_received=S.quantity_received + quantity,
+        delivered_quantity=S.delivered_quantity + delivered_quantity,
+        open_count=S.open_count + open,
+        claimed_count=S.claimed_count + claimed,
+        delivered_count=S.delivered_count + delivered,
+        severity=_severity(S.need_level, S.delivered_quantity + delivered_quantity),
+        updated_at=datetime.utcnow(),
+    )
+    res = session.execute(update(S).where(S.community_id == community_id).values(**values))
+    if res.rowcount:
+        return
+    # No row yet (community predates the table): seed it, then apply the deltas
+    if _seed_row(session, community_id):
+        session.execute(update(S).where(S.community_id == community_id).values(**values))
+
+def _seed_row(session: Session, community_id: int) -> bool:
+    community = session.get(models.Community, community_id)
+    if community is None:
+        return False
+    need_level = (community.population or 0) // PEOPLE_PER_NEED_UNIT
+    try:
+        with session.begin_nested():
+            session.add(models.CommunityStats(
+                community_id=community_id,
+                need_level=need_level,
+                severity=1.0 if need_level > 0 else 0.0,
+            ))
+    except IntegrityError:
+        pass  # another writer seeded it first
+    return True
+
+def community_created(session: Session, community: models.Community) -> None:
+    _seed_row(session, community.id)
+
+def donation_created(session: Session, donation: models.Donation) -> None:
+    qty = donation.quantity or 0
+    bucket = status_bucket(donation.status)
+    bump_community_stats(session, donation.community_id, received=1, quantity=qty,
+                         delivered_quantity=qty if bucket == "delivered" else 0, **{bucket: 1})
+
+def donation_status_changed(session: Session, community_id: Optional[int], quantity: Optional[int],
+                            old_status: Optional[str], new_status: Optional[str]) -> None:
+    old, new = status_bucket(old_status), status_bucket(new_status)
+    if old == new:
+        return
+    qty = quantity or 0
+    deltas = {old: -1}
+    deltas[new] = deltas.get(new, 0) + 1
+    delivered_qty = qty if new == "delivered" else (-qty if old == "delivered" else 0)
+    bump_community_stats(session, community_id, delivered_quantity=delivered_qty, **deltas)
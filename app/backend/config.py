@@ -28,5 +28,29 @@ MERGED_SEVERITY_GEOJSON = DATA_PROC / "pak_severity_map.geojson"   # from OCHA_5
 IPC_SEVERITY_GEOJSON    = DATA_PROC / "ipc_severity_map.geojson"
 OCHA_5W_ADMIN_COUNTS    = DATA_PROC / "ocha_5w_admin_counts.csv"
 
+# Offline geocoding (admin centroids + WFP markets) and its persistent cache
+PAK_GAZETTEER_CSV = DATA_PROC / "pak_gazetteer.csv"
+GEOCODE_CACHE_DB  = DATA_PROC / "geocode_cache.sqlite"
+
+# Background jobs (persistent queue) and precomputed forecasts
+JOBS_DB       = DATA_PROC / "jobs.sqlite"
+FORECASTS_DIR = DATA_PROC / "forecasts"
+
+# Uploaded images (content-addressed) with thumbnails and model inputs
+IMAGES_DIR = DATA_PROC / "images"
+
+# Collapsed-stack profiles of slow requests (PROFILE_SLOW_MS)
+PROFILES_DIR = PROJECT_DIR / "profiles"
+
+# Donor–NGO workflow store (app/backend/donor-ngo-workflow.py)
+WORKFLOW_DB = PROJECT_DIR / "app" / "backend" / "donations.db"
+
 # Models
 IMGNET_LABELS_JSON = MODELS_DIR / "imagenet_labels.json"
+
+# Pinned sentiment model; stored labels carry SENTIMENT_MODEL_TAG so rows scored
+# by an older revision can be found and re-labelled (app.backend.rescoring)
+SENTIMENT_MODEL_NAME     = "distilbert/distilbert-base-uncased-finetuned-sst-2-english"
+SENTIMENT_MODEL_REVISION = "714eb0f"  # stable revision hash from Hugging Face
+SENTIMENT_MODEL_TAG      = f"{SENTIMENT_MODEL_NAME}@{SENTIMENT_MODEL_REVISION}"
+SENTIMENT_RESCORE_STATE  = DATA_PROC / "sentiment_rescore.json"   # checkpoints
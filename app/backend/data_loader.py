@@ -13,6 +13,7 @@ from .config import (
     MERGED_SEVERITY_GEOJSON,
     IPC_SEVERITY_GEOJSON,
     OCHA_5W_ADMIN_COUNTS,
+    PAK_GAZETTEER_CSV,
 )
 
 # ---------- Helpers ----------
@@ -114,9 +115,56 @@ def load_wfp_prices(path: Optional[Path] = None) -> pd.DataFrame:
     out["date"] = pd.to_datetime(out["date"], errors="coerce")
     return out.dropna(subset=["date","price"]).sort_values("date")
 
+# ---------- Gazetteer (offline geocoding) ----------
+GAZETTEER_COLUMNS = ["name", "alt_names", "level", "pcode", "parent", "lat", "lon"]
+
+def _admin_places(gdf: gpd.GeoDataFrame, level: int, parent_col: str) -> pd.DataFrame:
+    """One row per admin unit with its point location (polygon centroid or point geometry)."""
+    pts = gdf.geometry if level == 3 else gdf.geometry.centroid
+    alt_cols = [c for c in [f"adm{level}alt1en", f"adm{level}alt2en"] if c in gdf.columns]
+    alts = gdf[alt_cols].fillna("").astype(str).agg(lambda r: "|".join(a for a in r if a), axis=1) \
+        if alt_cols else ""
+    return pd.DataFrame({
+        "name": gdf[f"adm{level}_en"],
+        "alt_names": alts,
+        "level": f"adm{level}",
+        "pcode": gdf[f"adm{level}_pcode"].astype(str).str.upper(),
+        "parent": gdf[parent_col],
+        "lat": pts.y.round(5),
+        "lon": pts.x.round(5),
+    })
+
+def build_and_export_gazetteer(out_path: Optional[Path] = None) -> Path:
+    """Place-name table for offline geocoding: province/district centroids, tehsil points, WFP markets."""
+    base = Path(PAK_ADMIN_BOUNDARIES)
+    frames = []
+    for level, parent_col in [(1, "adm0_en"), (2, "adm1_en")]:
+        shp = next(iter(base.glob(f"*adm{level}*.shp")), None)
+        if shp is not None:
+            frames.append(_admin_places(_lower_cols(gpd.read_file(shp)), level, parent_col))
+    # Tehsils (ADM3) ship as label points rather than polygons
+    pts = next(iter(base.glob("*admbndp*.shp")), None)
+    if pts is not None:
+        frames.append(_admin_places(_lower_cols(gpd.read_file(pts)), 3, "adm2_en"))
+
+    wfp = _lower_cols(pd.read_csv(WFP_FOOD_PRICES))
+    wfp = wfp[~wfp["market"].astype(str).str.startswith("#")].drop_duplicates("market")
+    frames.append(pd.DataFrame({
+        "name": wfp["market"], "alt_names": "", "level": "market", "pcode": "",
+        "parent": wfp["admin2"], "lat": wfp["latitude"].astype(float), "lon": wfp["longitude"].astype(float),
+    }))
+
+    out_path = Path(out_path or PAK_GAZETTEER_CSV)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    pd.concat(frames, ignore_index=True)[GAZETTEER_COLUMNS].to_csv(out_path, index=False)
+    from .geocoding import reset_gazetteer
+    reset_gazetteer()  # other processes pick up the new version (and drop stale cache rows) on restart
+    return out_path
+
 # ---------- Build All ----------
 def build_all_core_processed():
     paths = {}
     paths["ocha_fsc_geojson"] = build_and_export_severity_geojson()
     paths["ipc_geojson"]      = build_and_export_ipc_geojson()
+    paths["gazetteer_csv"]    = build_and_export_gazetteer()
     return paths
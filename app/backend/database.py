@@ -3,7 +3,9 @@ import os
 from pathlib import Path
 from typing import Generator
 from dotenv import load_dotenv
+from sqlalchemy import event
 from sqlmodel import SQLModel, create_engine, Session
+from app.backend.metrics import install_sql_hooks
 
 # Load .env (if present)
 load_dotenv()
@@ -20,6 +22,15 @@ if DATABASE_URL.startswith("sqlite"):
 # Sqlite requires connect_args; Postgres does not
 connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 engine = create_engine(DATABASE_URL, echo=False, connect_args=connect_args)
+install_sql_hooks(engine)  # query counts/latency for /metrics and Server-Timing
+
+if DATABASE_URL.startswith("sqlite"):
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_conn, _):
+        # WAL lets readers run alongside the writer; busy_timeout queues contending writers
+        dbapi_conn.execute("PRAGMA journal_mode=WAL")
+        dbapi_conn.execute("PRAGMA synchronous=NORMAL")
+        dbapi_conn.execute("PRAGMA busy_timeout=10000")
 
 def init_db() -> None:
     """Create tables from SQLModel models (call on startup)."""
@@ -0,0 +1,65 @@
+# app/backend/dependencies.py
+"""FastAPI dependencies for authenticating callers and checking roles.
+
+Tokens are verified in-process (no DB). Role checks read the user's current
+role through a short TTL cache, so demoting a user takes effect within
+ROLE_CACHE_TTL_SECONDS without a query on every request.
+"""
+import os
+from typing import Optional
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlmodel import Session
+
+from app.backend import models
+from app.backend.cache import TTLCache
+from app.backend.database import engine
+from app.backend.security import InvalidToken, decode_access_token
+
+ROLE_CACHE_TTL_SECONDS = float(os.getenv("ROLE_CACHE_TTL_SECONDS", "60"))
+
+_bearer = HTTPBearer(auto_error=False)
+_role_cache = TTLCache(ttl=ROLE_CACHE_TTL_SECONDS, maxsize=10000)
+
+
+def get_current_principal(
+    creds: Optional[HTTPAuthorizationCredentials] = Depends(_bearer),
+) -> models.Principal:
+    if creds is None:
+        raise HTTPException(status_code=401, detail="Not authenticated",
+                            headers={"WWW-Authenticate": "Bearer"})
+    try:
+        claims = decode_access_token(creds.credentials)
+    except InvalidToken as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+    return models.Principal(id=int(claims["sub"]), email=claims.get("email", ""), role=claims.get("role") or "donor")
+
+
+def _current_role(user_id: int) -> Optional[str]:
+    def load():
+        with Session(engine) as session:
+            user = session.get(models.User, user_id)
+            return user.role if user else None
+    return _role_cache.get_or_set(user_id, load)
+
+
+def invalidate_role(user_id: Optional[int] = None) -> None:
+    """Drop cached role records (call after changing a user's role)."""
+    _role_cache.invalidate(user_id)
+
+
+def require_role(*roles: str):
+    """Dependency factory: caller must hold one of `roles` (admins always pass)."""
+    allowed = set(roles) | {"admin"}
+
+    def checker(principal: models.Principal = Depends(get_current_principal)) -> models.Principal:
+        role = _current_role(principal.id)
+        if role is None:
+            raise HTTPException(status_code=401, detail="User no longer exists")
+        if role not in allowed:
+            raise HTTPException(status_code=403, detail="Insufficient role")
+        principal.role = role
+        return principal
+
+    return checker
@@ -1,37 +1,16 @@
 import os
-import sqlite3
-from datetime import datetime
-from app.backend.models.sentiment import analyze_sentiment
-from app.backend.models.image_tagging import tag_food_image
+from app.backend.config import WORKFLOW_DB
+from app.backend.inference import tag_food_image
+from app.backend.sentiment_engines import get_engine
+from app.backend.workflow.store import DonationStore
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "donations.db")
+DB_PATH = str(WORKFLOW_DB)
+_store = DonationStore(DB_PATH)
 
 
 def init_db():
-    """Initialize donations table if it doesn't exist."""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS donations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            donor_name TEXT,
-            donor_contact TEXT,
-            food_description TEXT,
-            quantity TEXT,
-            location TEXT,
-            image_path TEXT,
-            tags TEXT,
-            note TEXT,
-            mood TEXT,
-            status TEXT DEFAULT 'Open',
-            ngo_name TEXT,
-            ngo_contact TEXT,
-            claim_time TEXT,
-            delivered_time TEXT
-        )
-    """)
-    conn.commit()
-    conn.close()
+    """Initialize donations table (and status index) if it doesn't exist."""
+    _store.init_schema()
 
 
 def submit_donation(donor_name, donor_contact, food_description, quantity, location, note=None, image_path=None):
@@ -41,25 +20,22 @@ def submit_donation(donor_name, donor_contact, food_description, quantity, locat
 
     if image_path and os.path.exists(image_path):
         try:
-            tags = ", ".join(tag_food_image(image_path))
+            tags = ", ".join(label for label, _ in tag_food_image(image_path))
         except Exception as e:
             print(f"[WARN] Image tagging failed: {e}")
 
     if note:
         try:
-            mood = analyze_sentiment(note)
+            # The mood only selects a feedback message, so the cascade's lexicon pass usually decides it
+            mood = get_engine("cascade").analyze(note)["label"]
         except Exception as e:
             print(f"[WARN] Sentiment analysis failed: {e}")
 
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO donations (donor_name, donor_contact, food_description, quantity, location, image_path, tags, note, mood, status)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (donor_name, donor_contact, food_description, quantity, location, image_path, tags, note, mood, 'Open'))
-    conn.commit()
-    donation_id = c.lastrowid
-    conn.close()
+    donation_id = _store.insert({
+        "donor_name": donor_name, "donor_contact": donor_contact, "food_description": food_description,
+        "quantity": quantity, "location": location, "image_path": image_path,
+        "tags": tags, "note": note, "mood": mood, "status": "Open",
+    })
 
     return {
         "donation_id": donation_id,
@@ -69,55 +45,36 @@ def submit_donation(donor_name, donor_contact, food_description, quantity, locat
     }
 
 
+def submit_donations_batch(records):
+    """Insert many pre-processed donation records (dicts) in one transaction; returns their ids."""
+    return _store.insert_many(records)
+
+
 def list_donations(status="Open"):
     """List all donations by status."""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT * FROM donations WHERE status=?", (status,))
-    rows = c.fetchall()
-    conn.close()
-
-    cols = ["id", "donor_name", "donor_contact", "food_description", "quantity", "location",
-            "image_path", "tags", "note", "mood", "status", "ngo_name", "ngo_contact",
-            "claim_time", "delivered_time"]
-    return [dict(zip(cols, row)) for row in rows]
+    return _store.list_by_status(status)
 
 
 def claim_donation(donation_id, ngo_name, ngo_contact):
-    """NGO claims a donation."""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-        UPDATE donations SET status=?, ngo_name=?, ngo_contact=?, claim_time=? WHERE id=?
-    """, ('Claimed', ngo_name, ngo_contact, datetime.now().isoformat(), donation_id))
-    conn.commit()
-    conn.close()
+    """NGO claims a donation (only succeeds while it is still Open)."""
+    if not _store.claim(donation_id, ngo_name, ngo_contact):
+        return {"message": f"Donation #{donation_id} is not open for claiming."}
     return {"message": f"Donation #{donation_id} claimed by {ngo_name}."}
 
 
 def confirm_delivery(donation_id):
     """NGO confirms food delivered; trigger donor feedback."""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-        UPDATE donations SET status=?, delivered_time=? WHERE id=?
-    """, ('Delivered', datetime.now().isoformat(), donation_id))
-    conn.commit()
-    conn.close()
-
-    # Generate feedback message
-    feedback_msg = generate_feedback_message(donation_id)
-    return {"message": feedback_msg}
+    # Feedback is built from the row read inside the delivery transaction
+    row = _store.deliver(donation_id)
+    return {"message": _feedback_for(row)}
 
 
 def generate_feedback_message(donation_id):
     """Generate donor-facing feedback message based on mood and sentiment."""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT donor_name, mood FROM donations WHERE id=?", (donation_id,))
-    row = c.fetchone()
-    conn.close()
+    return _feedback_for(_store.donor_and_mood(donation_id))
 
+
+def _feedback_for(row):
     if not row:
         return "Donation not found."
 
@@ -128,7 +85,3 @@ def generate_feedback_message(donation_id):
         return f"{donor_name}, your generosity brings hope even in tough times 💪"
     else:
         return f"Donation completed successfully. You made a real difference today 🌍"
-
-
-# Initialize database on import
-init_db()
@@ -0,0 +1,128 @@
+# app/backend/events.py
+"""In-process pub/sub for donation status changes.
+
+Writers `publish()` after their transaction commits; the SSE endpoint and
+the poll endpoint read from here. Every event gets an id "<epoch>-<seq>":
+the epoch changes on each process start, so a client resuming with an id
+from before a restart (or one older than the replay buffer) is told to
+reload its snapshot instead of silently missing events.
+
+Only subscribers in the same process see an event. When running several
+workers, swap in a broker-backed bus with the same publish/replay/subscribe
+methods via `set_bus()` (e.g. Redis streams).
+"""
+import asyncio
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+EVENT_BUFFER_SIZE = int(os.getenv("EVENT_BUFFER_SIZE", "5000"))
+# Per-subscriber queue bound; a subscriber that falls this far behind is dropped
+EVENT_SUBSCRIBER_QUEUE = int(os.getenv("EVENT_SUBSCRIBER_QUEUE", "1000"))
+
+
+class EventBus:
+    def __init__(self, buffer_size: int = EVENT_BUFFER_SIZE):
+        self.epoch = secrets.token_hex(4)
+        self._seq = 0
+        self._buffer: "deque[dict]" = deque(maxlen=buffer_size)
+        self._subscribers: Dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+        self._lock = threading.Lock()
+
+    # ---------- Ids ----------
+    def last_id(self) -> str:
+        return f"{self.epoch}-{self._seq}"
+
+    def _parse(self, event_id: Optional[str]) -> Optional[int]:
+        """Sequence number for an id from this process, else None."""
+        if not event_id:
+            return None
+        epoch, _, seq = event_id.rpartition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    # ---------- Publish ----------
+    def publish(self, event_type: str, data: Dict[str, Any]) -> dict:
+        """Append an event and fan it out; safe to call from any thread."""
+        with self._lock:
+            self._seq += 1
+            event = {"id": f"{self.epoch}-{self._seq}", "seq": self._seq, "type": event_type,
+                     "ts": time.time(), "data": data}
+            self._buffer.append(event)
+            subscribers = list(self._subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:  # loop already closed
+                self.unsubscribe(queue)
+        return event
+
+    def _offer(self, queue: asyncio.Queue, event: dict) -> None:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too slow to keep up: close the stream; the client resumes from its last id
+            self._subscribers.pop(queue, None)
+            queue.get_nowait()
+            queue.put_nowait(None)
+
+    # ---------- Replay / subscribe ----------
+    def replay(self, after: Optional[str]) -> Tuple[List[dict], bool]:
+        """Events after `after`. Returns (events, reset); reset=True means the client must reload."""
+        seq = self._parse(after)
+        with self._lock:
+            if seq is None or seq > self._seq:
+                return [], True
+            oldest = self._buffer[0]["seq"] if self._buffer else self._seq + 1
+            if seq < oldest - 1:
+                return [], True
+            return [e for e in self._buffer if e["seq"] > seq], False
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a queue on the running event loop; events arrive as dicts, None means closed."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=EVENT_SUBSCRIBER_QUEUE)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def stats(self) -> dict:
+        return {"last_id": self.last_id(), "buffered": len(self._buffer), "subscribers": len(self._subscribers)}
+
+
+_bus: EventBus = EventBus()
+
+def get_bus() -> EventBus:
+    return _bus
+
+def set_bus(bus) -> None:
+    """Replace the process-wide bus (e.g. with a broker-backed implementation)."""
+    global _bus
+    _bus = bus
+
+
+# ---------- Donation events ----------
+def _donation_payload(donation) -> dict:
+    """Status fields from a Donation or a RETURNING row with the same columns."""
+    return {
+        "id": donation.id,
+        "status": donation.status,
+        "version": donation.version,
+        "community_id": donation.community_id,
+        "quantity": donation.quantity,
+        "claimed_by": donation.claimed_by,
+        "claimed_at": donation.claimed_at.isoformat() if donation.claimed_at else None,
+    }
+
+def donation_created(donation) -> None:
+    get_bus().publish("donation.created", donation.model_dump(mode="json"))
+
+def donation_changed(event_type: str, donation) -> None:
+    get_bus().publish(event_type, _donation_payload(donation))
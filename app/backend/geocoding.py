@@ -0,0 +1,300 @@
+# app/backend/geocoding.py
+"""Offline geocoding for Pakistan place names.
+
+Lookups are served from a local gazetteer (admin centroids + WFP markets,
+see data_loader.build_and_export_gazetteer) with trigram fuzzy matching, and
+results are kept in a SQLite cache shared by every process on the host.
+"""
+import csv
+import hashlib
+import io
+import os
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import PAK_GAZETTEER_CSV, GEOCODE_CACHE_DB
+
+LatLon = Tuple[float, float]
+
+# Network lookups (Nominatim) are opt-in; the gazetteer alone never leaves the host
+ALLOW_NETWORK = os.getenv("GEOCODE_ALLOW_NETWORK", "0") == "1"
+MIN_SIMILARITY = 0.45
+
+# More specific admin levels win when a name exists at several levels
+_LEVEL_RANK = {"market": 0, "adm3": 1, "adm2": 2, "adm1": 3}
+_COORD_RE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*[, ]\s*(-?\d+(?:\.\d+)?)\s*$")
+# Words that never name a place on their own ("Model Town Road, Lahore")
+_STOP_WORDS = {
+    "the", "of", "and", "near", "opp", "opposite", "behind", "road", "rd", "street", "st", "chowk",
+    "bazaar", "bazar", "market", "mandi", "colony", "town", "city", "block", "sector", "phase", "main",
+    "new", "old", "north", "south", "east", "west", "upper", "lower", "district", "tehsil", "village",
+    "mohalla", "house", "no", "model", "garden", "pakistan",
+}
+
+
+# ---------- Helpers ----------
+def _normalize(text: str) -> str:
+    text = re.sub(r"[^a-z0-9 ]+", " ", str(text).lower())
+    return " ".join(text.split())
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _parse_coords(text: str) -> Optional[LatLon]:
+    m = _COORD_RE.match(text or "")
+    if not m:
+        return None
+    lat, lon = float(m.group(1)), float(m.group(2))
+    if -90 <= lat <= 90 and -180 <= lon <= 180:
+        return (lat, lon)
+    return None
+
+
+# ---------- Gazetteer ----------
+class Gazetteer:
+    """In-memory place-name index with exact and trigram (Jaccard) lookup."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or PAK_GAZETTEER_CSV)
+        self.places: List[dict] = []
+        self._exact: Dict[str, int] = {}
+        self._grams: Dict[str, List[int]] = defaultdict(list)
+        self._keys: List[Tuple[str, set, int]] = []
+        self._ambiguous: set = set()   # names shared by different places at the same level
+        self.version = "none"          # content hash; cached results are only valid for one version
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        data = self.path.read_bytes()
+        self.version = hashlib.sha1(data).hexdigest()[:16]
+        places_by_name: Dict[Tuple[str, str], set] = defaultdict(set)
+        for row in csv.DictReader(io.StringIO(data.decode("utf-8"), newline="")):
+            try:
+                row["lat"], row["lon"] = float(row["lat"]), float(row["lon"])
+            except (TypeError, ValueError):
+                continue
+            idx = len(self.places)
+            self.places.append(row)
+            identity = row.get("pcode") or f"{row.get('parent')}|{row['lat']}|{row['lon']}"
+            names = [row["name"]] + [a for a in (row.get("alt_names") or "").split("|") if a]
+            for name in names:
+                key = _normalize(name)
+                self._add_key(key, idx)
+                places_by_name[(key, row["level"])].add(identity)
+        self._ambiguous = {key for (key, _), ids in places_by_name.items() if len(ids) > 1}
+
+    def _add_key(self, key: str, idx: int) -> None:
+        if not key:
+            return
+        current = self._exact.get(key)
+        if current is None or self._rank(idx) < self._rank(current):
+            self._exact[key] = idx
+        k = len(self._keys)
+        grams = _trigrams(key)
+        self._keys.append((key, grams, idx))
+        for g in grams:
+            self._grams[g].append(k)
+
+    def _rank(self, idx: int) -> int:
+        return _LEVEL_RANK.get(self.places[idx]["level"], 9)
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def match(self, text: str) -> Optional[dict]:
+        """Best gazetteer entry for a free-text location, or None."""
+        key = _normalize(text)
+        if not key:
+            return None
+        if key in self._exact:
+            return self.places[self._exact[key]]
+
+        # "Gulberg, Lahore": try each part, most specific first
+        for part in (_normalize(p) for p in re.split(r"[,/;]", text)):
+            if part and part in self._exact:
+                return self.places[self._exact[part]]
+        # "Model Town Lahore Punjab": single words, skipping generic and ambiguous ones
+        for word in key.split():
+            if len(word) > 2 and word not in _STOP_WORDS and word not in self._ambiguous and word in self._exact:
+                return self.places[self._exact[word]]
+
+        return self._fuzzy(key)
+
+    def _fuzzy(self, key: str) -> Optional[dict]:
+        grams = _trigrams(key)
+        overlap: Dict[int, int] = defaultdict(int)
+        for g in grams:
+            for k in self._grams.get(g, ()):
+                overlap[k] += 1
+        best, best_score = None, MIN_SIMILARITY
+        for k, shared in overlap.items():
+            _, kgrams, idx = self._keys[k]
+            score = shared / (len(grams) + len(kgrams) - shared)
+            if score > best_score or (score == best_score and best is not None and self._rank(idx) < self._rank(best)):
+                best, best_score = idx, score
+        return self.places[best] if best is not None else None
+
+
+# ---------- Persistent cache ----------
+class GeocodeCache:
+    """SQLite-backed cache shared across processes (WAL lets readers and writers overlap)."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or GEOCODE_CACHE_DB)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS geocode_cache (
+                    query TEXT PRIMARY KEY,
+                    lat REAL,
+                    lon REAL,
+                    source TEXT,
+                    created_at TEXT
+                )
+            """)
+            conn.execute("CREATE TABLE IF NOT EXISTS geocode_meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def sync_gazetteer(self, version: str) -> None:
+        """Drop results the gazetteer decided if it has changed since they were cached."""
+        with self._conn() as conn:
+            row = conn.execute("SELECT value FROM geocode_meta WHERE key = 'gazetteer'").fetchone()
+            if row and row[0] == version:
+                return
+            # Network hits don't depend on the gazetteer and stay valid
+            conn.execute("DELETE FROM geocode_cache WHERE source LIKE 'gazetteer:%' OR lat IS NULL")
+            conn.execute("INSERT OR REPLACE INTO geocode_meta (key, value) VALUES ('gazetteer', ?)", (version,))
+
+    def get_many(self, queries: List[str]) -> Dict[str, Optional[LatLon]]:
+        """Cached results keyed by query; a stored miss maps to None, an unknown query is absent."""
+        found: Dict[str, Optional[LatLon]] = {}
+        conn = self._conn()
+        for i in range(0, len(queries), 500):
+            chunk = queries[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for q, lat, lon in conn.execute(
+                f"SELECT query, lat, lon FROM geocode_cache WHERE query IN ({marks})", chunk
+            ):
+                found[q] = (lat, lon) if lat is not None else None
+        return found
+
+    def put_many(self, results: Dict[str, Tuple[Optional[LatLon], str]]) -> None:
+        now = datetime.utcnow().isoformat()
+        rows = [
+            (q, ll[0] if ll else None, ll[1] if ll else None, source, now)
+            for q, (ll, source) in results.items()
+        ]
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO geocode_cache (query, lat, lon, source, created_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+
+# ---------- Public API ----------
+_gazetteer: Optional[Gazetteer] = None
+_cache: Optional[GeocodeCache] = None
+_nominatim = None
+_init_lock = threading.Lock()
+
+def get_gazetteer() -> Gazetteer:
+    global _gazetteer
+    if _gazetteer is None:
+        with _init_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer()
+    return _gazetteer
+
+def _get_cache() -> GeocodeCache:
+    global _cache
+    if _cache is None:
+        version = get_gazetteer().version
+        with _init_lock:
+            if _cache is None:
+                cache = GeocodeCache()
+                cache.sync_gazetteer(version)
+                _cache = cache
+    return _cache
+
+def reset_gazetteer() -> None:
+    """Reload the gazetteer (and re-check the cache against it) on next use, e.g. after a rebuild."""
+    global _gazetteer, _cache
+    with _init_lock:
+        _gazetteer = _cache = None
+
+def _network_geocode(text: str) -> Optional[LatLon]:
+    """Last-resort Nominatim lookup, sharing one client per process. Raises on network errors."""
+    global _nominatim
+    if _nominatim is None:
+        from geopy.geocoders import Nominatim
+        _nominatim = Nominatim(user_agent="share2care_geocoder")
+    loc = _nominatim.geocode(text, timeout=6)
+    return (loc.latitude, loc.longitude) if loc else None
+
+def _resolve(text: str, allow_network: bool) -> Tuple[Optional[LatLon], str]:
+    place = get_gazetteer().match(text)
+    if place:
+        return (place["lat"], place["lon"]), f"gazetteer:{place['level']}"
+    if allow_network:
+        try:
+            return _network_geocode(text), "nominatim"
+        except Exception as e:
+            print(f"[WARN] Nominatim lookup failed for {text!r}: {e}")
+            return None, "error"
+    return None, "miss"
+
+def geocode_batch(locations: Iterable[str], allow_network: Optional[bool] = None) -> Dict[str, Optional[LatLon]]:
+    """Geocode many location strings at once; returns {location: (lat, lon) or None}."""
+    allow_network = ALLOW_NETWORK if allow_network is None else allow_network
+    out: Dict[str, Optional[LatLon]] = {}
+    pending: Dict[str, List[str]] = defaultdict(list)
+    for loc in locations:
+        if not loc or loc in out:
+            continue
+        coords = _parse_coords(loc)
+        if coords:
+            out[loc] = coords
+        else:
+            pending[_normalize(loc)].append(loc)
+    pending.pop("", None)
+    if not pending:
+        return out
+
+    cache = _get_cache()
+    cached = cache.get_many(list(pending))
+    fresh: Dict[str, Tuple[Optional[LatLon], str]] = {}
+    for key, originals in pending.items():
+        if key in cached:
+            result = cached[key]
+        else:
+            result, source = _resolve(originals[0], allow_network)
+            # Don't pin offline misses (a later network-enabled run may resolve them)
+            # or failed lookups (timeouts and server errors are transient)
+            if result is not None or source == "nominatim":
+                fresh[key] = (result, source)
+        for loc in originals:
+            out[loc] = result
+    if fresh:
+        cache.put_many(fresh)
+    return out
+
+def geocode(location: str, allow_network: Optional[bool] = None) -> Optional[LatLon]:
+    """Geocode a single location string (coordinates, place name, or 'place, district')."""
+    return geocode_batch([location], allow_network=allow_network).get(location)
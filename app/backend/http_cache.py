@@ -0,0 +1,142 @@
+# app/backend/http_cache.py
+"""HTTP caching for read endpoints: strong ETags, 304s and Cache-Control.
+
+`HTTPCacheMiddleware` buffers successful JSON GET responses, tags them with
+a hash of the body and answers a matching If-None-Match with an empty 304,
+so repeat dashboard loads skip the transfer and client-side parsing. The
+ETag is a content hash rather than a table version counter: it stays
+correct with several workers and with writes made outside the API (jobs,
+scripts). Compression is added separately in main.py;
+`SkipCompressionMiddleware` keeps it away from event streams.
+"""
+import hashlib
+import os
+from typing import Iterable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+# Responses bigger than this are passed through untouched (no ETag)
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+# First matching path prefix wins; anything else must revalidate on every use
+CACHE_CONTROL_RULES: Tuple[Tuple[str, str], ...] = (
+    ("/forecasting/", "public, max-age=900"),
+    ("/analytics/severity", "public, max-age=300"),
+    ("/analytics/rollups", "public, max-age=60"),
+    ("/api/admin", "private, no-cache"),
+    ("/api/jobs", "no-store"),
+    ("/api/events", "no-store"),
+)
+DEFAULT_CACHE_CONTROL = "no-cache"
+
+# Server-sent event streams must reach the client event by event; GZip/Brotli buffer them
+UNCOMPRESSED_PATHS = frozenset({"/api/events/donations"})
+
+
+def cache_control_for(path: str, rules: Iterable[Tuple[str, str]] = CACHE_CONTROL_RULES) -> str:
+    for prefix, value in rules:
+        if path.startswith(prefix):
+            return value
+    return DEFAULT_CACHE_CONTROL
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    tags = {t.strip()[2:] if t.strip().startswith("W/") else t.strip() for t in if_none_match.split(",")}
+    return etag in tags
+
+
+class HTTPCacheMiddleware:
+    def __init__(self, app, rules: Iterable[Tuple[str, str]] = CACHE_CONTROL_RULES):
+        self.app = app
+        self.rules = tuple(rules)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        cache_control = cache_control_for(scope["path"], self.rules)
+        start = None
+        chunks = []
+        size = 0
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, size, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                cacheable = (
+                    message["status"] == 200
+                    and headers.get("content-type", "").startswith("application/json")
+                    and "etag" not in headers
+                )
+                if not cacheable:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            if size > HTTP_CACHE_MAX_BYTES:
+                # Too big to hold; stream what we have and the rest as-is
+                passthrough = True
+                await send(start)
+                await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": True})
+                if not message.get("more_body", False):
+                    await send({"type": "http.response.body", "body": b""})
+                return
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            etag = make_etag(body)
+            headers = MutableHeaders(scope=start)  # edits start["headers"] in place
+            headers["ETag"] = etag
+            headers.setdefault("Cache-Control", cache_control)
+            if etag_matches(if_none_match, etag):
+                for name in ("content-length", "content-type"):
+                    if name in headers:
+                        del headers[name]
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class SkipCompressionMiddleware:
+    """Hides Accept-Encoding from the compression middleware inside it for SSE requests.
+
+    Matches UNCOMPRESSED_PATHS and any request that asks for text/event-stream,
+    so the response goes out unencoded and each event is flushed as it is sent.
+    """
+
+    def __init__(self, app, paths: Iterable[str] = UNCOMPRESSED_PATHS):
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and (
+            scope["path"] in self.paths or "text/event-stream" in Headers(scope=scope).get("accept", "")
+        ):
+            scope = dict(scope)
+            scope["headers"] = [(k, v) for k, v in scope["headers"] if k != b"accept-encoding"]
+        await self.app(scope, receive, send)
@@ -0,0 +1,245 @@
+# app/backend/images.py
+"""Content-addressed image store with precomputed derivatives.
+
+Uploads are streamed to a temp file IMAGE_CHUNK_BYTES at a time while being
+hashed, so an upload costs one chunk of memory whatever the photo size. The
+file is then moved to <root>/<aa>/<sha256>.<ext>; uploading the same bytes
+again reuses the stored object. Two derivatives are rendered once per image,
+in a background thread, next to the original:
+
+- "thumb": longest side THUMB_SIZE, JPEG, for lists and previews
+- "model": the tagger's input geometry (shortest side 256, centre crop
+  224x224), PNG, so tagging skips decode + resize of the full photo
+
+`derivative(digest, kind)` waits for a pending render, or renders inline if
+none was scheduled (e.g. after a restart). Derivatives are written to a temp
+name and renamed, so readers never see a half-written file.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .config import IMAGES_DIR
+
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(20 * 1024 * 1024)))
+IMAGE_CHUNK_BYTES = 64 * 1024
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+THUMB_SIZE = 320
+MODEL_RESIZE, MODEL_CROP = 256, 224  # tagger geometry: shortest side to 256, centre crop 224
+
+# PIL format -> (extension, media type)
+FORMATS = {
+    "JPEG": ("jpg", "image/jpeg"),
+    "PNG": ("png", "image/png"),
+    "WEBP": ("webp", "image/webp"),
+    "GIF": ("gif", "image/gif"),
+}
+DERIVATIVES = {"thumb": ("thumb.jpg", "image/jpeg"), "model": ("224.png", "image/png")}
+
+
+class ImageRejected(ValueError):
+    """Upload is not an image in one of FORMATS."""
+
+class ImageTooLarge(ImageRejected):
+    """Upload exceeds IMAGE_MAX_BYTES."""
+
+
+@dataclass
+class StoredImage:
+    digest: str
+    format: str
+    media_type: str
+    size: int
+    width: int
+    height: int
+    path: Path
+    created: bool  # False when the same bytes were already stored
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d["path"] = str(self.path)
+        return d
+
+
+def model_crop_box(size: Tuple[int, int]) -> Tuple[float, float, float, float]:
+    """Source-pixel box that Resize(MODEL_RESIZE) + CenterCrop(MODEL_CROP) would keep.
+
+    Resizing that box straight to MODEL_CROP x MODEL_CROP does both steps in one pass.
+    """
+    w, h = size
+    if w <= h:
+        rw, rh = MODEL_RESIZE, int(MODEL_RESIZE * h / w)
+    else:
+        rw, rh = int(MODEL_RESIZE * w / h), MODEL_RESIZE
+    left, top = int(round((rw - MODEL_CROP) / 2.0)), int(round((rh - MODEL_CROP) / 2.0))
+    sx, sy = w / rw, h / rh
+    return left * sx, top * sy, (left + MODEL_CROP) * sx, (top + MODEL_CROP) * sy
+
+
+def model_crop(img):
+    """MODEL_CROP x MODEL_CROP tagger input from a PIL image, resized and cropped in one pass."""
+    from PIL import Image
+    if img.size == (MODEL_CROP, MODEL_CROP):
+        return img  # already preprocessed (e.g. the store's "model" derivative)
+    return img.resize((MODEL_CROP, MODEL_CROP), Image.BILINEAR, box=model_crop_box(img.size), reducing_gap=3.0)
+
+
+def _probe(path: str) -> Tuple[str, int, int]:
+    from PIL import Image
+    try:
+        with Image.open(path) as im:
+            fmt, (width, height) = im.format, im.size
+            im.verify()  # structural check without decoding the pixels
+    except Exception as e:  # UnidentifiedImageError, DecompressionBombError, truncated files...
+        raise ImageRejected(f"Not a readable image: {e}")
+    if fmt not in FORMATS:
+        raise ImageRejected(f"Unsupported image format {fmt}; use one of {', '.join(FORMATS)}")
+    return fmt, width, height
+
+
+class ImageStore:
+    def __init__(self, root=IMAGES_DIR, workers: int = IMAGE_WORKERS):
+        self.root = Path(root)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-render")
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    # ---------- Paths ----------
+    def _dir(self, digest: str) -> Path:
+        return self.root / digest[:2]
+
+    @staticmethod
+    def is_digest(value: str) -> bool:
+        return len(value) == 64 and all(c in "0123456789abcdef" for c in value)
+
+    def path(self, digest: str) -> Optional[Path]:
+        """The stored original, or None."""
+        if not self.is_digest(digest):
+            return None
+        for ext, _ in FORMATS.values():
+            p = self._dir(digest) / f"{digest}.{ext}"
+            if p.exists():
+                return p
+        return None
+
+    def media_type(self, path: Path) -> str:
+        ext = path.suffix.lstrip(".")
+        return next((mt for e, mt in FORMATS.values() if e == ext), "application/octet-stream")
+
+    def derivative_path(self, digest: str, kind: str) -> Path:
+        return self._dir(digest) / f"{digest}.{DERIVATIVES[kind][0]}"
+
+    # ---------- Writes ----------
+    def put(self, fileobj, max_bytes: int = IMAGE_MAX_BYTES) -> StoredImage:
+        """Stream a file-like object into the store (deduplicated) and schedule its derivatives."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        h, size = hashlib.sha256(), 0
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = fileobj.read(IMAGE_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise ImageTooLarge(f"Image larger than {max_bytes // (1024 * 1024)} MB")
+                    h.update(chunk)
+                    out.write(chunk)
+            if size == 0:
+                raise ImageRejected("Empty upload")
+            fmt, width, height = _probe(tmp)
+            digest = h.hexdigest()
+            ext, media_type = FORMATS[fmt]
+            dest = self._dir(digest) / f"{digest}.{ext}"
+            created = not dest.exists()
+            if created:
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp, dest)  # same bytes from a concurrent upload: either rename wins
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        self.schedule(digest)
+        return StoredImage(digest, fmt, media_type, size, width, height, dest, created)
+
+    # ---------- Derivatives ----------
+    def schedule(self, digest: str) -> Optional[Future]:
+        """Render missing derivatives in the background (no-op if done or already queued)."""
+        if all(self.derivative_path(digest, k).exists() for k in DERIVATIVES):
+            return None
+        with self._lock:
+            fut = self._pending.get(digest)
+            if fut is None:
+                fut = self._pending[digest] = self._pool.submit(self._render, digest)
+                fut.add_done_callback(lambda _: self._forget(digest))
+            return fut
+
+    def _forget(self, digest: str) -> None:
+        with self._lock:
+            self._pending.pop(digest, None)
+
+    def derivative(self, digest: str, kind: str, timeout: float = 30.0) -> Optional[Path]:
+        """Path to a derivative, rendering it if needed; None if the original isn't stored."""
+        if kind not in DERIVATIVES:
+            raise KeyError(kind)
+        if not self.is_digest(digest):
+            return None
+        target = self.derivative_path(digest, kind)
+        if target.exists():
+            return target
+        if self.path(digest) is None:
+            return None
+        with self._lock:
+            fut = self._pending.get(digest)
+        if fut is not None:
+            fut.result(timeout=timeout)
+        else:
+            self._render(digest)
+        return target
+
+    def _render(self, digest: str) -> None:
+        from PIL import Image, ImageOps
+        src = self.path(digest)
+        if src is None:
+            return
+        with Image.open(src) as im:
+            # JPEG: decode at 1/2..1/8 scale when that still covers both outputs
+            im.draft("RGB", (max(THUMB_SIZE, MODEL_RESIZE),) * 2)
+            im = ImageOps.exif_transpose(im).convert("RGB")
+
+        thumb = im.copy()
+        thumb.thumbnail((THUMB_SIZE, THUMB_SIZE), Image.LANCZOS)
+        self._save(thumb, self.derivative_path(digest, "thumb"), "JPEG", quality=85, optimize=True)
+
+        self._save(model_crop(im), self.derivative_path(digest, "model"), "PNG")
+
+    @staticmethod
+    def _save(img, dest: Path, fmt: str, **params) -> None:
+        tmp = dest.with_name(f".{dest.name}.{threading.get_ident()}.tmp")
+        img.save(tmp, fmt, **params)
+        os.replace(tmp, dest)
+
+    def model_input(self, digest: str):
+        """The 224x224 RGB model input as a PIL image (for ml.image_tagging)."""
+        from PIL import Image
+        path = self.derivative(digest, "model")
+        if path is None:
+            raise KeyError(digest)
+        with Image.open(path) as im:
+            return im.convert("RGB")
+
+
+_store: Optional[ImageStore] = None
+_store_lock = threading.Lock()
+
+def get_image_store() -> ImageStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ImageStore()
+        return _store
@@ -0,0 +1,346 @@
+# app/backend/inference.py
+"""Shared model server: one process owns the models, everyone else asks it.
+
+Every uvicorn worker, Streamlit and the job workers used to load DistilBERT
+and MobileNetV2 themselves (DistilBERT twice in the API). Now
+
+    python -m app.backend.inference --socket app/data/processed/inference.sock
+
+loads both once and serves them over a Unix socket. Requests from all
+clients are coalesced into batches (up to INFERENCE_MAX_BATCH items or
+INFERENCE_MAX_WAIT_MS), so concurrent callers share one forward pass.
+
+Callers use `analyze_sentiment`, `analyze_sentiment_batch` and
+`tag_food_image` from this module. INFERENCE_MODE picks the backend:
+"auto" (default) uses the server when its socket answers and otherwise
+loads the models in-process as before; "remote" requires the server;
+"local" never tries it.
+
+Wire format: 4-byte big-endian length + JSON, one request/response pair at a
+time per connection (each client thread keeps its own connection).
+"""
+import argparse
+import base64
+import io
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from .config import DATA_PROC
+from .metrics import span
+
+INFERENCE_SOCKET = os.getenv("INFERENCE_SOCKET", str(DATA_PROC / "inference.sock"))
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "auto")  # auto | remote | local
+INFERENCE_TIMEOUT = float(os.getenv("INFERENCE_TIMEOUT", "60"))
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "32"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "5"))
+INFERENCE_RETRY_SECONDS = 30.0  # auto mode: how long to stay local after the server was unreachable
+
+HAVE_AF_UNIX = hasattr(socket, "AF_UNIX")
+_MAX_TOPK = 10  # the server computes this many tags per image; clients slice
+
+
+class InferenceUnavailable(RuntimeError):
+    """The inference server can't be reached (INFERENCE_MODE=remote)."""
+
+
+# ---------- Framing ----------
+_HEADER = struct.Struct(">I")
+
+def _send(sock, obj) -> None:
+    body = json.dumps(obj).encode()
+    sock.sendall(_HEADER.pack(len(body)) + body)
+
+def _recv_exact(sock, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        buf += chunk
+    return bytes(buf)
+
+def _recv(sock):
+    (n,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return json.loads(_recv_exact(sock, n))
+
+
+# ---------- Server ----------
+class Batcher:
+    """Collects items from many requests and runs `fn` over them as one batch."""
+
+    def __init__(self, name: str, fn: Callable[[list], list], max_batch: int, max_wait: float):
+        self.name, self.fn = name, fn
+        self.max_batch, self.max_wait = max_batch, max_wait
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        threading.Thread(target=self._run, name=f"batch-{name}", daemon=True).start()
+
+    def submit(self, items: list) -> Future:
+        fut = Future()
+        self._queue.put((items, fut))
+        return fut
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            n = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while n < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                n += len(batch[-1][0])
+            flat = [item for items, _ in batch for item in items]
+            try:
+                with span(f"inference_batch:{self.name}"):
+                    results = self.fn(flat)
+            except Exception:
+                self._run_items(batch)  # find the bad input(s) without failing everyone else
+                continue
+            pos = 0
+            for items, fut in batch:
+                fut.set_result(results[pos:pos + len(items)])
+                pos += len(items)
+
+    def _run_items(self, batch) -> None:
+        """Slow path after a batch raised: one item at a time, failing only requests with a bad item."""
+        for items, fut in batch:
+            results = []
+            try:
+                for item in items:
+                    results.extend(self.fn([item]))
+            except Exception as e:
+                fut.set_exception(e)
+                continue
+            fut.set_result(results)
+
+
+def _image_source(ref: dict):
+    if "digest" in ref:
+        from .images import get_image_store
+        return get_image_store().model_input(ref["digest"])
+    if "path" in ref:
+        return ref["path"]
+    return base64.b64decode(ref["data"])
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        batchers = self.server.batchers
+        while True:
+            try:
+                req = _recv(self.request)
+            except (ConnectionError, OSError, ValueError):
+                return
+            try:
+                op = req["op"]
+                if op == "ping":
+                    result = {"ops": sorted(batchers)}
+                elif op == "sentiment":
+                    result = batchers["sentiment"].submit(list(req["texts"])).result()
+                elif op == "tag":
+                    topk = min(int(req.get("topk", 3)), _MAX_TOPK)
+                    sources = [_image_source(ref) for ref in req["images"]]
+                    result = [tags[:topk] for tags in batchers["tag"].submit(sources).result()]
+                else:
+                    raise ValueError(f"unknown op {op!r}")
+                resp = {"ok": True, "result": result}
+            except Exception as e:
+                resp = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            try:
+                _send(self.request, resp)
+            except OSError:
+                return
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(path: str = INFERENCE_SOCKET, max_batch: int = INFERENCE_MAX_BATCH,
+          max_wait_ms: float = INFERENCE_MAX_WAIT_MS) -> None:
+    """Load the models once and serve them on a Unix socket until interrupted."""
+    if not HAVE_AF_UNIX:
+        raise SystemExit("Unix sockets are not available on this platform; use INFERENCE_MODE=local")
+    from .ml.image_tagging import tag_food_images
+    from .ml.sentiment import analyze_sentiment_batch as _sentiment_batch
+
+    if os.path.exists(path):
+        if _ping(path):
+            raise SystemExit(f"An inference server is already listening on {path}")
+        os.unlink(path)  # stale socket from a previous run
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    server = _Server(path, _Handler)
+    wait = max_wait_ms / 1000
+    server.batchers = {
+        "sentiment": Batcher("sentiment", _sentiment_batch, max_batch, wait),
+        "tag": Batcher("tag", lambda images: tag_food_images(images, topk=_MAX_TOPK), max_batch, wait),
+    }
+    print(f"Inference server listening on {path} (max batch {max_batch}, max wait {max_wait_ms:g} ms)")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+# ---------- Client ----------
+def _ping(path: str) -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(2)
+            s.connect(path)
+            _send(s, {"op": "ping"})
+            return _recv(s).get("ok", False)
+    except (OSError, ValueError):
+        return False
+
+
+class InferenceClient:
+    def __init__(self, path: str = INFERENCE_SOCKET, timeout: float = INFERENCE_TIMEOUT):
+        self.path, self.timeout = path, timeout
+        self._local = threading.local()
+
+    def _conn(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def _drop(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def call(self, op: str, **payload):
+        with span(f"inference_rpc:{op}"):
+            for attempt in (1, 2):
+                try:
+                    sock = self._conn()
+                    _send(sock, {"op": op, **payload})
+                    resp = _recv(sock)
+                    break
+                except (OSError, ConnectionError) as e:
+                    self._drop()  # server restarted or connection went stale: reconnect once
+                    if attempt == 2:
+                        raise InferenceUnavailable(f"Inference server at {self.path}: {e}")
+        if not resp.get("ok"):
+            raise RuntimeError(resp.get("error", "inference failed"))
+        return resp["result"]
+
+    def sentiment(self, texts: List[str]) -> List[dict]:
+        return self.call("sentiment", texts=list(texts))
+
+    def tag(self, images: List[dict], topk: int = 3) -> list:
+        """`images` are {"digest": ...}, {"path": ...} or {"data": <base64>} references."""
+        return [[tuple(t) for t in tags] for tags in self.call("tag", images=images, topk=topk)]
+
+
+# ---------- Backend selection ----------
+_client: Optional[InferenceClient] = None
+_unreachable_until = 0.0
+_lock = threading.Lock()
+
+def get_client() -> Optional[InferenceClient]:
+    """The server client, or None to run in-process (per INFERENCE_MODE)."""
+    global _client, _unreachable_until
+    if INFERENCE_MODE == "local" or not HAVE_AF_UNIX:
+        return None
+    with _lock:
+        if _client is not None:
+            return _client
+        if INFERENCE_MODE == "auto" and time.monotonic() < _unreachable_until:
+            return None
+        if _ping(INFERENCE_SOCKET):
+            _client = InferenceClient(INFERENCE_SOCKET)
+            return _client
+        if INFERENCE_MODE == "remote":
+            raise InferenceUnavailable(f"No inference server on {INFERENCE_SOCKET}")
+        if _unreachable_until == 0.0:
+            print(f"[WARN] No inference server on {INFERENCE_SOCKET}; loading models in-process")
+        _unreachable_until = time.monotonic() + INFERENCE_RETRY_SECONDS
+        return None
+
+def _remote(fn):
+    """Run fn(client); in auto mode fall back to in-process (returns None) if the server went away."""
+    global _client, _unreachable_until
+    client = get_client()
+    if client is None:
+        return None
+    try:
+        return fn(client)
+    except InferenceUnavailable:
+        if INFERENCE_MODE == "remote":
+            raise
+        print(f"[WARN] Inference server on {INFERENCE_SOCKET} went away; loading models in-process")
+        with _lock:
+            _client, _unreachable_until = None, time.monotonic() + INFERENCE_RETRY_SECONDS
+        return None
+
+
+# ---------- Public API ----------
+def analyze_sentiment_batch(texts: List[str]) -> List[dict]:
+    result = _remote(lambda c: c.sentiment(texts))
+    if result is None:
+        from .ml.sentiment import analyze_sentiment_batch as local
+        result = local(list(texts))
+    return result
+
+def analyze_sentiment(text: str) -> dict:
+    """{"label": POSITIVE/NEGATIVE/EMPTY, "score": float} via the server or the local model."""
+    return analyze_sentiment_batch([text])[0]
+
+def _image_bytes(source) -> bytes:
+    """Encoded image bytes for the wire: bytes as-is, PIL images as PNG."""
+    if hasattr(source, "save") and hasattr(source, "mode"):  # PIL.Image, without importing PIL here
+        buf = io.BytesIO()
+        source.save(buf, format="PNG")
+        return buf.getvalue()
+    return bytes(source)
+
+def tag_food_image(source=None, topk: int = 3, digest: Optional[str] = None):
+    """Top-k food tags for an image path, bytes, file object, PIL image, or a stored image `digest`."""
+    if digest is not None:
+        ref = {"digest": digest}
+    elif isinstance(source, (str, Path)):
+        ref = {"path": os.path.abspath(source)}
+    else:
+        if hasattr(source, "read"):
+            source = source.read()  # once, so the local fallback still has the data
+        ref = None  # bytes / PIL image: only encoded if they have to cross the socket
+    result = _remote(lambda c: c.tag([ref or {"data": base64.b64encode(_image_bytes(source)).decode()}], topk=topk))
+    if result is not None:
+        return result[0]
+    from .ml.image_tagging import tag_food_image as local
+    return local(_image_source(ref) if ref else source, topk=topk)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Serve the sentiment and image-tagging models over a Unix socket.")
+    ap.add_argument("--socket", default=INFERENCE_SOCKET)
+    ap.add_argument("--max-batch", type=int, default=INFERENCE_MAX_BATCH)
+    ap.add_argument("--max-wait-ms", type=float, default=INFERENCE_MAX_WAIT_MS)
+    args = ap.parse_args()
+    serve(args.socket, args.max_batch, args.max_wait_ms)
@@ -0,0 +1,179 @@
+# app/backend/ingest.py
+"""Bulk donation ingestion.
+
+`iter_records` parses a request body (JSON array, NDJSON or CSV) as it
+streams in, so a large upload is validated row by row without first being
+read into memory. `insert_donations` writes one chunk of validated rows with
+a single multi-row INSERT ... RETURNING (SQLAlchemy's insertmanyvalues), then
+applies the community_stats and rollup deltas once per community / bucket
+instead of once per donation. Callers commit.
+"""
+import codecs
+import csv
+import json
+import os
+from collections import Counter
+from datetime import datetime
+from typing import AsyncIterator, List, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from app.backend import aggregates, models, rollups
+
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", "50000"))
+
+FORMATS = ("json", "ndjson", "csv")
+_CONTENT_TYPES = {
+    "application/json": "json",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/x-jsonlines": "ndjson",
+    "text/csv": "csv",
+    "application/csv": "csv",
+}
+
+
+class BulkFormatError(ValueError):
+    """The body can't be parsed any further (e.g. a broken JSON array)."""
+
+
+def detect_format(content_type: str) -> str:
+    fmt = _CONTENT_TYPES.get((content_type or "").split(";")[0].strip().lower())
+    if fmt is None:
+        raise BulkFormatError(f"Unsupported content type {content_type!r}; use one of {', '.join(sorted(_CONTENT_TYPES))}")
+    return fmt
+
+
+# ---------- Streaming parsers ----------
+# Each yields (row, record) where record is a dict, or an error string for a row that can't be parsed
+
+async def _iter_text(chunks: AsyncIterator[bytes], encoding: str = "utf-8") -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder(encoding)(errors="strict")
+    async for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+async def _iter_lines(chunks: AsyncIterator[bytes], encoding: str = "utf-8") -> AsyncIterator[str]:
+    pending = ""
+    async for text in _iter_text(chunks, encoding):
+        pending += text
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    if pending:
+        yield pending.rstrip("\r")
+
+async def _iter_ndjson(chunks):
+    row = 0
+    async for line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            yield row, json.loads(line)
+        except ValueError as e:
+            yield row, f"invalid JSON: {e}"
+        row += 1
+
+async def _iter_csv(chunks):
+    header, pending, row = None, "", 0
+    async for line in _iter_lines(chunks, "utf-8-sig"):
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue  # newline inside a quoted field
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+        fields = next(csv.reader([record]))
+        if header is None:
+            header = [h.strip() for h in fields]
+            continue
+        if len(fields) != len(header):
+            yield row, f"expected {len(header)} fields, got {len(fields)}"
+        else:
+            # Empty cells fall back to the model defaults
+            yield row, {k: v for k, v in zip(header, fields) if v != ""}
+        row += 1
+    if pending:
+        yield row, "unterminated quoted field"
+
+async def _iter_json_array(chunks):
+    decoder = json.JSONDecoder()
+    buf, pos, row, started = "", 0, 0, False
+    async for text in _iter_text(chunks):
+        buf = buf[pos:] + text
+        pos = 0
+        while True:
+            while pos < len(buf) and (buf[pos].isspace() or (started and buf[pos] == ",")):
+                pos += 1
+            if pos >= len(buf):
+                break
+            if not started:
+                if buf[pos] != "[":
+                    raise BulkFormatError("JSON body must be an array of objects")
+                started, pos = True, pos + 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                record, pos = decoder.raw_decode(buf, pos)
+            except ValueError:
+                break  # incomplete item; wait for more data
+            yield row, record
+            row += 1
+    raise BulkFormatError(f"JSON array truncated or malformed after row {row}")
+
+_PARSERS = {"json": _iter_json_array, "ndjson": _iter_ndjson, "csv": _iter_csv}
+
+def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, Union[dict, str]]]:
+    return _PARSERS[fmt](chunks)
+
+
+# ---------- Validation ----------
+def validate_record(record: Union[dict, str]) -> Union[models.Donation, List[str]]:
+    """A Donation ready to insert (defaults filled, like the single-item path), or error strings."""
+    if isinstance(record, str):
+        return [record]
+    if not isinstance(record, dict):
+        return [f"expected an object, got {type(record).__name__}"]
+    try:
+        payload = models.DonationCreate.model_validate(record)
+    except ValidationError as e:
+        return [f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()]
+    return models.Donation.from_orm(payload)
+
+
+# ---------- Writes (caller commits) ----------
+_COLUMNS = ("title", "description", "quantity", "category", "status", "donor_id", "community_id",
+            "timestamp", "version", "claimed_by", "ngo_contact", "claimed_at")
+
+def insert_donations(session: Session, donations: List[models.Donation]) -> List[int]:
+    """Insert a chunk in one statement and update aggregates/rollups; sets and returns the new ids."""
+    if not donations:
+        return []
+    D = models.Donation
+    now = datetime.utcnow()
+    for d in donations:
+        d.timestamp = d.timestamp or now
+    params = [{c: getattr(d, c) for c in _COLUMNS} for d in donations]
+    stmt = insert(D).returning(D.id, sort_by_parameter_order=True)
+    ids = list(session.execute(stmt, params).scalars())
+    for d, new_id in zip(donations, ids):
+        d.id = new_id
+
+    per_community = {}
+    for d in donations:
+        qty, bucket = d.quantity or 0, aggregates.status_bucket(d.status)
+        deltas = per_community.setdefault(d.community_id, Counter())
+        deltas.update(received=1, quantity=qty, delivered_quantity=qty if bucket == "delivered" else 0, **{bucket: 1})
+    for community_id, deltas in per_community.items():
+        aggregates.bump_community_stats(session, community_id, **deltas)
+    rollups.record_donations(session, donations)
+    return ids
@@ -0,0 +1,318 @@
+# app/backend/jobs.py
+"""In-process background jobs with a persistent SQLite queue.
+
+Request handlers `submit()` work by name and get a job id back straight away;
+a small pool of worker threads claims queued jobs, runs the registered
+function and stores its JSON result. Jobs survive restarts: a claimed job
+records its owner (host:pid) and a lease that the owner's heartbeat renews
+every JOB_LEASE_SECONDS / 3, and only jobs whose lease has expired (their
+process died) are re-queued, up to JOB_MAX_ATTEMPTS, so several processes
+can share one queue. Identical pending jobs are coalesced, and `wait()`
+lets callers long-poll for completion. A job whose function raises is
+marked failed on that first attempt and is not retried; submit it again
+once the cause is fixed.
+Recurring work (nightly forecasts, map rebuilds, rollup compaction) is put
+on the same queue by an APScheduler cron scheduler. Every process runs one,
+but only the holder of the "scheduler" lease submits, so each firing
+queues its job once however many uvicorn workers are up.
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from .config import JOBS_DB
+from .metrics import span
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))  # runs interrupted by a crash, not exceptions
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+# Added after the first release; ALTERed into existing queues
+_LATER_COLUMNS = {"owner": "TEXT", "lease_until": "REAL"}
+
+_REGISTRY: Dict[str, Callable] = {}
+
+
+def job(name: str):
+    """Register a function as a runnable job; it must take keyword args and return JSON-able data."""
+    def deco(fn):
+        _REGISTRY[name] = fn
+        return fn
+    return deco
+
+def registered_jobs() -> List[str]:
+    return sorted(_REGISTRY)
+
+
+class JobQueue:
+    def __init__(self, db_path=JOBS_DB, workers: int = JOB_WORKERS):
+        self.db_path = str(db_path)
+        self.workers = workers
+        self._local = threading.local()
+        self._wakeup = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        with self._tx() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    args TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT,
+                    owner TEXT,
+                    lease_until REAL
+                )
+            """)
+            existing = {r["name"] for r in conn.execute("PRAGMA table_info(jobs)")}
+            for column, decl in _LATER_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {decl}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS leases (
+                    name TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    expires REAL NOT NULL
+                )
+            """)
+
+    # ---------- Storage ----------
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _tx(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _row(row) -> Optional[dict]:
+        if row is None:
+            return None
+        out = dict(row)
+        out["args"] = json.loads(out["args"])
+        out["result"] = json.loads(out["result"]) if out["result"] else None
+        return out
+
+    # ---------- Producer API ----------
+    def submit(self, name: str, kwargs: Optional[dict] = None, coalesce: bool = True) -> str:
+        """Queue `name(**kwargs)`; returns the job id (an identical pending job's id when coalescing)."""
+        if name not in _REGISTRY:
+            raise KeyError(f"Unknown job '{name}'")
+        args = json.dumps(kwargs or {}, sort_keys=True, default=str)
+        with self._tx() as conn:
+            if coalesce:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE name=? AND args=? AND status IN ('queued','running') LIMIT 1",
+                    (name, args),
+                ).fetchone()
+                if row:
+                    return row["id"]
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, name, args, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, name, args, datetime.utcnow().isoformat()),
+            )
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self._row(self._conn().execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone())
+
+    def latest(self, name: str, status: str = "done", **kwargs) -> Optional[dict]:
+        """Most recent job of `name` with these exact args (e.g. last finished forecast)."""
+        args = json.dumps(kwargs, sort_keys=True, default=str)
+        return self._row(self._conn().execute(
+            "SELECT * FROM jobs WHERE name=? AND args=? AND status=? ORDER BY finished_at DESC LIMIT 1",
+            (name, args, status),
+        ).fetchone())
+
+    def recent(self, status: Optional[str] = None, limit: int = 50) -> List[dict]:
+        sql, params = "SELECT * FROM jobs", []
+        if status:
+            sql, params = sql + " WHERE status=?", [status]
+        rows = self._conn().execute(sql + " ORDER BY created_at DESC LIMIT ?", params + [limit]).fetchall()
+        return [self._row(r) for r in rows]
+
+    def wait(self, job_id: str, timeout: float = 30.0) -> Optional[dict]:
+        """Block until the job finishes or `timeout` elapses; returns its latest state."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job_row = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job_row is None or job_row["status"] in ("done", "failed") or remaining <= 0:
+                return job_row
+            with self._wakeup:
+                self._wakeup.wait(min(remaining, JOB_POLL_SECONDS))
+
+    # ---------- Leases ----------
+    def acquire_lease(self, name: str, seconds: float = JOB_LEASE_SECONDS) -> bool:
+        """Take or renew the named lease for this process; False while another live process holds it."""
+        now = time.time()
+        with self._tx() as conn:
+            conn.execute(
+                "INSERT INTO leases (name, owner, expires) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET owner=excluded.owner, expires=excluded.expires "
+                "WHERE leases.owner=excluded.owner OR leases.expires < ?",
+                (name, self.owner, now + seconds, now),
+            )
+            row = conn.execute("SELECT owner FROM leases WHERE name=?", (name,)).fetchone()
+        return row["owner"] == self.owner
+
+    def heartbeat(self) -> None:
+        """Extend this process's job and named leases; re-queue jobs whose owner stopped renewing."""
+        now = time.time()
+        with self._tx() as conn:
+            conn.execute("UPDATE jobs SET lease_until=? WHERE status='running' AND owner=?",
+                         (now + JOB_LEASE_SECONDS, self.owner))
+            conn.execute("UPDATE leases SET expires=? WHERE owner=? AND expires >= ?",
+                         (now + JOB_LEASE_SECONDS, self.owner, now))
+            # Expired (or pre-lease) rows belong to a process that died mid-run
+            expired = "status='running' AND (lease_until IS NULL OR lease_until < ?)"
+            conn.execute(f"UPDATE jobs SET status='queued', owner=NULL, lease_until=NULL "
+                         f"WHERE {expired} AND attempts < ?", (now, JOB_MAX_ATTEMPTS))
+            conn.execute(f"UPDATE jobs SET status='failed', error='worker died', finished_at=? WHERE {expired}",
+                         (datetime.utcnow().isoformat(), now))
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(JOB_LEASE_SECONDS / 3):
+            try:
+                self.heartbeat()
+            except sqlite3.Error as e:
+                print(f"[WARN] Job heartbeat failed: {e}")
+
+    # ---------- Workers ----------
+    def _claim_next(self) -> Optional[sqlite3.Row]:
+        with self._tx() as conn:
+            row = conn.execute(
+                "SELECT id, name, args, attempts FROM jobs WHERE status='queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE jobs SET status='running', started_at=?, attempts=attempts+1, owner=?, lease_until=? "
+                    "WHERE id=?",
+                    (datetime.utcnow().isoformat(), self.owner, time.time() + JOB_LEASE_SECONDS, row["id"]),
+                )
+            return row
+
+    def _finish(self, job_id: str, status: str, result=None, error: Optional[str] = None) -> None:
+        with self._tx() as conn:
+            # A no-op if the lease lapsed and the job was handed to another process meanwhile
+            conn.execute(
+                "UPDATE jobs SET status=?, result=?, error=?, finished_at=?, lease_until=NULL "
+                "WHERE id=? AND status='running' AND owner=?",
+                (status, json.dumps(result, default=str) if result is not None else None, error,
+                 datetime.utcnow().isoformat(), job_id, self.owner),
+            )
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def _worker(self) -> None:
+        while not self._stop.is_set():
+            row = self._claim_next()
+            if row is None:
+                with self._wakeup:
+                    self._wakeup.wait(JOB_POLL_SECONDS)
+                continue
+            try:
+                with span(f"job:{row['name']}"):
+                    result = _REGISTRY[row["name"]](**json.loads(row["args"]))
+                self._finish(row["id"], "done", result=result)
+            except Exception as e:
+                print(f"[WARN] Job {row['name']} ({row['id']}) failed: {e}")
+                self._finish(row["id"], "failed", error="".join(traceback.format_exception_only(type(e), e)).strip())
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        # Jobs whose owner died are retried (up to JOB_MAX_ATTEMPTS); live siblings keep theirs
+        self.heartbeat()
+        self._stop.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for t in self._threads:
+            t.join(timeout=5)
+        self._threads = []
+
+
+# ---------- Process-wide queue + scheduler ----------
+_queue: Optional[JobQueue] = None
+_scheduler = None
+
+def get_queue() -> JobQueue:
+    global _queue
+    if _queue is None:
+        _queue = JobQueue()
+    return _queue
+
+def _fire(name: str) -> None:
+    """Cron callback: queue `name` unless another process holds the scheduler lease."""
+    queue = get_queue()
+    if queue.acquire_lease("scheduler"):
+        queue.submit(name)
+
+def start_background(schedules: Optional[Dict[str, dict]] = None) -> None:
+    """Start worker threads and the cron scheduler. `schedules` maps job name -> cron fields."""
+    global _scheduler
+    queue = get_queue()
+    queue.start()
+    if not schedules or _scheduler is not None:
+        return
+    try:
+        from apscheduler.schedulers.background import BackgroundScheduler
+    except ImportError:
+        print("[WARN] apscheduler not installed; scheduled jobs disabled")
+        return
+    _scheduler = BackgroundScheduler(daemon=True)
+    for name, cron in schedules.items():
+        _scheduler.add_job(_fire, "cron", args=[name], id=name, replace_existing=True, **cron)
+    _scheduler.start()
+
+def stop_background() -> None:
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.shutdown(wait=False)
+        _scheduler = None
+    if _queue is not None:
+        _queue.stop()
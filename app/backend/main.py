@@ -1,5 +1,20 @@
+import os
 from fastapi import FastAPI
-from app.backend.database import init_db
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse
+from sqlmodel import Session
+from app.backend.aggregates import seed_community_stats
+from app.backend.database import engine, init_db
+from app.backend.security import shutdown_pool
+from app.backend.jobs import start_background, stop_background
+from app.backend.tasks import SCHEDULES
+from app.backend.http_cache import HTTPCacheMiddleware, SkipCompressionMiddleware
+from app.backend.metrics import MetricsMiddleware, render_prometheus
+try:
+    from brotli_asgi import BrotliMiddleware  # optional; falls back to gzip
+    HAVE_BROTLI = True
+except Exception:
+    HAVE_BROTLI = False
 from app.backend.routes import (
     auth,
     donations,
@@ -8,6 +23,9 @@ from app.backend.routes import (
     analytics,
     psychology,
     admin,
+    jobs,
+    events,
+    images,
 )
 
 app = FastAPI(
@@ -16,16 +34,40 @@ app = FastAPI(
     version="1.0.0",
 )
 
+# HTTP caching (ETag/304, Cache-Control) sits inside compression so ETags hash the plain body
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+app.add_middleware(HTTPCacheMiddleware)
+if HAVE_BROTLI:
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESS_MIN_BYTES, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_BYTES)
+app.add_middleware(SkipCompressionMiddleware)  # SSE must not be buffered by the compressor
+# Outermost, so request timings include caching/compression
+app.add_middleware(MetricsMiddleware)
+
 # Startup Event
 @app.on_event("startup")
 def on_startup():
     init_db()
+    with Session(engine) as session:
+        seed_community_stats(session)  # GET /analytics/severity only reads
+    start_background(SCHEDULES)
+
+@app.on_event("shutdown")
+def on_shutdown():
+    shutdown_pool()
+    stop_background()
 
 # Root Endpoint
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Share2Care – Zero Hunger API"}
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
 # Route Inclusions
 app.include_router(auth.router)
 app.include_router(donations.router)
@@ -34,4 +76,7 @@ app.include_router(delivery.router)
 app.include_router(analytics.router)
 app.include_router(psychology.router)
 app.include_router(admin.router)
+app.include_router(jobs.router)
+app.include_router(events.router)
+app.include_router(images.router)
 
@@ -0,0 +1,290 @@
+# app/backend/metrics.py
+"""Request, SQL and model instrumentation.
+
+- `MetricsMiddleware` times every request into per-route histograms and adds
+  a `Server-Timing` header (total, db, and any spans) to each response.
+- `install_sql_hooks(engine)` counts queries and their time, both globally
+  and for the current request.
+- `span(name)` wraps model inference, forecast fits and other expensive steps.
+- `render_prometheus()` exports everything in the Prometheus text format
+  (served at /metrics).
+- With PROFILE_SLOW_MS set, a background stack sampler runs and requests
+  slower than that threshold get a collapsed-stack profile written to
+  PROFILES_DIR (feed it to flamegraph.pl or speedscope).
+
+Request stats live in a contextvar; FastAPI copies the context into the
+threadpool for sync endpoints, so SQL and spans inside them are attributed
+to the right request. Stdlib only, so it's safe to import anywhere.
+"""
+import bisect
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .config import PROFILES_DIR
+
+# Latency buckets in seconds (upper bounds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))  # 0 = profiler off
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+
+# ---------- Metric types ----------
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple, value: float) -> None:
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            s[0][bisect.bisect_left(self.buckets, value)] += 1
+            s[1] += value
+            s[2] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {k: ([*v[0]], v[1], v[2]) for k, v in self._series.items()}
+
+
+class CounterMetric:
+    def __init__(self):
+        self._values: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+
+REQUEST_SECONDS = Histogram()        # labels: method, route, status
+REQUEST_DB_SECONDS = Histogram()     # labels: method, route
+REQUEST_QUERIES = CounterMetric()    # labels: method, route
+SQL_SECONDS = Histogram()            # labels: statement kind (SELECT/INSERT/...)
+SPAN_SECONDS = Histogram()           # labels: span name
+IN_FLIGHT = CounterMetric()          # labels: ()
+
+_METRICS = (
+    ("http_request_duration_seconds", "histogram", "Request latency by route", REQUEST_SECONDS, ("method", "route", "status")),
+    ("http_request_db_seconds", "histogram", "SQL time per request", REQUEST_DB_SECONDS, ("method", "route")),
+    ("http_request_queries_total", "counter", "SQL statements issued by requests", REQUEST_QUERIES, ("method", "route")),
+    ("db_query_duration_seconds", "histogram", "SQL statement latency", SQL_SECONDS, ("kind",)),
+    ("span_duration_seconds", "histogram", "Instrumented span latency (models, forecasts)", SPAN_SECONDS, ("name",)),
+    ("http_requests_in_flight", "gauge", "Requests currently being served", IN_FLIGHT, ()),
+)
+
+
+# ---------- Per-request context ----------
+@dataclass
+class RequestStats:
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    spans: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+@contextmanager
+def span(name: str):
+    """Time a block into span_duration_seconds{name} and the current request's Server-Timing."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        SPAN_SECONDS.observe((name,), elapsed)
+        stats = _current.get()
+        if stats is not None:
+            stats.spans[name] += elapsed
+
+
+# ---------- SQL ----------
+def install_sql_hooks(engine) -> None:
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("_query_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        kind = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        SQL_SECONDS.observe((kind,), elapsed)
+        stats = _current.get()
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_seconds += elapsed
+
+
+# ---------- Sampling profiler ----------
+# Leaf frames of threads that are parked, not working: idle pool workers waiting on a
+# condition/queue and an event loop blocked in select(). Their stacks are not kept.
+_IDLE_LEAVES = {("threading.py", "wait"), ("selectors.py", "select"), ("queue.py", "get")}
+
+class StackSampler:
+    """Samples busy threads' stacks at a fixed interval into a time-bounded ring buffer.
+
+    It also writes requested profiles (`request_dump`) between samples, so file
+    I/O never happens on the event loop.
+    """
+
+    def __init__(self, interval: float, keep_seconds: float = 120.0):
+        self.interval = interval
+        self._samples: "deque[tuple]" = deque(maxlen=max(1000, int(keep_seconds / interval)))
+        self._dumps: "deque[tuple]" = deque()
+        self._me = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        self._me = threading.get_ident()
+        while True:
+            now = time.perf_counter()
+            for tid, frame in sys._current_frames().items():
+                if tid == self._me:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self._samples.append((now, tid, ";".join(reversed(stack))))
+            while self._dumps:
+                _dump_profile(*self._dumps.popleft())
+            time.sleep(self.interval)
+
+    def request_dump(self, route: str, start: float, end: float) -> None:
+        """Queue a profile of [start, end] to be written from the sampler thread."""
+        self._dumps.append((route, start, end))
+
+    def collapsed(self, start: float, end: float, threads=None) -> Counter:
+        """Collapsed stacks sampled in [start, end], optionally limited to some thread ids."""
+        out = Counter()
+        for ts, tid, stack in list(self._samples):
+            if start <= ts <= end and (threads is None or tid in threads):
+                out[stack] += 1
+        return out
+
+_sampler: Optional[StackSampler] = None
+
+def _dump_profile(route: str, start: float, end: float) -> None:
+    stacks = _sampler.collapsed(start, end)
+    if not stacks:
+        return
+    Path(PROFILES_DIR).mkdir(parents=True, exist_ok=True)
+    name = "".join(c if c.isalnum() else "_" for c in route).strip("_") or "root"
+    path = Path(PROFILES_DIR) / f"{int(time.time() * 1000)}-{name}-{(end - start) * 1000:.0f}ms.folded"
+    path.write_text("".join(f"{stack} {n}\n" for stack, n in stacks.most_common()))
+    print(f"[WARN] Slow request {route} ({(end - start) * 1000:.0f} ms); profile written to {path}")
+
+
+# ---------- Middleware ----------
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+_NON_TOKEN = re.compile(r"[^A-Za-z0-9_.-]")
+
+def _server_timing(total: float, stats: RequestStats) -> str:
+    parts = [f"app;dur={total * 1000:.1f}",
+             f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.db_queries} queries"']
+    # Metric names must be HTTP tokens: "inference_rpc:sentiment" -> "inference_rpc_sentiment"
+    parts += [f"{_NON_TOKEN.sub('_', name)};dur={secs * 1000:.1f}" for name, secs in stats.spans.items()]
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+        global _sampler
+        if PROFILE_SLOW_MS > 0 and _sampler is None:
+            _sampler = StackSampler(PROFILE_INTERVAL_MS / 1000)
+            _sampler.start()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current.set(stats)
+        t0 = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(time.perf_counter() - t0, stats).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        IN_FLIGHT.inc((), 1)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.inc((), -1)
+            elapsed = time.perf_counter() - t0
+            _current.reset(token)
+            method, route = scope["method"], _route_template(scope)
+            REQUEST_SECONDS.observe((method, route, str(status)), elapsed)
+            REQUEST_DB_SECONDS.observe((method, route), stats.db_seconds)
+            REQUEST_QUERIES.inc((method, route), stats.db_queries)
+            if _sampler is not None and elapsed * 1000 >= PROFILE_SLOW_MS:
+                # Sync endpoints run in the threadpool, so every busy thread is kept
+                _sampler.request_dump(f"{method} {route}", t0, t0 + elapsed)
+
+
+# ---------- Export ----------
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def render_prometheus() -> str:
+    lines = []
+    for name, kind, help_text, metric, label_names in _METRICS:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if isinstance(metric, Histogram):
+            for labels, (counts, total, n) in sorted(metric.snapshot().items()):
+                cumulative = 0
+                for bound, c in zip(metric.buckets + (float("inf"),), counts):
+                    cumulative += c
+                    le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                    lines.append(f"{name}_bucket{_labels(label_names, labels, le)} {cumulative}")
+                lines.append(f"{name}_sum{_labels(label_names, labels)} {total:.6f}")
+                lines.append(f"{name}_count{_labels(label_names, labels)} {n}")
+        else:
+            for labels, value in sorted(metric.snapshot().items()):
+                lines.append(f"{name}{_labels(label_names, labels)} {value:g}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,95 @@
+import torch
+import torch.nn as nn
+from torchvision import models
+import json
+from pathlib import Path
+
+from app.backend.config import IMGNET_LABELS_JSON
+from app.backend.metrics import span
+from app.backend.ml.preprocess import preprocess
+
+# -----------------------------
+# Load MobileNetV2 Pretrained
+# -----------------------------
+_device = torch.device("cpu")
+
+_model = models.mobilenet_v2(pretrained=True)
+_model.eval()
+# Inputs from ml.preprocess are channels-last; matching the weights avoids a layout conversion per conv
+_model = _model.to(memory_format=torch.channels_last)
+
+# -----------------------------
+# ImageNet Labels
+# -----------------------------
+if not Path(IMGNET_LABELS_JSON).exists():
+    import urllib.request
+    labels_url = "https://raw.githubusercontent.com/pytorch/hub/master/imagenet_classes.txt"
+    Path(IMGNET_LABELS_JSON).parent.mkdir(parents=True, exist_ok=True)
+    urllib.request.urlretrieve(labels_url, IMGNET_LABELS_JSON)
+
+with open(IMGNET_LABELS_JSON) as f:
+    idx_to_label = [line.strip() for line in f.readlines()]
+
+# -----------------------------
+# Food Keywords for Filtering
+# -----------------------------
+FOOD_KEYWORDS = [
+    "dish", "food", "drink", "bread", "cake", "pizza", "burger", "sandwich",
+    "soup", "noodle", "pasta", "rice", "fruit", "vegetable", "salad",
+    "egg", "cheese", "meat", "fish", "chicken", "beef", "pork", "lamb",
+    "seafood", "bean", "nut", "potato", "tomato", "carrot", "onion",
+    "ice cream", "dessert", "milk", "coffee", "tea", "juice", "bottle"
+]
+
+def _is_food_label(label: str) -> bool:
+    l = label.lower()
+    return any(keyword in l for keyword in FOOD_KEYWORDS)
+
+# -----------------------------
+# Main Function
+# -----------------------------
+def _food_labels(probs, topk: int):
+    # Get top-N broader set, then filter for food
+    top_probs, top_idxs = probs.topk(50)
+    results = [(idx_to_label[idx], float(prob)) for idx, prob in zip(top_idxs, top_probs)]
+
+    # Keep only likely food labels
+    food_results = [(lbl, prob) for lbl, prob in results if _is_food_label(lbl)]
+
+    # Return top-k food predictions
+    if food_results:
+        return food_results[:topk]
+    else:
+        return [("No food detected", 0.0)]
+
+def tag_food_image(img, topk: int = 3):
+    """Classify a food image using MobileNetV2 and return top-k likely food predictions.
+
+    `img` may be a PIL image, a path, bytes or a file object; the latter three are decoded
+    at reduced scale (JPEG draft mode). A 224x224 image (the image store's "model"
+    derivative) skips the resize.
+    """
+    return tag_food_images([img], topk=topk)[0]
+
+def tag_food_images(images, topk: int = 3):
+    """`tag_food_image` for many images with one batched forward pass (used by the inference server)."""
+    out = [None] * len(images)
+    batch, rows = [], []
+    with span("image_preprocess"):
+        for i, img in enumerate(images):
+            try:
+                batch.append(preprocess(img).clone())  # preprocess reuses one buffer per thread
+                rows.append(i)
+            except Exception as e:
+                out[i] = [("Error", str(e))]
+    if batch:
+        try:
+            inp = torch.cat(batch).contiguous(memory_format=torch.channels_last).to(_device)
+            with span("image_inference"), torch.no_grad():
+                probs = torch.nn.functional.softmax(_model(inp), dim=1)
+            for row, p in zip(rows, probs):
+                out[row] = _food_labels(p, topk)
+        except Exception as e:
+            for row in rows:
+                out[row] = [("Error", str(e))]
+    return out
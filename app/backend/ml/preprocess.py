@@ -0,0 +1,70 @@
+"""Fused decode + preprocessing for the MobileNetV2 tagger.
+
+Same result as Resize(256) -> CenterCrop(224) -> ToTensor -> Normalize, with
+far less work on phone photos:
+
+- JPEGs are decoded in draft mode at the smallest 1/2..1/8 DCT scale that
+  still covers the 256 px short side (a 12 MP photo decodes as ~0.75 MP)
+- resize and crop are a single PIL resize of the kept source box straight to
+  224x224 (no 256 px intermediate)
+- uint8 -> normalised float happens in place in a preallocated per-thread
+  (1, 3, 224, 224) channels-last tensor; channels-last has the same memory
+  order as PIL's HWC pixels, so the copy is a straight convert
+"""
+import io
+import threading
+
+import numpy as np
+import torch
+from PIL import Image
+
+from app.backend.images import MODEL_CROP, MODEL_RESIZE, model_crop
+
+_MEAN = torch.tensor([0.485, 0.456, 0.406]).view(1, 3, 1, 1) * 255
+_INV_STD = 1 / (torch.tensor([0.229, 0.224, 0.225]).view(1, 3, 1, 1) * 255)
+
+# EXIF orientation -> transpose that makes the pixels upright
+_ORIENTATION = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT, 3: Image.Transpose.ROTATE_180, 4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE, 6: Image.Transpose.ROTATE_270, 7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+_local = threading.local()
+
+
+def open_image(source) -> Image.Image:
+    """Decode a path, bytes or file object as upright RGB, at reduced scale where the format allows."""
+    if isinstance(source, Image.Image):
+        return source if source.mode == "RGB" else source.convert("RGB")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    img = Image.open(source)
+    img.draft("RGB", (MODEL_RESIZE, MODEL_RESIZE))  # no-op for non-JPEG
+    orientation = img.getexif().get(0x0112, 1)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if orientation in _ORIENTATION:
+        img = img.transpose(_ORIENTATION[orientation])
+    return img
+
+
+def to_tensor(img: Image.Image) -> torch.Tensor:
+    """Normalised (1, 3, 224, 224) channels-last tensor.
+
+    Returns this thread's reusable buffer: consume it before the next call on the same thread.
+    """
+    bufs = getattr(_local, "bufs", None)
+    if bufs is None:
+        u8 = np.empty((MODEL_CROP, MODEL_CROP, 3), dtype=np.uint8)
+        out = torch.empty((1, 3, MODEL_CROP, MODEL_CROP)).contiguous(memory_format=torch.channels_last)
+        bufs = _local.bufs = (u8, torch.from_numpy(u8).permute(2, 0, 1).unsqueeze(0), out)
+    u8, u8_nchw, out = bufs
+    u8[...] = np.asarray(img)
+    out.copy_(u8_nchw)
+    return out.sub_(_MEAN).mul_(_INV_STD)
+
+
+def preprocess(source) -> torch.Tensor:
+    """Path/bytes/file/PIL image -> normalised model input tensor."""
+    return to_tensor(model_crop(open_image(source)))
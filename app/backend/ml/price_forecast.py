@@ -4,6 +4,8 @@ warnings.filterwarnings("ignore")
 
 import pandas as pd
 
+from app.backend.metrics import span
+
 # Prophet import with fallback
 try:
     from prophet import Prophet
@@ -120,11 +122,14 @@ def forecast_prices(
 
     # Choose method with fallbacks
     if method == "prophet" and HAVE_PROPHET:
-        fcst = forecast_prophet(data, "date", "price", periods=periods, freq=freq)
+        with span("forecast_prophet"):
+            fcst = forecast_prophet(data, "date", "price", periods=periods, freq=freq)
     elif method == "arima" and HAVE_PMDARIMA:
-        fcst = forecast_arima_pmdarima(data, "date", "price", periods=periods, freq=freq)
+        with span("forecast_pmdarima"):
+            fcst = forecast_arima_pmdarima(data, "date", "price", periods=periods, freq=freq)
     elif HAVE_STATSMODELS:  # last resort fallback
-        fcst = forecast_arima_statsmodels(data, "date", "price", periods=periods, freq=freq)
+        with span("forecast_statsmodels"):
+            fcst = forecast_arima_statsmodels(data, "date", "price", periods=periods, freq=freq)
     else:
         raise ImportError("No forecasting library available (prophet, pmdarima, or statsmodels).")
 
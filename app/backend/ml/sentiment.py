@@ -0,0 +1,86 @@
+import os
+
+import torch
+from transformers import pipeline
+
+from app.backend.config import SENTIMENT_MODEL_NAME as MODEL_NAME
+from app.backend.config import SENTIMENT_MODEL_REVISION as MODEL_REVISION
+from app.backend.metrics import span
+
+# Long texts are scored as overlapping token windows; more than MAX_WINDOWS are
+# thinned to evenly spaced ones so a very long report still costs one bounded pass
+WINDOW_OVERLAP = int(os.getenv("SENTIMENT_WINDOW_OVERLAP", "64"))
+MAX_WINDOWS = int(os.getenv("SENTIMENT_MAX_WINDOWS", "32"))
+
+# Load once (cached in memory)
+_sentiment = pipeline(
+    "sentiment-analysis",
+    model=MODEL_NAME,
+    revision=MODEL_REVISION,
+    device=-1   # force CPU (works on Streamlit Cloud)
+)
+_tokenizer, _model = _sentiment.tokenizer, _sentiment.model
+_model.eval()
+# Room for [CLS] and [SEP] inside the model's 512-token limit
+WINDOW_TOKENS = min(_tokenizer.model_max_length, 512) - _tokenizer.num_special_tokens_to_add()
+
+
+def _windows(ids):
+    """Overlapping WINDOW_TOKENS-long slices covering `ids` (one slice if it already fits)."""
+    if len(ids) <= WINDOW_TOKENS:
+        return [ids]
+    step = WINDOW_TOKENS - WINDOW_OVERLAP
+    starts = list(range(0, len(ids) - WINDOW_TOKENS, step)) + [len(ids) - WINDOW_TOKENS]
+    if len(starts) > MAX_WINDOWS:
+        starts = [starts[round(i * (len(starts) - 1) / max(MAX_WINDOWS - 1, 1))] for i in range(MAX_WINDOWS)]
+    return [ids[s:s + WINDOW_TOKENS] for s in starts]
+
+def _window_probs(windows, batch_size: int):
+    """Class probabilities per window; windows are length-sorted so batches pad little."""
+    order = sorted(range(len(windows)), key=lambda i: len(windows[i]))
+    probs = torch.empty((len(windows), _model.config.num_labels))
+    for start in range(0, len(order), batch_size):
+        rows = order[start:start + batch_size]
+        enc = _tokenizer.pad(
+            {"input_ids": [_tokenizer.build_inputs_with_special_tokens(windows[i]) for i in rows]},
+            return_tensors="pt",
+        )
+        with torch.no_grad():
+            probs[rows] = _model(**enc).logits.softmax(dim=-1)
+    return probs
+
+
+def analyze_sentiment(text: str):
+    """Return positive/neutral/negative score for a given text."""
+    return analyze_sentiment_batch([text])[0]
+
+def analyze_sentiment_batch(texts, batch_size: int = 32):
+    """`analyze_sentiment` for many texts, each tokenised once and scored in full.
+
+    Texts longer than the model's 512-token limit are split into overlapping
+    windows; every window of every text goes through the same batched forward
+    passes, and a text's score is the window probabilities averaged by window
+    length. Short texts are a single window, so they cost what they did before.
+    """
+    out = [{"label": "EMPTY", "score": 0.0} for _ in texts]
+    rows = [i for i, t in enumerate(texts) if t and t.strip()]
+    if not rows:
+        return out
+    with span("sentiment_inference"):
+        ids = _tokenizer([texts[i] for i in rows], add_special_tokens=False, truncation=False,
+                         return_attention_mask=False, verbose=False)["input_ids"]
+        windows, owner = [], []
+        for row, text_ids in zip(rows, ids):
+            for w in _windows(text_ids):
+                windows.append(w)
+                owner.append(row)
+        probs = _window_probs(windows, batch_size)
+        weights = torch.tensor([float(max(len(w), 1)) for w in windows])
+        owner_t = torch.tensor(owner)
+        summed = torch.zeros((len(texts), probs.shape[1])).index_add_(0, owner_t, probs * weights[:, None])
+        totals = torch.zeros(len(texts)).index_add_(0, owner_t, weights)
+        for row in rows:
+            p = summed[row] / totals[row]
+            label = int(p.argmax())
+            out[row] = {"label": _model.config.id2label[label], "score": float(p[label])}
+    return out
@@ -1,5 +1,6 @@
 from datetime import datetime
-from typing import Optional, List
+from enum import Enum
+from typing import Optional, List, Dict
 from sqlmodel import Field, SQLModel
 
 #  User Models
@@ -13,9 +14,15 @@ class User(UserBase, table=True):
     password: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+# Self-registration always creates "donor"; admins grant the others (PUT /api/admin/users/{id}/role)
+USER_ROLES = ("donor", "ngo", "admin")
+
 class UserCreate(UserBase):
     password: str
 
+class RoleUpdate(SQLModel):
+    role: str
+
 class UserRead(UserBase):
     id: int
     created_at: datetime
@@ -24,19 +31,39 @@ class UserLogin(SQLModel):
     email: str
     password: str
 
+class Principal(SQLModel):
+    """Authenticated caller, decoded from an access token."""
+    id: int
+    email: str
+    role: str
+
 # Donation Models
+class DonationStatus(str, Enum):
+    PENDING = "pending"
+    CLAIMED = "claimed"
+    DELIVERED = "delivered"
+
+# Legacy free-text statuses that still mean "nobody has claimed this yet" (lower-case;
+# stored values vary in case, so compare against lower(status))
+CLAIMABLE_STATUSES = [DonationStatus.PENDING.value, "available", "open"]
+
 class DonationBase(SQLModel):
     title: str
     description: Optional[str] = None
     quantity: Optional[int] = 1
     category: Optional[str] = "Food"
-    status: Optional[str] = "pending"
+    status: Optional[str] = Field(default=DonationStatus.PENDING.value, index=True)
     donor_id: Optional[int] = None
-    community_id: Optional[int] = None
+    community_id: Optional[int] = Field(default=None, index=True)
 
 class Donation(DonationBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+    # Bumped on every state change; lets clients do compare-and-set claims
+    version: int = Field(default=0)
+    claimed_by: Optional[str] = None
+    ngo_contact: Optional[str] = None
+    claimed_at: Optional[datetime] = None
 
 class DonationCreate(DonationBase):
     pass
@@ -44,6 +71,34 @@ class DonationCreate(DonationBase):
 class DonationRead(DonationBase):
     id: int
     timestamp: datetime
+    version: int = 0
+    claimed_by: Optional[str] = None
+    claimed_at: Optional[datetime] = None
+
+class DonationClaim(SQLModel):
+    ngo_name: str
+    ngo_contact: Optional[str] = None
+
+class BulkClaimRequest(DonationClaim):
+    donation_ids: List[int]
+    # all_or_nothing: roll back and 409 if any id can't be claimed
+    all_or_nothing: bool = False
+
+class BulkClaimResult(SQLModel):
+    claimed: List[int]
+    conflicts: List[int]
+    not_found: List[int]
+
+class BulkIngestRow(SQLModel):
+    row: int  # 0-based position of the record in the upload
+    id: Optional[int] = None
+    errors: Optional[List[str]] = None
+
+class BulkIngestResult(SQLModel):
+    received: int
+    created: int
+    failed: int
+    results: List[BulkIngestRow]
 
 # Community Models
 class CommunityBase(SQLModel):
@@ -62,6 +117,20 @@ class CommunityCreate(CommunityBase):
 class CommunityRead(CommunityBase):
     id: int
 
+class CommunityStats(SQLModel, table=True):
+    """Materialised per-community donation aggregates (see app.backend.aggregates)."""
+    __tablename__ = "community_stats"
+    community_id: int = Field(primary_key=True)
+    need_level: int = 0
+    donations_received: int = 0
+    quantity_received: int = 0
+    delivered_quantity: int = 0
+    open_count: int = 0
+    claimed_count: int = 0
+    delivered_count: int = 0
+    severity: float = 0.0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
 # Delivery Models
 class DeliveryBase(SQLModel):
     donation_id: int
@@ -117,6 +186,22 @@ class MoodLog(SQLModel, table=True):
     mood: str
     note: Optional[str] = None
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+    # Model label for `note`, filled in by the rescore_sentiment job
+    sentiment: Optional[str] = None
+    sentiment_score: Optional[float] = None
+    sentiment_model: Optional[str] = None   # SENTIMENT_MODEL_TAG that produced it
+
+class RollupBucket(SQLModel, table=True):
+    """Hourly/daily pre-aggregated counts (see app.backend.rollups)."""
+    __tablename__ = "rollup_bucket"
+    # key order matches the range query: (granularity, source, dimension) then time
+    granularity: str = Field(primary_key=True)    # "hour" | "day"
+    source: str = Field(primary_key=True)         # "donation" | "mood"
+    dimension: str = Field(primary_key=True)      # "all" | "category" | "status" | "mood"
+    bucket_start: datetime = Field(primary_key=True)
+    value: str = Field(primary_key=True)
+    count: int = 0
+    quantity: int = 0
 
 class MoodLogCreate(SQLModel):
     user_id: Optional[int] = None
@@ -129,10 +214,20 @@ class MoodLogRead(SQLModel):
     mood: str
     note: Optional[str]
     timestamp: datetime
+    sentiment: Optional[str] = None
+    sentiment_score: Optional[float] = None
 
 # Admin Models (Read-Only)
+class DailyCount(SQLModel):
+    day: str
+    count: int
+
 class AdminSummary(SQLModel):
     total_users: int
     total_donations: int
     total_communities: int
     total_deliveries: int
+    donations_by_status: Dict[str, int] = {}
+    deliveries_by_status: Dict[str, int] = {}
+    donations_by_day: List[DailyCount] = []
+    generated_at: Optional[datetime] = None
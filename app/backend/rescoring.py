@@ -0,0 +1,179 @@
+# app/backend/rescoring.py
+"""Offline sentiment (re-)labelling of stored notes.
+
+Mood labels used to be computed one at a time at write time, so older rows
+have none and a new model revision could only apply to new rows. `rescore`
+walks a source's notes in id order (keyset pagination, RESCORE_CHUNK_SIZE
+rows per query), keeping only rows with no label or one from a model other
+than SENTIMENT_MODEL_TAG, scores each chunk in RESCORE_BATCH_SIZE batches
+across a worker pool and writes the labels back with one bulk UPDATE per
+chunk. The next chunk is read and the previous one written while the pool
+scores, so the model is rarely idle.
+
+After every written chunk the last id is checkpointed to
+SENTIMENT_RESCORE_STATE, so an interrupted run resumes where it stopped and
+a finished one only looks at rows added since. Changing MODEL_REVISION
+changes the tag, which restarts the walk from the first row.
+
+Sources: "moodlog" (MoodLog.note -> sentiment / sentiment_score /
+sentiment_model) and "workflow" (the donor–NGO store's note -> mood /
+mood_score / mood_model).
+
+Workers: with an inference server running, threads that keep its batcher
+full; otherwise processes that each load the model with an even share of
+the CPU threads. The processes are spawned, not forked: the job worker that
+runs this already has scheduler, queue and DB-pool threads, and forking a
+threaded process can deadlock the child on a lock copied mid-use.
+"""
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.backend.config import SENTIMENT_MODEL_TAG, SENTIMENT_RESCORE_STATE, WORKFLOW_DB
+
+RESCORE_CHUNK_SIZE = int(os.getenv("RESCORE_CHUNK_SIZE", "2000"))
+RESCORE_BATCH_SIZE = int(os.getenv("RESCORE_BATCH_SIZE", "64"))
+RESCORE_WORKERS = int(os.getenv("RESCORE_WORKERS", "2"))
+
+
+# ---------- Sources ----------
+class MoodLogSource:
+    name = "moodlog"
+
+    def fetch(self, after_id: int, limit: int, model: str) -> List[Tuple[int, str]]:
+        from sqlalchemy import func, or_, select
+        from sqlmodel import Session
+        from app.backend import models
+        from app.backend.database import engine
+        M = models.MoodLog
+        stmt = (select(M.id, M.note)
+                .where(M.id > after_id, func.trim(func.coalesce(M.note, "")) != "",
+                       or_(M.sentiment_model.is_(None), M.sentiment_model != model))
+                .order_by(M.id).limit(limit))
+        with Session(engine) as session:
+            return [tuple(row) for row in session.execute(stmt).all()]
+
+    def write(self, rows: List[Tuple[int, str, float]], model: str) -> None:
+        from sqlalchemy import update
+        from sqlmodel import Session
+        from app.backend import models
+        from app.backend.database import engine
+        with Session(engine) as session:
+            # ORM bulk UPDATE by primary key: one executemany for the whole chunk
+            session.execute(update(models.MoodLog), [
+                {"id": i, "sentiment": label, "sentiment_score": score, "sentiment_model": model}
+                for i, label, score in rows
+            ])
+            session.commit()
+
+
+class WorkflowSource:
+    name = "workflow"
+
+    def __init__(self, db_path=WORKFLOW_DB):
+        from app.backend.workflow.store import DonationStore
+        self.store = DonationStore(db_path)
+
+    def fetch(self, after_id, limit, model):
+        return self.store.notes_to_score(model, after_id, limit)
+
+    def write(self, rows, model):
+        self.store.set_moods(rows, model)
+
+
+SOURCES: Dict[str, Callable[[], object]] = {"moodlog": MoodLogSource, "workflow": WorkflowSource}
+
+
+# ---------- Checkpoints ----------
+def load_checkpoints(path=None) -> dict:
+    path = path or SENTIMENT_RESCORE_STATE
+    try:
+        return json.loads(Path(path).read_text())
+    except FileNotFoundError:
+        return {}
+    except ValueError:
+        print(f"[WARN] Unreadable rescore checkpoint {path}; starting over")
+        return {}
+
+def save_checkpoint(source: str, state: dict, path=None) -> None:
+    path = Path(path or SENTIMENT_RESCORE_STATE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    checkpoints = load_checkpoints(path)
+    checkpoints[source] = state
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(checkpoints, indent=2))
+    tmp.replace(path)
+
+
+# ---------- Scoring ----------
+def _init_worker(threads: int) -> None:
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+def _score(texts: List[str]) -> List[Tuple[str, float]]:
+    from app.backend.sentiment_engines import get_engine
+    return [(r["label"], r["score"]) for r in get_engine("transformer").analyze_batch(texts)]
+
+def _pool(workers: int) -> Executor:
+    from app.backend.inference import get_client
+    if get_client() is not None:
+        return ThreadPoolExecutor(workers, thread_name_prefix="rescore")
+    threads = max((os.cpu_count() or 1) // workers, 1)
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker, initargs=(threads,))
+
+
+def rescore(source: str = "moodlog", *, chunk_size: int = RESCORE_CHUNK_SIZE,
+            batch_size: int = RESCORE_BATCH_SIZE, workers: int = RESCORE_WORKERS,
+            limit: Optional[int] = None, restart: bool = False, model: str = SENTIMENT_MODEL_TAG,
+            progress: Optional[Callable[[dict], None]] = None) -> dict:
+    """Label every unscored or stale note in `source` (at most `limit` this run); returns run stats."""
+    src = SOURCES[source]()
+    state = load_checkpoints().get(source)
+    if restart or not state or state.get("model") != model:
+        state = {"model": model, "last_id": 0, "scored": 0}
+    stats = {"source": source, "model": model, "resumed_from": state["last_id"], "scored": 0}
+    t0 = time.perf_counter()
+
+    def chunks():
+        after, remaining = state["last_id"], limit
+        while remaining is None or remaining > 0:
+            rows = src.fetch(after, chunk_size if remaining is None else min(chunk_size, remaining), model)
+            if not rows:
+                return
+            yield rows
+            after = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def flush(rows, futures):
+        labels = [label for fut in futures for label in fut.result()]
+        src.write([(i, label, score) for (i, _), (label, score) in zip(rows, labels)], model)
+        state.update(last_id=rows[-1][0], scored=state["scored"] + len(rows),
+                     updated_at=datetime.utcnow().isoformat())
+        save_checkpoint(source, state)
+        stats["scored"] += len(rows)
+        if progress:
+            progress({**stats, "last_id": state["last_id"], "seconds": time.perf_counter() - t0})
+
+    with _pool(workers) as pool:
+        pending = None
+        for rows in chunks():
+            texts = [note for _, note in rows]
+            futures = [pool.submit(_score, texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+            if pending:
+                flush(*pending)
+            pending = (rows, futures)
+        if pending:
+            flush(*pending)
+
+    stats.update(last_id=state["last_id"], seconds=round(time.perf_counter() - t0, 2))
+    return stats
@@ -0,0 +1,154 @@
+# app/backend/rollups.py
+"""Hourly/daily rollups of donations and mood logs for trend dashboards.
+
+Each `rollup_bucket` row is (granularity, bucket_start, source, dimension,
+value) -> count, quantity; e.g. ("day", 2025-10-09, "donation", "category",
+"Food") -> 42 donations / 310 units. Writers bump buckets in their own
+transaction; `compact_rollups` rebuilds a time window from the raw tables
+with GROUP BY (run periodically, and to backfill rows such as mood logs
+written outside the API).
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+from sqlalchemy import and_, delete, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from app.backend import models
+from app.backend.aggregates import status_bucket, status_bucket_expr
+
+GRANULARITIES = ("hour", "day")
+R = models.RollupBucket
+
+
+# ---------- Helpers ----------
+def floor_ts(ts: datetime, granularity: str) -> datetime:
+    ts = ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0) if granularity == "day" else ts
+
+def _bump(session: Session, granularity: str, start: datetime, source: str, dimension: str, value: str,
+          count: int, quantity: int = 0) -> None:
+    key = and_(R.granularity == granularity, R.bucket_start == start, R.source == source,
+               R.dimension == dimension, R.value == value)
+    bump = update(R).where(key).values(count=R.count + count, quantity=R.quantity + quantity)
+    if session.execute(bump).rowcount:
+        return
+    try:
+        with session.begin_nested():
+            session.add(models.RollupBucket(granularity=granularity, bucket_start=start, source=source,
+                                            dimension=dimension, value=value, count=count, quantity=quantity))
+    except IntegrityError:
+        session.execute(bump)  # another writer created the bucket first
+
+def _donation_dims(category: Optional[str], status: Optional[str]):
+    return [("all", ""), ("category", category or "Other"), ("status", status_bucket(status))]
+
+
+# ---------- Incremental updates (caller commits) ----------
+def record_donation(session: Session, donation: models.Donation) -> None:
+    qty = donation.quantity or 0
+    for gran in GRANULARITIES:
+        start = floor_ts(donation.timestamp, gran)
+        for dim, val in _donation_dims(donation.category, donation.status):
+            _bump(session, gran, start, "donation", dim, val, 1, qty)
+
+def record_donations(session: Session, donations: Iterable[models.Donation]) -> None:
+    """`record_donation` for a batch: one bump per distinct bucket instead of six per donation."""
+    count, qty = Counter(), Counter()
+    for d in donations:
+        for gran in GRANULARITIES:
+            start = floor_ts(d.timestamp, gran)
+            for dim, val in _donation_dims(d.category, d.status):
+                count[gran, start, dim, val] += 1
+                qty[gran, start, dim, val] += d.quantity or 0
+    for (gran, start, dim, val), n in count.items():
+        _bump(session, gran, start, "donation", dim, val, n, qty[gran, start, dim, val])
+
+def record_status_moves(session: Session, moves: Iterable[tuple], old_status: str, new_status: str) -> None:
+    """Move donations between status buckets. `moves` holds (timestamp, quantity) per donation."""
+    old, new = status_bucket(old_status), status_bucket(new_status)
+    if old == new:
+        return
+    for gran in GRANULARITIES:
+        per_bucket, qty = Counter(), Counter()
+        for ts, quantity in moves:
+            start = floor_ts(ts, gran)
+            per_bucket[start] += 1
+            qty[start] += quantity or 0
+        for start, n in per_bucket.items():
+            _bump(session, gran, start, "donation", "status", old, -n, -qty[start])
+            _bump(session, gran, start, "donation", "status", new, n, qty[start])
+
+def record_mood(session: Session, log: models.MoodLog) -> None:
+    for gran in GRANULARITIES:
+        _bump(session, gran, floor_ts(log.timestamp, gran), "mood", "mood", log.mood, 1)
+
+
+# ---------- Compaction / backfill ----------
+def _bucket_expr(dialect: str, granularity: str, col):
+    if dialect == "postgresql":
+        return func.date_trunc(granularity, col)
+    # SQLite: emit the same text format SQLAlchemy stores for DateTime so keys line up
+    fmt = "%Y-%m-%d %H:00:00.000000" if granularity == "hour" else "%Y-%m-%d 00:00:00.000000"
+    return func.strftime(fmt, col)
+
+def compact_rollups(session: Session, since: Optional[datetime] = None, until: Optional[datetime] = None) -> int:
+    """Rebuild all buckets in [since, until) from the raw tables; returns rows written.
+
+    `since` is floored to a day boundary so no bucket is ever half-rebuilt.
+    """
+    dialect = session.get_bind().dialect.name
+    D, M = models.Donation, models.MoodLog
+    since = floor_ts(since, "day") if since else None
+    until = floor_ts(until, "day") if until else None
+    written = 0
+
+    for gran in GRANULARITIES:
+        window = [R.granularity == gran]
+        if since:
+            window.append(R.bucket_start >= since)
+        if until:
+            window.append(R.bucket_start < until)
+        session.execute(delete(R).where(*window))
+
+        sources = [
+            (D, "donation", "all", literal(""), func.coalesce(D.quantity, 0)),
+            (D, "donation", "category", func.coalesce(D.category, "Other"), func.coalesce(D.quantity, 0)),
+            (D, "donation", "status", status_bucket_expr(D.status), func.coalesce(D.quantity, 0)),
+            (M, "mood", "mood", M.mood, literal(0)),
+        ]
+        for model, source, dim, value_expr, qty_expr in sources:
+            bucket = _bucket_expr(dialect, gran, model.timestamp)
+            where = []
+            if since:
+                where.append(model.timestamp >= since)
+            if until:
+                where.append(model.timestamp < until)
+            rows = (
+                select(literal(gran), bucket, literal(source), literal(dim), value_expr,
+                       func.count(), func.sum(qty_expr))
+                .where(*where)
+                .group_by(bucket, value_expr)
+            )
+            res = session.execute(insert(R).from_select(
+                ["granularity", "bucket_start", "source", "dimension", "value", "count", "quantity"], rows))
+            written += res.rowcount or 0
+    session.commit()
+    return written
+
+
+# ---------- Queries ----------
+def query_rollups(session: Session, source: str, dimension: str = "all", granularity: str = "day",
+                  start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[dict]:
+    """Buckets for one source/dimension in [start, end), oldest first."""
+    end = end or datetime.utcnow() + timedelta(days=1)
+    start = start or end - timedelta(days=30)
+    stmt = (
+        select(R.bucket_start, R.value, R.count, R.quantity)
+        .where(R.granularity == granularity, R.source == source, R.dimension == dimension,
+               R.bucket_start >= floor_ts(start, granularity), R.bucket_start < end, R.count != 0)
+        .order_by(R.bucket_start, R.value)
+    )
+    return [dict(r) for r in session.execute(stmt).mappings().all()]
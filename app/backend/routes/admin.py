@@ -1,14 +1,83 @@
-from fastapi import APIRouter, Depends
+import os
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import String, cast, func, literal, union_all
 from sqlmodel import select, Session
+from app.backend.cache import TTLCache
 from app.backend.database import get_session
+from app.backend.dependencies import invalidate_role, require_role
 from app.backend import models
 
-router = APIRouter(prefix="/api/admin", tags=["Admin"])
+router = APIRouter(prefix="/api/admin", tags=["Admin"], dependencies=[Depends(require_role("admin"))])
+
+_summary_cache = TTLCache(ttl=float(os.getenv("ADMIN_SUMMARY_TTL_SECONDS", "10")), maxsize=32)
+
+def _summary_stmt(since: datetime):
+    """Every count the dashboard needs as one UNION ALL of (kind, key, n) rows."""
+    D, Dl = models.Donation, models.Delivery
+
+    def total(kind, model):
+        return select(literal(kind).label("kind"), literal(None, String).label("key"),
+                      func.count().label("n")).select_from(model)
+
+    def grouped(kind, expr, *where):
+        return select(literal(kind).label("kind"), cast(expr, String).label("key"),
+                      func.count().label("n")).where(*where).group_by(expr)
+
+    day = func.date(D.timestamp)
+    return union_all(
+        total("users", models.User),
+        total("donations", D),
+        total("communities", models.Community),
+        total("deliveries", Dl),
+        grouped("donation_status", func.coalesce(D.status, "unknown")),
+        grouped("delivery_status", func.coalesce(Dl.delivery_status, "unknown")),
+        grouped("donation_day", day, D.timestamp >= since),
+    )
+
+def _build_summary(session: Session, days: int) -> models.AdminSummary:
+    since = datetime.utcnow() - timedelta(days=days)
+    totals, by_kind = {}, {"donation_status": {}, "delivery_status": {}, "donation_day": {}}
+    for kind, key, n in session.execute(_summary_stmt(since)).all():
+        if key is None:
+            totals[kind] = n
+        else:
+            by_kind[kind][key] = n
+    return models.AdminSummary(
+        total_users=totals.get("users", 0),
+        total_donations=totals.get("donations", 0),
+        total_communities=totals.get("communities", 0),
+        total_deliveries=totals.get("deliveries", 0),
+        donations_by_status=by_kind["donation_status"],
+        deliveries_by_status=by_kind["delivery_status"],
+        donations_by_day=[models.DailyCount(day=d, count=n) for d, n in sorted(by_kind["donation_day"].items())],
+        generated_at=datetime.utcnow(),
+    )
+
+@router.get("/summary", response_model=models.AdminSummary)
+def get_summary(days: int = Query(30, ge=1, le=366), session: Session = Depends(get_session)):
+    """Totals plus per-status and per-day breakdowns, from COUNT aggregates in one query (cached briefly)."""
+    return _summary_cache.get_or_set(days, lambda: _build_summary(session, days))
 
 @router.get("/users", response_model=list[models.UserRead])
 def list_users(session: Session = Depends(get_session)):
     return session.exec(select(models.User)).all()
 
+@router.put("/users/{user_id}/role", response_model=models.UserRead)
+def set_user_role(user_id: int, update: models.RoleUpdate, session: Session = Depends(get_session)):
+    """Grant or revoke a role (the only way to become "ngo" or "admin")."""
+    if update.role not in models.USER_ROLES:
+        raise HTTPException(status_code=422, detail=f"role must be one of {', '.join(models.USER_ROLES)}")
+    user = session.get(models.User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    user.role = update.role
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    invalidate_role(user_id)  # other workers pick it up within ROLE_CACHE_TTL_SECONDS
+    return user
+
 @router.get("/donations", response_model=list[models.DonationRead])
 def list_donations(session: Session = Depends(get_session)):
     return session.exec(select(models.Donation)).all()
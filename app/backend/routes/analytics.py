@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select
 from app.backend.database import get_session
-from app.backend.models import Donation, Community
-from prophet import Prophet
-import pandas as pd
+from app.backend.dependencies import require_role
+from app.backend.models import Donation, Community, CommunityStats
+from app.backend.aggregates import refresh_community_stats
+from app.backend import rollups
+from fastapi.responses import JSONResponse
+from app.backend.jobs import get_queue
+from app.backend import tasks  # noqa: F401  (registers the job functions)
 
 router = APIRouter(tags=["Analytics"])
 
@@ -11,45 +17,74 @@ router = APIRouter(tags=["Analytics"])
 def get_food_need_severity(session: Session = Depends(get_session)):
     """
     Returns food need severity per community based on unmet donations.
+    Reads the materialised community_stats table (one row per community); it is
+    seeded at startup and rebuilt by POST /analytics/severity/refresh, never here.
     """
-    communities = session.exec(select(Community)).all()
-    if not communities:
+    C, S = Community, CommunityStats
+    stmt = (
+        select(
+            C.name.label("community"),
+            C.location,
+            S.need_level,
+            S.delivered_quantity.label("received_donations"),
+            S.donations_received,
+            S.quantity_received,
+            S.open_count,
+            S.claimed_count,
+            S.delivered_count,
+            S.severity,
+        )
+        .join(S, S.community_id == C.id)
+        .order_by(S.severity.desc())
+    )
+    data = session.execute(stmt).mappings().all()
+    if not data:
         raise HTTPException(status_code=404, detail="No communities found.")
 
-    data = []
-    for c in communities:
-        need_gap = max(c.need_level - c.received_donations, 0)
-        severity = min(round(need_gap / max(c.need_level, 1), 2), 1.0)
-        data.append({
-            "community": c.name,
-            "location": c.location,
-            "need_level": c.need_level,
-            "received_donations": c.received_donations,
-            "severity": severity
-        })
-
     return {"severity_index": data}
 
 
-@router.get("/forecasting/prices")
-def forecast_food_prices():
+@router.post("/analytics/severity/refresh", dependencies=[Depends(require_role("admin"))])
+def refresh_food_need_severity(session: Session = Depends(get_session)):
+    """Rebuild community_stats from donations with one GROUP BY (repairs any drift)."""
+    return {"communities": refresh_community_stats(session)}
+
+
+@router.get("/analytics/rollups")
+def get_rollups(
+    source: str = Query("donation", pattern="^(donation|mood)$"),
+    dimension: str = Query("all", pattern="^(all|category|status|mood)$"),
+    granularity: str = Query("day", pattern="^(hour|day)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    session: Session = Depends(get_session),
+):
     """
-    Uses Prophet to forecast food price trends for the next 30 days.
+    Time-bucketed counts/quantities for trend charts (defaults to the last 30 days).
     """
-    # Simulated historical price data (you can replace with actual)
-    df = pd.DataFrame({
-        "ds": pd.date_range(start="2024-01-01", periods=120),
-        "y": [100 + i*0.2 + (i % 7)*2 for i in range(120)]
-    })
+    return {"granularity": granularity, "source": source, "dimension": dimension,
+            "buckets": rollups.query_rollups(session, source, dimension, granularity, start, end)}
+
 
-    model = Prophet(daily_seasonality=True)
-    model.fit(df)
-    future = model.make_future_dataframe(periods=30)
-    forecast = model.predict(future)
+@router.post("/analytics/rollups/compact", dependencies=[Depends(require_role("admin"))])
+def compact_rollups(since: Optional[datetime] = None, until: Optional[datetime] = None,
+                    session: Session = Depends(get_session)):
+    """Rebuild rollup buckets in [since, until) from the raw donation and mood-log tables."""
+    return {"rows": rollups.compact_rollups(session, since, until)}
 
-    return {
-        "forecast": forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]].tail(30).to_dict(orient="records")
-    }
+
+@router.get("/forecasting/prices")
+def forecast_food_prices():
+    """
+    Food price trend for the next 30 days (Prophet), served from the background job queue.
+    Returns the latest finished forecast, or 202 with a job id to poll while the first one runs.
+    """
+    queue = get_queue()
+    done = queue.latest("simulated_price_forecast")
+    if done:
+        return {"forecast": done["result"], "generated_at": done["finished_at"]}
+    job_id = queue.submit("simulated_price_forecast")
+    return JSONResponse(status_code=202, content={"job_id": job_id, "status_url": f"/api/jobs/{job_id}"})
 
 
 @router.post("/donor-matching/match")
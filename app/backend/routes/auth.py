@@ -1,42 +1,82 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
-from passlib.context import CryptContext
 from sqlmodel import select, Session
+from starlette.concurrency import run_in_threadpool
 from app.backend.database import get_session
 from app.backend import models
+from app.backend.security import (
+    hash_password,
+    verify_password,
+    verify_dummy_password,
+    login_limiter,
+    HashingBusy,
+    create_access_token,
+    ACCESS_TOKEN_TTL_SECONDS,
+)
 
 router = APIRouter(prefix="/api/auth", tags=["Auth"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# The handlers are async so bcrypt can be awaited in its process pool; the
+# blocking database work below runs in the threadpool, off the event loop.
+def _find_user(session: Session, email: str) -> Optional[models.User]:
+    return session.exec(select(models.User).where(models.User.email == email)).first()
+
+def _save(session: Session, user: models.User) -> models.User:
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    return user
 
 @router.post("/register", response_model=models.UserRead)
-def register(user_in: models.UserCreate, session: Session = Depends(get_session)):
-    existing_user = session.exec(
-        select(models.User).where(models.User.email == user_in.email)
-    ).first()
+async def register(user_in: models.UserCreate, session: Session = Depends(get_session)):
+    existing_user = await run_in_threadpool(_find_user, session, user_in.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = pwd_context.hash(user_in.password)
+    try:
+        hashed_password = await hash_password(user_in.password)
+    except HashingBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
     user = models.User(
         name=user_in.name,
         email=user_in.email,
         password=hashed_password,
-        role=user_in.role or "donor"
+        role="donor",  # elevated roles are granted by an admin, never self-assigned
     )
-    session.add(user)
-    session.commit()
-    session.refresh(user)
-    return user
+    return await run_in_threadpool(_save, session, user)
 
 @router.post("/login")
-def login(credentials: models.UserLogin, session: Session = Depends(get_session)):
-    user = session.exec(
-        select(models.User).where(models.User.email == credentials.email)
-    ).first()
-    if not user or not pwd_context.verify(credentials.password, user.password):
+async def login(credentials: models.UserLogin, session: Session = Depends(get_session)):
+    # Shed brute-force attempts before spending any bcrypt CPU on them
+    retry_after = login_limiter.hit(credentials.email)
+    if retry_after is not None:
+        raise HTTPException(status_code=429, detail="Too many login attempts",
+                            headers={"Retry-After": str(retry_after)})
+
+    user = await run_in_threadpool(_find_user, session, credentials.email)
+    try:
+        if user:
+            valid, new_hash = await verify_password(credentials.password, user.password)
+        else:
+            # Spend the same bcrypt time, so response timing doesn't reveal which emails exist
+            valid, new_hash = await verify_dummy_password(credentials.password), None
+    except HashingBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    login_limiter.reset(credentials.email)
+    if new_hash:
+        # Stored hash used an older cost/scheme; upgrade it transparently
+        user.password = new_hash
+        await run_in_threadpool(_save, session, user)
+
     return {
         "message": "Login successful",
+        "access_token": create_access_token(user.id, user.role or "donor", user.email),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_TTL_SECONDS,
         "user": {
             "id": user.id,
             "name": user.name,
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import select, Session
 from app.backend.database import get_session
 from app.backend import models
+from app.backend import aggregates
 
 router = APIRouter(prefix="/api/communities", tags=["Communities"])
 
@@ -9,6 +10,8 @@ router = APIRouter(prefix="/api/communities", tags=["Communities"])
 def create_community(payload: models.CommunityCreate, session: Session = Depends(get_session)):
     community = models.Community.from_orm(payload)
     session.add(community)
+    session.flush()
+    aggregates.community_created(session, community)
     session.commit()
     session.refresh(community)
     return community
@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from collections import Counter
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, update
 from sqlmodel import select
 from sqlmodel import Session
-from typing import List
+from typing import List, Optional
 from app.backend.database import get_session
+from app.backend.dependencies import require_role
 from app.backend import models
+from app.backend import aggregates
+from app.backend import rollups
+from app.backend import events
+from app.backend import ingest
 
 router = APIRouter(prefix="/api/donations", tags=["Donations"])
 
@@ -11,10 +20,94 @@ router = APIRouter(prefix="/api/donations", tags=["Donations"])
 def create_donation(payload: models.DonationCreate, session: Session = Depends(get_session)):
     donation = models.Donation.from_orm(payload)
     session.add(donation)
+    session.flush()
+    aggregates.donation_created(session, donation)
+    rollups.record_donation(session, donation)
     session.commit()
     session.refresh(donation)
+    events.donation_created(donation)
     return donation
 
+def _write_chunk(session: Session, donations: List[models.Donation], commit: bool) -> None:
+    ingest.insert_donations(session, donations)
+    if commit:
+        session.commit()
+
+@router.post("/bulk", response_model=models.BulkIngestResult)
+async def bulk_create_donations(request: Request, format: Optional[str] = None, atomic: bool = False,
+                                errors_only: bool = False, session: Session = Depends(get_session)):
+    """Create many donations from a JSON array, NDJSON or CSV body (picked by Content-Type or ?format=).
+
+    Rows are parsed and validated as the body streams in; valid ones are inserted
+    BULK_CHUNK_SIZE at a time and committed per chunk. With atomic=true nothing is
+    committed unless every row is valid (422 with the per-row report otherwise).
+    """
+    try:
+        fmt = format or ingest.detect_format(request.headers.get("content-type"))
+    except ingest.BulkFormatError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    if fmt not in ingest.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(ingest.FORMATS)}")
+
+    results: List[models.BulkIngestRow] = []
+    chunk: List[tuple] = []
+    created: List[models.Donation] = []
+    received = inserted = failed = 0
+
+    async def flush():
+        nonlocal inserted
+        if not chunk:
+            return
+        donations = [d for _, d in chunk]
+        await run_in_threadpool(_write_chunk, session, donations, not atomic)
+        for result, d in chunk:
+            result.id = d.id
+        inserted += len(chunk)
+        if not atomic:
+            for d in donations:
+                events.donation_created(d)
+        else:
+            created.extend(donations)
+        chunk.clear()
+
+    def fail(row: int, errors: List[str]):
+        nonlocal failed
+        failed += 1
+        results.append(models.BulkIngestRow(row=row, errors=errors))
+
+    try:
+        async for row, record in ingest.iter_records(request.stream(), fmt):
+            received += 1
+            if row >= ingest.BULK_MAX_ROWS:
+                fail(row, [f"upload exceeds {ingest.BULK_MAX_ROWS} rows; the rest was not read"])
+                break
+            checked = ingest.validate_record(record)
+            if isinstance(checked, list):
+                fail(row, checked)
+                continue
+            result = models.BulkIngestRow(row=row)
+            if not errors_only:
+                results.append(result)
+            chunk.append((result, checked))
+            if len(chunk) >= ingest.BULK_CHUNK_SIZE:
+                await flush()
+    except (ingest.BulkFormatError, UnicodeDecodeError) as e:
+        fail(received, [str(e)])
+    await flush()
+
+    report = models.BulkIngestResult(received=received, created=inserted, failed=failed, results=results)
+    if atomic:
+        if failed:
+            await run_in_threadpool(session.rollback)
+            report.created = 0
+            for result in results:
+                result.id = None
+            raise HTTPException(status_code=422, detail=report.model_dump())
+        await run_in_threadpool(session.commit)
+        for d in created:
+            events.donation_created(d)
+    return report
+
 @router.get("/", response_model=List[models.Donation])
 def list_donations(session: Session = Depends(get_session)):
     return session.exec(select(models.Donation)).all()
@@ -26,22 +119,111 @@ def get_donation(donation_id: int, session: Session = Depends(get_session)):
         raise HTTPException(status_code=404, detail="Donation not found")
     return donation
 
-@router.put("/{donation_id}/claim")
-def claim_donation(donation_id: int, ngo_name: str, ngo_contact: str = None, session: Session = Depends(get_session)):
+# Columns returned by status-changing UPDATEs: enough for aggregates, rollups and the event feed
+_RETURNING = (
+    models.Donation.id, models.Donation.community_id, models.Donation.timestamp, models.Donation.quantity,
+    models.Donation.status, models.Donation.version, models.Donation.claimed_by, models.Donation.claimed_at,
+)
+
+def _claim_stmt(ids: List[int], ngo_name: str, ngo_contact: Optional[str], expected_version: Optional[int] = None):
+    """Compare-and-set: only rows still in a claimable status (and at the expected version) are updated."""
+    Donation = models.Donation
+    stmt = (
+        update(Donation)
+        .where(Donation.id.in_(ids))
+        # Legacy rows hold "Open" / "Available"; compare case-insensitively
+        .where(func.lower(func.coalesce(Donation.status, models.DonationStatus.PENDING.value))
+               .in_(models.CLAIMABLE_STATUSES))
+        .values(
+            status=models.DonationStatus.CLAIMED.value,
+            claimed_by=ngo_name,
+            ngo_contact=ngo_contact,
+            claimed_at=datetime.utcnow(),
+            version=Donation.version + 1,
+        )
+        .returning(*_RETURNING)
+        .execution_options(synchronize_session=False)
+    )
+    if expected_version is not None:
+        stmt = stmt.where(Donation.version == expected_version)
+    return stmt
+
+def _publish(event_type: str, rows) -> None:
+    for row in rows:
+        events.donation_changed(event_type, row)
+
+def _record_claims(session: Session, rows) -> List[int]:
+    """Move claimed rows from open to claimed in community_stats and the status rollups."""
+    per_community = Counter(row.community_id for row in rows)
+    for community_id, n in per_community.items():
+        aggregates.bump_community_stats(session, community_id, open=-n, claimed=n)
+    rollups.record_status_moves(session, [(row.timestamp, row.quantity) for row in rows],
+                                models.DonationStatus.PENDING.value, models.DonationStatus.CLAIMED.value)
+    return [row.id for row in rows]
+
+@router.put("/{donation_id}/claim", dependencies=[Depends(require_role("ngo"))])
+def claim_donation(donation_id: int, ngo_name: str, ngo_contact: str = None, expected_version: Optional[int] = None,
+                   session: Session = Depends(get_session)):
+    rows = session.execute(_claim_stmt([donation_id], ngo_name, ngo_contact, expected_version)).all()
+    claimed = _record_claims(session, rows)
+    session.commit()
+    _publish("donation.claimed", rows)
     donation = session.get(models.Donation, donation_id)
     if not donation:
         raise HTTPException(status_code=404, detail="Donation not found")
-    if donation.status.lower().startswith("claimed") or donation.status.lower() == "delivered":
-        raise HTTPException(status_code=400, detail="Donation already claimed or delivered")
-    donation.status = f"Claimed by {ngo_name}"
-    # optional store contact
-    if ngo_contact:
-        donation.contact = ngo_contact
-    session.add(donation)
-    session.commit()
-    session.refresh(donation)
+    if not claimed:
+        if expected_version is not None and donation.version != expected_version:
+            raise HTTPException(status_code=409, detail=f"Donation changed (version {donation.version}); reload and retry")
+        raise HTTPException(status_code=409, detail=f"Donation already {donation.status}")
     return {"message": f"Donation {donation_id} claimed by {ngo_name}", "donation": donation}
 
+@router.post("/claim", response_model=models.BulkClaimResult, dependencies=[Depends(require_role("ngo"))])
+def bulk_claim_donations(req: models.BulkClaimRequest, session: Session = Depends(get_session)):
+    """Claim many donations in one transaction; reports which ids were taken, conflicted or missing."""
+    ids = list(dict.fromkeys(req.donation_ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="donation_ids must not be empty")
+    rows = session.execute(_claim_stmt(ids, req.ngo_name, req.ngo_contact)).all()
+    claimed = set(_record_claims(session, rows))
+    rest = [i for i in ids if i not in claimed]
+    existing = set(session.exec(select(models.Donation.id).where(models.Donation.id.in_(rest))).all()) if rest else set()
+    result = models.BulkClaimResult(
+        claimed=[i for i in ids if i in claimed],
+        conflicts=[i for i in rest if i in existing],
+        not_found=[i for i in rest if i not in existing],
+    )
+    if req.all_or_nothing and rest:
+        session.rollback()
+        raise HTTPException(status_code=409, detail=result.model_dump())
+    session.commit()
+    _publish("donation.claimed", rows)
+    return result
+
+@router.post("/{donation_id}/deliver", dependencies=[Depends(require_role("ngo"))])
+def deliver_donation(donation_id: int, session: Session = Depends(get_session)):
+    """Mark a claimed donation as delivered (compare-and-set on the claimed status)."""
+    Donation = models.Donation
+    found = session.exec(select(Donation.id, Donation.status).where(Donation.id == donation_id)).first()
+    if found is None:
+        raise HTTPException(status_code=404, detail="Donation not found")
+    old = found.status  # may be NULL on legacy rows: not claimed, so the update below finds no match -> 409
+    stmt = (
+        update(Donation)
+        .where(Donation.id == donation_id, Donation.status == old, func.lower(Donation.status).like("claimed%"))
+        .values(status=models.DonationStatus.DELIVERED.value, version=Donation.version + 1)
+        .returning(*_RETURNING)
+        .execution_options(synchronize_session=False)
+    )
+    row = session.execute(stmt).first()
+    if row is None:
+        session.rollback()
+        raise HTTPException(status_code=409, detail="Donation is not in a claimed state")
+    aggregates.donation_status_changed(session, row.community_id, row.quantity, old, row.status)
+    rollups.record_status_moves(session, [(row.timestamp, row.quantity)], old, row.status)
+    session.commit()
+    _publish("donation.delivered", [row])
+    return {"message": f"Donation {donation_id} delivered", "donation": session.get(Donation, donation_id)}
+
 # --- Matching endpoint: match donor to nearest community/NGO need by food_type ---
 class MatchRequest(models.SQLModel):
     donor_location: str
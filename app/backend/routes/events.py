@@ -0,0 +1,69 @@
+import asyncio
+import json
+from typing import Optional
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from app.backend.events import get_bus
+
+router = APIRouter(prefix="/api/events", tags=["Events"])
+
+HEARTBEAT_SECONDS = 15
+
+def _sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+@router.get("/donations")
+async def donation_event_stream(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    after: Optional[str] = None,
+):
+    """
+    Server-sent events for donation created/claimed/delivered changes.
+    Resumes after the Last-Event-ID header (or ?after=); sends a `reset` event when
+    the id can't be resumed, telling the client to reload its snapshot.
+    """
+    bus = get_bus()
+    queue = bus.subscribe()  # subscribe before replaying so nothing falls in between
+    backlog, reset = bus.replay(last_event_id or after) if (last_event_id or after) else ([], False)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            if reset:
+                yield f"id: {bus.last_id()}\nevent: reset\ndata: {{}}\n\n"
+            seen = 0
+            for event in backlog:
+                seen = event["seq"]
+                yield _sse(event)
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:  # dropped for falling behind; client reconnects with its last id
+                    break
+                if event["seq"] > seen:
+                    yield _sse(event)
+        finally:
+            bus.unsubscribe(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no",
+                                      # compression middleware leaves encoded responses alone
+                                      "Content-Encoding": "identity"})
+
+@router.get("/donations/poll")
+def poll_donation_events(after: Optional[str] = None, limit: int = Query(500, ge=1, le=5000)):
+    """
+    Non-streaming variant for clients that refresh on their own schedule (e.g. Streamlit).
+    Without `after` it just returns the current cursor; take it before loading a snapshot.
+    """
+    bus = get_bus()
+    if after is None:
+        return {"events": [], "last_id": bus.last_id(), "reset": False}
+    backlog, reset = bus.replay(after)
+    backlog = backlog[:limit]
+    last_id = backlog[-1]["id"] if backlog else (bus.last_id() if reset else after)
+    return {"events": backlog, "last_id": last_id, "reset": reset}
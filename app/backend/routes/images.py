@@ -0,0 +1,96 @@
+from typing import Optional
+from fastapi import APIRouter, File, HTTPException, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from app.backend.http_cache import etag_matches
+from app.backend.images import DERIVATIVES, IMAGE_CHUNK_BYTES, ImageRejected, ImageTooLarge, get_image_store
+
+router = APIRouter(prefix="/api/images", tags=["Images"])
+
+# Stored files never change under a given digest
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+def _describe(digest: str) -> dict:
+    base = f"{router.prefix}/{digest}"
+    return {"url": base, "thumbnail_url": f"{base}/thumb", "model_input_url": f"{base}/model"}
+
+def _parse_range(header: Optional[str], size: int):
+    """(start, end) inclusive for a single 'bytes=' range; None to send the whole file."""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first == "":
+            start, end = max(size - int(last), 0), size - 1  # suffix range: last N bytes
+        else:
+            start, end = int(first), min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+def _file_response(request: Request, path, media_type: str, etag: str) -> Response:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE,
+        "Accept-Ranges": "bytes",
+        # Already compressed; also keeps GZip/Brotli middleware from breaking byte ranges
+        "Content-Encoding": "identity",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    size = path.stat().st_size
+    byte_range = _parse_range(request.headers.get("range"), size)
+    start, end = byte_range or (0, size - 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    def body():
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(IMAGE_CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    return StreamingResponse(body(), status_code=206 if byte_range else 200, media_type=media_type, headers=headers)
+
+@router.post("/", status_code=201)
+def upload_image(response: Response, image: UploadFile = File(...)):
+    """
+    Store an image (streamed to disk, deduplicated by SHA-256). 201 if new, 200 if already stored.
+    Thumbnail and model input are rendered in the background.
+    """
+    try:
+        stored = get_image_store().put(image.file)
+    except ImageTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ImageRejected as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    if not stored.created:
+        response.status_code = 200
+    info = stored.to_dict()
+    info.pop("path")
+    return {**info, **_describe(stored.digest)}
+
+@router.get("/{digest}")
+def get_image(digest: str, request: Request):
+    store = get_image_store()
+    path = store.path(digest)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return _file_response(request, path, store.media_type(path), f'"{digest}"')
+
+@router.get("/{digest}/{kind}")
+def get_derivative(digest: str, kind: str, request: Request):
+    """Downscaled variants: 'thumb' (320 px JPEG) or 'model' (224x224 PNG tagger input)."""
+    if kind not in DERIVATIVES:
+        raise HTTPException(status_code=404, detail=f"Unknown variant '{kind}'; use one of {', '.join(DERIVATIVES)}")
+    path = get_image_store().derivative(digest, kind)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return _file_response(request, path, DERIVATIVES[kind][1], f'"{digest}-{kind}"')
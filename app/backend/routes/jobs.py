@@ -0,0 +1,30 @@
+from typing import Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from app.backend.dependencies import require_role
+from app.backend.jobs import get_queue, registered_jobs
+from app.backend import tasks  # noqa: F401  (registers the job functions)
+
+router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
+
+@router.get("/{job_id}")
+def get_job(job_id: str, wait: float = Query(0, ge=0, le=60)):
+    """
+    Job status/result. With ?wait=N the call long-polls up to N seconds for completion.
+    """
+    queue = get_queue()
+    job_row = queue.wait(job_id, timeout=wait) if wait else queue.get(job_id)
+    if not job_row:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_row
+
+@router.get("/", dependencies=[Depends(require_role("admin"))])
+def list_jobs(status: Optional[str] = None, limit: int = Query(50, ge=1, le=500)):
+    return {"jobs": get_queue().recent(status=status, limit=limit), "registered": registered_jobs()}
+
+@router.post("/{name}", dependencies=[Depends(require_role("admin"))])
+def submit_job(name: str, kwargs: dict = Body(default={})):
+    if name not in registered_jobs():
+        raise HTTPException(status_code=404, detail=f"Unknown job '{name}'")
+    job_id = get_queue().submit(name, kwargs)  # the body is the job's arguments, never submit()'s own
+    return JSONResponse(status_code=202, content={"job_id": job_id, "status_url": f"/api/jobs/{job_id}"})
@@ -1,21 +1,42 @@
-from fastapi import APIRouter
-from transformers import pipeline
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+from sqlmodel import Session
+from app.backend import models, rollups
+from app.backend.database import get_session
+from app.backend.sentiment_engines import get_engine
 
 router = APIRouter(tags=["Psychology"])
 
-sentiment_pipeline = pipeline("sentiment-analysis")
+# Engine label -> API sentiment; the lexicon engine also returns NEUTRAL, and EMPTY for blank text
+_SENTIMENTS = {"POSITIVE": "positive", "NEGATIVE": "negative", "NEUTRAL": "neutral", "EMPTY": "neutral"}
 
 class SentimentInput(BaseModel):
     text: str
 
 @router.post("/psychology/sentiment")
-def analyze_sentiment(data: SentimentInput):
+def analyze_sentiment(data: SentimentInput, engine: Optional[str] = None):
     """
-    Analyzes donor or NGO sentiment using DistilBERT.
+    Analyzes donor or NGO sentiment using DistilBERT (shared inference server when running).
+    ?engine=lexicon|cascade trades some accuracy for microsecond latency on short notes.
     """
-    result = sentiment_pipeline(data.text)[0]
+    try:
+        scorer = get_engine(engine)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e.args[0]))
+    result = scorer.analyze(data.text)
     label = result["label"]
     score = round(result["score"], 3)
-    sentiment = "positive" if label == "POSITIVE" else "negative"
+    sentiment = _SENTIMENTS.get(label, "neutral")
     return {"sentiment": sentiment, "confidence": score}
+
+@router.post("/psychology/mood", response_model=models.MoodLogRead)
+def log_mood(log_in: models.MoodLogCreate, session: Session = Depends(get_session)):
+    """Record a mood log; its mood rollup buckets are bumped in the same transaction."""
+    log = models.MoodLog.from_orm(log_in)
+    session.add(log)
+    session.flush()
+    rollups.record_mood(session, log)
+    session.commit()
+    session.refresh(log)
+    return log
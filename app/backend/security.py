@@ -0,0 +1,187 @@
+# app/backend/security.py
+"""Password hashing off the request path, plus signed access tokens.
+
+bcrypt is deliberately slow (~100-300 ms of CPU per call), so hashes and
+verifies run in a bounded process pool instead of blocking a web worker.
+Login attempts are rate-limited per email before any hashing happens, and
+hashes made with an older cost are upgraded on the next successful login.
+
+Access tokens are HS256 JWTs signed with the stdlib (hmac/hashlib), so they
+can be verified on every request without a database round-trip.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+# ---- Config (env-overridable) ----
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+# Max hash jobs queued or running at once; beyond this we shed load with 503
+HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", str(HASH_WORKERS * 8)))
+LOGIN_MAX_ATTEMPTS = int(os.getenv("LOGIN_MAX_ATTEMPTS", "5"))
+LOGIN_WINDOW_SECONDS = int(os.getenv("LOGIN_WINDOW_SECONDS", "60"))
+ACCESS_TOKEN_TTL_SECONDS = int(os.getenv("ACCESS_TOKEN_TTL_SECONDS", "3600"))
+
+AUTH_SECRET_KEY = os.getenv("AUTH_SECRET_KEY")
+if not AUTH_SECRET_KEY:
+    # Fine for local dev; with several workers every process must share one key
+    print("[WARN] AUTH_SECRET_KEY not set; using a random per-process key")
+    AUTH_SECRET_KEY = secrets.token_urlsafe(32)
+
+# min_rounds == default_rounds so raising BCRYPT_ROUNDS marks old hashes as needing an update
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+)
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is full."""
+
+
+# ---------- Worker functions (run in the pool; must be module-level to pickle) ----------
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed)
+
+_dummy_hash: Optional[str] = None
+
+def _init_worker() -> None:
+    global _dummy_hash
+    _dummy_hash = pwd_context.hash(secrets.token_urlsafe(16))
+
+def _verify_dummy(password: str) -> bool:
+    """A full-cost verify against a throwaway hash, so unknown accounts take as long as known ones."""
+    if _dummy_hash is None:
+        _init_worker()
+    pwd_context.verify(password, _dummy_hash)
+    return False
+
+
+# ---------- Pool ----------
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(HASH_QUEUE_LIMIT)
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=HASH_WORKERS, initializer=_init_worker)
+    return _pool
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+async def _run(fn, *args):
+    if not _slots.acquire(blocking=False):
+        raise HashingBusy()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_pool(), fn, *args)
+    finally:
+        _slots.release()
+
+async def hash_password(password: str) -> str:
+    return await _run(_hash, password)
+
+async def verify_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """Returns (valid, new_hash); new_hash is set when the stored hash should be upgraded."""
+    return await _run(_verify_and_update, password, hashed)
+
+async def verify_dummy_password(password: str) -> bool:
+    """Same cost as verify_password, always False; use it when the account does not exist."""
+    return await _run(_verify_dummy, password)
+
+
+# ---------- Login rate limiting ----------
+class LoginRateLimiter:
+    """Sliding-window limit on login attempts per key (email)."""
+
+    def __init__(self, max_attempts: int = LOGIN_MAX_ATTEMPTS, window: int = LOGIN_WINDOW_SECONDS):
+        self.max_attempts = max_attempts
+        self.window = window
+        self._attempts = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def hit(self, key: str) -> Optional[int]:
+        """Record an attempt. Returns None if allowed, else seconds until the next attempt is allowed."""
+        now = time.monotonic()
+        with self._lock:
+            if len(self._attempts) > 10000:
+                self._sweep(now)
+            q = self._attempts[key.lower()]
+            while q and now - q[0] > self.window:
+                q.popleft()
+            if len(q) >= self.max_attempts:
+                return int(self.window - (now - q[0])) + 1
+            q.append(now)
+            return None
+
+    def _sweep(self, now: float) -> None:
+        stale = [k for k, q in self._attempts.items() if not q or now - q[-1] > self.window]
+        for k in stale:
+            del self._attempts[k]
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._attempts.pop(key.lower(), None)
+
+login_limiter = LoginRateLimiter()
+
+
+# ---------- Access tokens (JWT, HS256) ----------
+class InvalidToken(Exception):
+    pass
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+_JWT_HEADER = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+def _sign(signing_input: str) -> str:
+    return _b64encode(hmac.new(AUTH_SECRET_KEY.encode(), signing_input.encode("ascii"), hashlib.sha256).digest())
+
+def create_access_token(user_id: int, role: str, email: str, ttl: int = ACCESS_TOKEN_TTL_SECONDS) -> str:
+    now = int(time.time())
+    claims = {"sub": str(user_id), "role": role, "email": email, "iat": now, "exp": now + ttl}
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    signing_input = f"{_JWT_HEADER}.{payload}"
+    return f"{signing_input}.{_sign(signing_input)}"
+
+def decode_access_token(token: str) -> dict:
+    """Verify signature and expiry; returns the claims or raises InvalidToken."""
+    try:
+        header, payload, signature = token.split(".")
+    except ValueError:
+        raise InvalidToken("Malformed token")
+    if header != _JWT_HEADER or not hmac.compare_digest(signature, _sign(f"{header}.{payload}")):
+        raise InvalidToken("Bad signature")
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        raise InvalidToken("Malformed token")
+    if claims.get("exp", 0) < time.time():
+        raise InvalidToken("Token expired")
+    return claims
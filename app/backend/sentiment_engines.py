@@ -0,0 +1,172 @@
+# app/backend/sentiment_engines.py
+"""Pluggable sentiment backends.
+
+- "transformer": DistilBERT via app.backend.inference (shared server or in-process)
+- "lexicon": word-polarity scorer over TextBlob's bundled pattern lexicon plus
+  a few mood words, with negation and intensifiers; pure Python, a few
+  microseconds per short note, no model load
+- "cascade": lexicon first, escalating only low-confidence texts (below
+  SENTIMENT_CASCADE_THRESHOLD) to the transformer in one batch
+
+Every engine returns {"label", "score", "engine"} per text, where label is
+POSITIVE / NEGATIVE (or NEUTRAL / EMPTY) and score is the confidence in it.
+SENTIMENT_ENGINE sets the default; `register_engine` adds others.
+"""
+import math
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+try:
+    import textblob
+    HAVE_TEXTBLOB = True
+except ImportError:
+    HAVE_TEXTBLOB = False
+
+SENTIMENT_ENGINE = os.getenv("SENTIMENT_ENGINE", "transformer")
+SENTIMENT_CASCADE_THRESHOLD = float(os.getenv("SENTIMENT_CASCADE_THRESHOLD", "0.8"))
+
+
+class SentimentEngine:
+    name = "base"
+
+    def analyze_batch(self, texts: List[str]) -> List[dict]:
+        raise NotImplementedError
+
+    def analyze(self, text: str) -> dict:
+        return self.analyze_batch([text])[0]
+
+
+# ---------- Transformer ----------
+class TransformerEngine(SentimentEngine):
+    name = "transformer"
+
+    def analyze_batch(self, texts):
+        from .inference import analyze_sentiment_batch
+        return [{**r, "engine": self.name} for r in analyze_sentiment_batch(list(texts))]
+
+
+# ---------- Lexicon ----------
+# Mood-note vocabulary the pattern lexicon (mostly adjectives) lacks
+_MOOD_WORDS = {
+    "happy": 0.8, "good": 0.7, "great": 0.8, "sad": -0.5, "bad": -0.7, "awful": -1.0,
+    "love": 0.6, "loved": 0.6, "hope": 0.4, "hopeful": 0.6, "thanks": 0.5, "thank": 0.5, "grateful": 0.7,
+    "thankful": 0.7, "glad": 0.6, "enjoy": 0.5, "enjoyed": 0.5, "smile": 0.5, "proud": 0.6, "blessed": 0.7,
+    "excited": 0.6, "relieved": 0.5, "calm": 0.3, "motivated": 0.5, "helping": 0.3, "kindness": 0.6,
+    "hate": -0.8, "tired": -0.4, "exhausted": -0.6, "stressed": -0.6, "worried": -0.5, "anxious": -0.6,
+    "lonely": -0.6, "upset": -0.6, "angry": -0.7, "frustrated": -0.6, "hopeless": -0.8, "hungry": -0.3,
+    "struggling": -0.5, "overwhelmed": -0.6, "depressed": -0.8, "cry": -0.5, "crying": -0.5, "scared": -0.6,
+    "afraid": -0.6, "hurt": -0.6, "sick": -0.5, "lost": -0.4, "miss": -0.3, "fail": -0.5, "failed": -0.5,
+}
+_NEGATIONS = {"not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "cannot", "without", "hardly"}
+_NEGATION_SPAN = 3  # tokens a negation reaches
+_TOKEN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+
+def _pattern_lexicon() -> Dict[str, tuple]:
+    """{word: (polarity, intensity)} averaged over senses, from TextBlob's en-sentiment.xml."""
+    path = Path(textblob.__file__).parent / "en" / "en-sentiment.xml"
+    polarity, intensity, n = defaultdict(float), defaultdict(float), defaultdict(int)
+    for word in ET.parse(path).getroot().iter("word"):
+        form = word.get("form", "").lower()
+        if not form or " " in form:
+            continue
+        polarity[form] += float(word.get("polarity", 0))
+        intensity[form] += float(word.get("intensity", 1))
+        n[form] += 1
+    return {w: (polarity[w] / n[w], intensity[w] / n[w]) for w in n}
+
+
+class LexiconEngine(SentimentEngine):
+    name = "lexicon"
+
+    def __init__(self):
+        lexicon = {}
+        if HAVE_TEXTBLOB:
+            try:
+                lexicon = _pattern_lexicon()
+            except (OSError, ET.ParseError) as e:
+                print(f"[WARN] TextBlob lexicon unavailable ({e}); using the built-in mood words only")
+        else:
+            print("[WARN] textblob not installed; the lexicon engine uses the built-in mood words only")
+        # Words with ~zero polarity but intensity > 1 ("very", "really", "extremely") scale the next word
+        self.intensifiers = {w: i for w, (p, i) in lexicon.items() if abs(p) < 0.05 and i > 1.0}
+        self.polarity = {w: p for w, (p, _) in lexicon.items() if abs(p) >= 0.05}
+        self.polarity.update(_MOOD_WORDS)
+
+    def score(self, text: str) -> dict:
+        if not text or not text.strip():
+            return {"label": "EMPTY", "score": 0.0, "engine": self.name}
+        total, hits, negate, boost = 0.0, 0, 0, 1.0
+        for tok in _TOKEN.findall(text.lower()):
+            if tok in _NEGATIONS or tok.endswith("n't"):
+                negate = _NEGATION_SPAN
+                continue
+            factor = self.intensifiers.get(tok)
+            if factor is not None:
+                boost = factor
+                continue
+            p = self.polarity.get(tok)
+            if p is not None:
+                # Negation flips and dampens ("not good" is milder than "bad"), as in pattern
+                total += (-0.5 * p if negate else p) * boost
+                hits += 1
+            boost = 1.0
+            negate = max(negate - 1, 0)
+        if hits == 0 or total == 0:
+            return {"label": "NEUTRAL", "score": 0.0, "engine": self.name}
+        strength = abs(total) / math.sqrt(hits)
+        return {"label": "POSITIVE" if total > 0 else "NEGATIVE",
+                "score": 0.5 + 0.5 * math.tanh(1.5 * strength), "engine": self.name}
+
+    def analyze_batch(self, texts):
+        return [self.score(t) for t in texts]
+
+
+# ---------- Cascade ----------
+class CascadeEngine(SentimentEngine):
+    name = "cascade"
+
+    def __init__(self, fast: SentimentEngine, slow: SentimentEngine, threshold: float = SENTIMENT_CASCADE_THRESHOLD):
+        self.fast, self.slow, self.threshold = fast, slow, threshold
+
+    def analyze_batch(self, texts):
+        texts = list(texts)
+        out = self.fast.analyze_batch(texts)
+        unsure = [i for i, r in enumerate(out) if r["label"] != "EMPTY" and r["score"] < self.threshold]
+        if unsure:
+            for i, r in zip(unsure, self.slow.analyze_batch([texts[i] for i in unsure])):
+                out[i] = r
+        return out
+
+
+# ---------- Registry ----------
+_FACTORIES: Dict[str, Callable[[], SentimentEngine]] = {
+    "transformer": TransformerEngine,
+    "lexicon": LexiconEngine,
+    "cascade": lambda: CascadeEngine(get_engine("lexicon"), get_engine("transformer")),
+}
+_instances: Dict[str, SentimentEngine] = {}
+_lock = threading.RLock()
+
+def register_engine(name: str, factory: Callable[[], SentimentEngine]) -> None:
+    with _lock:
+        _FACTORIES[name] = factory
+        _instances.pop(name, None)
+
+def engine_names() -> List[str]:
+    return sorted(_FACTORIES)
+
+def get_engine(name: Optional[str] = None) -> SentimentEngine:
+    name = name or SENTIMENT_ENGINE
+    with _lock:
+        engine = _instances.get(name)
+        if engine is None:
+            if name not in _FACTORIES:
+                raise KeyError(f"Unknown sentiment engine '{name}'; use one of {', '.join(engine_names())}")
+            engine = _instances[name] = _FACTORIES[name]()
+        return engine
@@ -9,9 +9,9 @@ from .config import (
 from .data_loader import (
     build_all_core_processed, load_wfp_prices
 )
-from .models.price_forecast import forecast_prices
-from .models.image_tagging import tag_image_bytes
-from .models.sentiment import analyze_text
+from .ml.price_forecast import forecast_prices
+from .ml.image_tagging import tag_image_bytes
+from .ml.sentiment import analyze_text
 
 def ensure_processed_maps():
     # Build processed files if missing
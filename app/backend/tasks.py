@@ -0,0 +1,120 @@
+# app/backend/tasks.py
+"""Heavy work that runs on the background job queue (see app.backend.jobs).
+
+Imports are deferred into each task so registering them is cheap.
+"""
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from .config import FORECASTS_DIR
+from .jobs import job
+from .metrics import span
+
+# Cron fields (APScheduler) for recurring jobs, all times server-local
+SCHEDULES = {
+    "precompute_forecasts":     {"hour": 2, "minute": 0},
+    "simulated_price_forecast": {"hour": 2, "minute": 30},
+    "build_maps":               {"hour": 3, "minute": 0},
+    "compact_rollups":          {"minute": 15},
+}
+
+
+def forecast_file(commodity: str) -> Path:
+    """Where precompute_forecasts writes a commodity's forecast."""
+    return Path(FORECASTS_DIR) / (re.sub(r"[^a-z0-9]+", "_", str(commodity).lower()).strip("_") + ".json")
+
+def _records(fcst, periods: int):
+    out = fcst.tail(periods).copy()
+    out["ds"] = out["ds"].astype(str)
+    return out.to_dict(orient="records")
+
+
+@job("forecast_prices")
+def forecast_prices_job(commodity=None, market=None, periods: int = 30, method: str = "prophet"):
+    """Forecast one WFP commodity/market series."""
+    from .data_loader import load_wfp_prices
+    from .ml.price_forecast import forecast_prices
+    _, fcst = forecast_prices(load_wfp_prices(), commodity=commodity, market=market, periods=periods, method=method)
+    return _records(fcst, periods)
+
+
+@job("precompute_forecasts")
+def precompute_forecasts(periods: int = 60, method: str = "prophet"):
+    """Nightly: forecast every commodity and write FORECASTS_DIR/<commodity>.json for the UI to read."""
+    import json
+    from .data_loader import load_wfp_prices
+    from .ml.price_forecast import forecast_prices
+
+    df = load_wfp_prices()
+    Path(FORECASTS_DIR).mkdir(parents=True, exist_ok=True)
+    written, failed = [], {}
+    for commodity in sorted(df["commodity"].dropna().unique()):
+        try:
+            _, fcst = forecast_prices(df, commodity=commodity, periods=periods, method=method)
+        except Exception as e:
+            failed[commodity] = str(e)
+            continue
+        path = forecast_file(commodity)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "commodity": commodity,
+            "periods": periods,
+            "generated_at": datetime.utcnow().isoformat(),
+            "forecast": _records(fcst, len(fcst)),
+        }))
+        tmp.replace(path)
+        written.append(str(path))
+    return {"written": written, "failed": failed}
+
+
+@job("simulated_price_forecast")
+def simulated_price_forecast(periods: int = 30):
+    """The Prophet fit behind /forecasting/prices (simulated history until real data is wired in)."""
+    import pandas as pd
+    from prophet import Prophet
+
+    df = pd.DataFrame({
+        "ds": pd.date_range(start="2024-01-01", periods=120),
+        "y": [100 + i*0.2 + (i % 7)*2 for i in range(120)]
+    })
+    with span("forecast_prophet"):
+        model = Prophet(daily_seasonality=True)
+        model.fit(df)
+        future = model.make_future_dataframe(periods=periods)
+        forecast = model.predict(future)
+    return _records(forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]], periods)
+
+
+@job("build_maps")
+def build_maps():
+    """Rebuild the processed severity GeoJSON layers and the gazetteer."""
+    from .data_loader import build_all_core_processed
+    return {k: str(v) for k, v in build_all_core_processed().items()}
+
+
+@job("tag_image")
+def tag_image(path: str = None, topk: int = 3, digest: str = None):
+    """Tag an image file, or a stored image by digest (uses its precomputed 224 px model input)."""
+    from .inference import tag_food_image
+    return tag_food_image(path, topk=topk, digest=digest)
+
+
+@job("compact_rollups")
+def compact_rollups(since_days: int = 2):
+    """Re-derive recent rollup buckets from the raw tables (catches writes made outside the API)."""
+    from sqlmodel import Session
+    from .database import engine
+    from .rollups import compact_rollups as _compact
+    with Session(engine) as session:
+        return {"rows": _compact(session, since=datetime.utcnow() - timedelta(days=since_days))}
+
+
+@job("rescore_sentiment")
+def rescore_sentiment(sources=("moodlog", "workflow"), chunk_size: int = None, batch_size: int = None,
+                      workers: int = None, limit: int = None, restart: bool = False):
+    """Label unscored or stale (older MODEL_REVISION) notes in bulk; resumes from its checkpoints."""
+    from . import rescoring
+    opts = {k: v for k, v in {"chunk_size": chunk_size, "batch_size": batch_size, "workers": workers}.items() if v}
+    return [rescoring.rescore(s, limit=limit, restart=restart, **opts)
+            for s in ([sources] if isinstance(sources, str) else sources)]
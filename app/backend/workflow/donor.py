@@ -1,25 +1,20 @@
-import os
 import uuid
-import pandas as pd
 
-DONATION_FILE = "app/backend/data/donations.csv"
+from app.backend.images import get_image_store
+from app.backend.workflow.event_log import get_donation_log
 
 def submit_donation(donor_name, contact, location, food_desc, mood=None, food_img=None):
     """Save donor submission with optional image and sentiment/mood."""
 
     try:
-        os.makedirs(os.path.dirname(DONATION_FILE), exist_ok=True)
-
         donation_id = str(uuid.uuid4())[:8]
-        img_path = None
+        img_path = img_id = None
 
-        # Save uploaded image (if any)
+        # Stream the uploaded image (if any) into the content-addressed store
         if food_img is not None:
-            img_dir = "app/backend/data/donation_images"
-            os.makedirs(img_dir, exist_ok=True)
-            img_path = os.path.join(img_dir, f"{donation_id}.jpg")
-            with open(img_path, "wb") as f:
-                f.write(food_img.read())
+            food_img.seek(0)
+            stored = get_image_store().put(food_img)
+            img_path, img_id = str(stored.path), stored.digest
 
         record = {
             "donation_id": donation_id,
@@ -29,17 +24,12 @@ def submit_donation(donor_name, contact, location, food_desc, mood=None, food_im
             "food_desc": food_desc,
             "mood": mood if mood else "NEUTRAL",
             "image_path": img_path,
+            "image_id": img_id,
             "status": "Available"
         }
 
-        # Append to existing CSV or create new
-        if os.path.exists(DONATION_FILE):
-            df = pd.read_csv(DONATION_FILE)
-            df = pd.concat([df, pd.DataFrame([record])], ignore_index=True)
-        else:
-            df = pd.DataFrame([record])
-
-        df.to_csv(DONATION_FILE, index=False)
+        # O(1) append to the shared donation event log
+        get_donation_log().create(record)
 
         return {"status": "success", "donation_id": donation_id}
 
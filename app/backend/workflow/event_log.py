@@ -0,0 +1,194 @@
+# app/backend/workflow/event_log.py
+"""Append-only donation event log (JSONL) with an in-memory view of current state.
+
+Every submit/claim is one appended line, so writes are O(1). Readers tail the
+file from their last offset to stay in sync with other processes, and the log
+is compacted into one snapshot line per donation once COMPACT_EVERY events
+have been appended after the last snapshot. An exclusive
+lock on a sidecar file makes check-then-append atomic across Streamlit sessions
+and processes.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+    HAVE_FCNTL = True
+except ImportError:  # Windows
+    import msvcrt
+    HAVE_FCNTL = False
+
+DONATION_LOG = "app/backend/data/donation_events.jsonl"
+LEGACY_DONATION_CSV = "app/backend/data/donations.csv"
+COMPACT_EVERY = 1000   # create/claim events after the snapshot lines before compacting
+
+
+class DonationEventLog:
+    def __init__(self, path: str = DONATION_LOG, compact_every: int = COMPACT_EVERY, fsync: bool = True):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self._records: Dict[str, dict] = {}
+        self._offset = 0
+        self._inode = None
+        self._n_events = 0
+        self._n_snapshots = 0  # counted from the file, so every process sees the same backlog
+        self._thread_lock = threading.RLock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    # ---------- Locking ----------
+    @contextmanager
+    def _locked(self):
+        """Exclusive lock held across threads (RLock) and processes (flock on sidecar file)."""
+        with self._thread_lock:
+            with open(self.lock_path, "a+") as lf:
+                if HAVE_FCNTL:
+                    fcntl.flock(lf.fileno(), fcntl.LOCK_EX)
+                else:
+                    lf.seek(0)
+                    msvcrt.locking(lf.fileno(), msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    if HAVE_FCNTL:
+                        fcntl.flock(lf.fileno(), fcntl.LOCK_UN)
+                    else:
+                        lf.seek(0)
+                        msvcrt.locking(lf.fileno(), msvcrt.LK_UNLCK, 1)
+
+    # ---------- Materialised view ----------
+    def _apply(self, event: dict) -> None:
+        op, donation_id = event.get("op"), event.get("id")
+        if op in ("create", "snapshot"):
+            self._records[donation_id] = dict(event["record"])
+            if op == "snapshot":
+                self._n_snapshots += 1
+        elif op == "claim" and donation_id in self._records:
+            self._records[donation_id]["status"] = f"Claimed by {event['ngo_name']}"
+        self._n_events += 1
+
+    def _reset(self) -> None:
+        self._records, self._offset, self._n_events, self._n_snapshots = {}, 0, 0, 0
+
+    def _refresh(self, migrate: bool = False) -> None:
+        """Apply events appended since our last read (by this or any other process)."""
+        if not os.path.exists(self.path):
+            if migrate:
+                self._migrate_legacy_csv()
+            if not os.path.exists(self.path):
+                return
+        with open(self.path, "rb") as f:
+            # stat the handle we read from, so a concurrent compaction can't swap files on us
+            st = os.fstat(f.fileno())
+            if st.st_ino != self._inode or st.st_size < self._offset:
+                # first read, or the file was compacted/replaced since our last read
+                self._reset()
+                self._inode = st.st_ino
+            if st.st_size == self._offset:
+                return
+            f.seek(self._offset)
+            chunk = f.read(st.st_size - self._offset)
+        # ignore a trailing partial line (writer crashed mid-append); it is never acknowledged
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            if line.strip():
+                self._apply(json.loads(line))
+        self._offset += end
+
+    def _append(self, event: dict) -> None:
+        line = (json.dumps(event, default=str) + "\n").encode("utf-8")
+        with open(self.path, "ab") as f:
+            if self._inode is not None and f.tell() > self._offset:
+                # drop a torn tail left by a crashed writer before appending after it
+                f.truncate(self._offset)
+            f.write(line)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        if self._inode is None:
+            self._inode = os.stat(self.path).st_ino
+        self._apply(event)
+        self._offset += len(line)
+
+    def _maybe_compact(self) -> None:
+        if self._n_events - self._n_snapshots >= self.compact_every:
+            self._compact_locked()
+
+    def _migrate_legacy_csv(self) -> None:
+        """Seed the log from the old whole-file donations.csv, once."""
+        if not os.path.exists(LEGACY_DONATION_CSV):
+            return
+        import pandas as pd
+        df = pd.read_csv(LEGACY_DONATION_CSV)
+        df = df.astype(object).where(pd.notna(df), None)
+        for rec in df.to_dict(orient="records"):
+            self._append({"op": "snapshot", "id": str(rec["donation_id"]), "record": rec})
+
+    # ---------- Public API ----------
+    def create(self, record: dict) -> str:
+        donation_id = str(record["donation_id"])
+        with self._locked():
+            self._refresh(migrate=True)
+            self._append({"op": "create", "id": donation_id, "record": record,
+                          "ts": datetime.utcnow().isoformat()})
+            self._maybe_compact()
+        return donation_id
+
+    def claim(self, donation_id: str, ngo_name: str) -> Optional[str]:
+        """Claim an available donation. Returns None on success, else an error message."""
+        donation_id = str(donation_id)
+        with self._locked():
+            self._refresh(migrate=True)
+            rec = self._records.get(donation_id)
+            if rec is None:
+                return "Invalid donation ID."
+            if rec.get("status") != "Available":
+                return f"Donation {donation_id} is already {rec.get('status')}."
+            self._append({"op": "claim", "id": donation_id, "ngo_name": ngo_name,
+                          "ts": datetime.utcnow().isoformat()})
+            self._maybe_compact()
+        return None
+
+    def records(self, status: Optional[str] = None) -> List[dict]:
+        if not os.path.exists(self.path):
+            with self._locked():
+                self._refresh(migrate=True)
+        with self._thread_lock:
+            self._refresh()
+            recs = list(self._records.values())
+        if status is not None:
+            recs = [r for r in recs if r.get("status") == status]
+        return [dict(r) for r in recs]
+
+    def compact(self) -> None:
+        with self._locked():
+            self._refresh(migrate=True)
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        """Rewrite the log as one snapshot per donation (caller holds the lock)."""
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            for donation_id, rec in self._records.items():
+                f.write((json.dumps({"op": "snapshot", "id": donation_id, "record": rec}, default=str) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        st = os.stat(self.path)
+        self._inode, self._offset = st.st_ino, st.st_size
+        self._n_events = self._n_snapshots = len(self._records)
+
+
+_log: Optional[DonationEventLog] = None
+
+def get_donation_log() -> DonationEventLog:
+    """Process-wide log instance shared by the donor and NGO workflows."""
+    global _log
+    if _log is None:
+        _log = DonationEventLog()
+    return _log
@@ -0,0 +1,169 @@
+# app/backend/workflow/store.py
+"""SQLite store for the donor–NGO workflow.
+
+One connection per thread (reused across calls), WAL journaling so readers
+never block the single writer, and explicit BEGIN IMMEDIATE transactions so
+concurrent claims serialize on the write lock instead of failing mid-way.
+"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+DONATION_COLUMNS = [
+    "id", "donor_name", "donor_contact", "food_description", "quantity", "location",
+    "image_path", "tags", "note", "mood", "status", "ngo_name", "ngo_contact",
+    "claim_time", "delivered_time",
+]
+_INSERT_COLUMNS = [
+    "donor_name", "donor_contact", "food_description", "quantity", "location",
+    "image_path", "tags", "note", "mood", "status",
+]
+
+_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",   # durable at checkpoints; safe with WAL
+    "PRAGMA busy_timeout=10000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",    # ~16 MB page cache per connection
+]
+
+# Added after the table was first created; init_schema adds them to older files
+_LATER_COLUMNS = {"mood_score": "REAL", "mood_model": "TEXT"}
+
+
+class DonationStore:
+    def __init__(self, db_path: str):
+        self.db_path = str(db_path)
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    # ---------- Connections ----------
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: we issue BEGIN/COMMIT ourselves
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None, check_same_thread=False)
+            for pragma in _PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            self.init_schema(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction that takes the lock up-front (no upgrade deadlocks)."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def init_schema(self, conn: Optional[sqlite3.Connection] = None) -> None:
+        if self._schema_ready:
+            return
+        # Open the connection before taking the lock: a new one runs this DDL itself
+        conn = conn or self._conn()
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS donations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    donor_name TEXT,
+                    donor_contact TEXT,
+                    food_description TEXT,
+                    quantity TEXT,
+                    location TEXT,
+                    image_path TEXT,
+                    tags TEXT,
+                    note TEXT,
+                    mood TEXT,
+                    status TEXT DEFAULT 'Open',
+                    ngo_name TEXT,
+                    ngo_contact TEXT,
+                    claim_time TEXT,
+                    delivered_time TEXT,
+                    mood_score REAL,
+                    mood_model TEXT
+                )
+            """)
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(donations)")}
+            for column, decl in _LATER_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE donations ADD COLUMN {column} {decl}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_donations_status ON donations(status)")
+            self._schema_ready = True
+
+    # ---------- Writes ----------
+    def insert(self, record: dict) -> int:
+        return self.insert_many([record])[0]
+
+    def insert_many(self, records: Iterable[dict]) -> List[int]:
+        """Insert many donations in a single transaction; returns their ids in order."""
+        sql = f"INSERT INTO donations ({', '.join(_INSERT_COLUMNS)}) VALUES ({', '.join('?' * len(_INSERT_COLUMNS))})"
+        ids = []
+        with self.transaction() as conn:
+            for r in records:
+                row = [r.get(c) for c in _INSERT_COLUMNS]
+                row[-1] = row[-1] or "Open"
+                ids.append(conn.execute(sql, row).lastrowid)
+        return ids
+
+    def claim(self, donation_id: int, ngo_name: str, ngo_contact: Optional[str]) -> bool:
+        """Claim an open donation; False if it does not exist or was already taken."""
+        with self.transaction() as conn:
+            cur = conn.execute(
+                "UPDATE donations SET status='Claimed', ngo_name=?, ngo_contact=?, claim_time=? "
+                "WHERE id=? AND status='Open'",
+                (ngo_name, ngo_contact, datetime.now().isoformat(), donation_id),
+            )
+        return cur.rowcount == 1
+
+    def deliver(self, donation_id: int) -> Optional[tuple]:
+        """Mark delivered and return (donor_name, mood) read in the same transaction."""
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE donations SET status='Delivered', delivered_time=? WHERE id=?",
+                (datetime.now().isoformat(), donation_id),
+            )
+            return conn.execute("SELECT donor_name, mood FROM donations WHERE id=?", (donation_id,)).fetchone()
+
+    def set_moods(self, rows: Iterable[tuple], model: str) -> None:
+        """Bulk-update (id, mood, score) rows as labelled by `model`, in one transaction."""
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE donations SET mood=?, mood_score=?, mood_model=? WHERE id=?",
+                [(mood, score, model, donation_id) for donation_id, mood, score in rows],
+            )
+
+    # ---------- Reads ----------
+    def list_by_status(self, status: str) -> List[dict]:
+        cur = self._conn().execute(
+            f"SELECT {', '.join(DONATION_COLUMNS)} FROM donations WHERE status=?", (status,)
+        )
+        return [dict(zip(DONATION_COLUMNS, row)) for row in cur.fetchall()]
+
+    def notes_to_score(self, model: str, after_id: int, limit: int) -> List[tuple]:
+        """(id, note) of up to `limit` rows past `after_id` whose mood wasn't labelled by `model`."""
+        return self._conn().execute(
+            "SELECT id, note FROM donations WHERE id > ? AND trim(coalesce(note, '')) != '' "
+            "AND (mood_model IS NULL OR mood_model != ?) ORDER BY id LIMIT ?",
+            (after_id, model, limit),
+        ).fetchall()
+
+    def donor_and_mood(self, donation_id: int):
+        return self._conn().execute(
+            "SELECT donor_name, mood FROM donations WHERE id=?", (donation_id,)
+        ).fetchone()
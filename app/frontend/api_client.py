@@ -0,0 +1,183 @@
+# app/frontend/api_client.py
+"""HTTP client the Streamlit app uses to talk to the backend.
+
+One pooled `requests.Session` (keep-alive) per process, bounded retries with
+backoff, a small TTL cache for GETs that revalidates with ETag/If-None-Match
+(LRU-bounded to API_CACHE_MAX_ENTRIES, since every Streamlit session and
+token shares it), and memory of which endpoint variant the backend actually serves so the
+fallback chains are only walked once.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_BASE = os.environ.get("STREAMLIT_API_URL", "http://127.0.0.1:8000/api").rstrip("/")
+# Analytics, forecasting, psychology and delivery routes are served at the root, not under /api
+API_ROOT = API_BASE[:-len("/api")] if API_BASE.endswith("/api") else API_BASE
+# (connect, read) seconds; connecting to a down backend should fail fast
+API_TIMEOUT = (float(os.getenv("API_CONNECT_TIMEOUT", "2")), float(os.getenv("API_READ_TIMEOUT", "8")))
+API_RETRIES = int(os.getenv("API_RETRIES", "2"))
+API_CACHE_TTL = float(os.getenv("API_CACHE_TTL", "10"))
+API_CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "512"))
+# How long past its TTL an entry with an ETag is kept for If-None-Match revalidation
+API_CACHE_REVALIDATE_FOR = float(os.getenv("API_CACHE_REVALIDATE_FOR", "300"))
+
+
+class EndpointMissing(requests.HTTPError):
+    """The backend has no such route (as opposed to a 404 for a missing resource)."""
+
+
+def _route_missing(resp: requests.Response) -> bool:
+    if resp.status_code == 405:
+        return True
+    if resp.status_code != 404:
+        return False
+    try:
+        return resp.json().get("detail") == "Not Found"  # FastAPI's default for unknown paths
+    except ValueError:
+        return True
+
+
+class ApiClient:
+    def __init__(self, base: str = API_BASE, timeout=API_TIMEOUT, retries: int = API_RETRIES,
+                 cache_ttl: float = API_CACHE_TTL, cache_max_entries: int = API_CACHE_MAX_ENTRIES):
+        self.base = base.rstrip("/")
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self.session = requests.Session()
+        # Reads are retried on connection errors and 502/503/504; writes only when the
+        # connection failed before the request was sent (connect retries apply to all methods)
+        retry = Retry(
+            total=retries, connect=retries, read=retries, status=retries,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # key -> (fresh until, drop after, etag, data), least recently used first
+        self._cache: "OrderedDict[Hashable, Tuple[float, float, Optional[str], Any]]" = OrderedDict()
+        self._variants: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = self.revalidated = self.misses = 0
+
+    # ---------- Requests ----------
+    def _url(self, path: str) -> str:
+        return path if path.startswith("http") else f"{self.base}{path}"
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        resp = self.session.request(method, self._url(path), **kwargs)
+        if _route_missing(resp):
+            raise EndpointMissing(f"{resp.status_code} for {method} {path}", response=resp)
+        resp.raise_for_status()
+        return resp
+
+    @staticmethod
+    def _json(resp: requests.Response):
+        try:
+            return resp.json()
+        except ValueError:
+            return {"status": "ok"}
+
+    def get(self, path: str, params: Optional[dict] = None, ttl: Optional[float] = None,
+            headers: Optional[dict] = None):
+        """GET with a TTL cache; stale entries are revalidated with If-None-Match when an ETag is known."""
+        ttl = self.cache_ttl if ttl is None else ttl
+        headers = dict(headers or {})
+        # The client is shared by every Streamlit session: authenticated reads are cached per token
+        key = (path, tuple(sorted((params or {}).items())), headers.get("Authorization"))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and entry[1] <= now:
+                entry = None
+            if entry:
+                self._cache.move_to_end(key)
+        if entry and entry[0] > now:
+            self.hits += 1
+            return entry[3]
+        if entry and entry[2]:
+            headers["If-None-Match"] = entry[2]
+        resp = self.request("GET", path, params=params or {}, headers=headers)
+        if resp.status_code == 304 and entry:
+            self.revalidated += 1
+            data, etag = entry[3], entry[2]
+        else:
+            self.misses += 1
+            data, etag = resp.json(), resp.headers.get("ETag")
+        if ttl > 0 or etag:
+            self._store(key, (now + ttl, now + ttl + (API_CACHE_REVALIDATE_FOR if etag else 0), etag, data))
+        return data
+
+    def post(self, path: str, payload: Optional[dict] = None, files: Optional[dict] = None,
+             headers: Optional[dict] = None):
+        if files:
+            resp = self.request("POST", path, data=payload or {}, files=files, headers=headers)
+        else:
+            resp = self.request("POST", path, json=payload or {}, headers=headers)
+        self.invalidate()
+        return self._json(resp)
+
+    def put(self, path: str, payload: Optional[dict] = None, headers: Optional[dict] = None,
+            params: Optional[dict] = None):
+        resp = self.request("PUT", path, json=payload or {}, headers=headers, params=params)
+        self.invalidate()
+        return self._json(resp)
+
+    # ---------- Endpoint variants ----------
+    def first_available(self, key: str, attempts: List[tuple]):
+        """
+        Call the first of `attempts` [(method, path, kwargs), ...] whose route exists.
+        The working index is remembered under `key`, so later calls go straight to it.
+        """
+        known = self._variants.get(key)
+        order = [known] if known is not None else range(len(attempts))
+        last_error: Optional[Exception] = None
+        for i in order:
+            method, path, kwargs = attempts[i]
+            try:
+                result = getattr(self, method.lower())(path, **kwargs)
+            except EndpointMissing as e:
+                last_error = e
+                continue
+            self._variants[key] = i
+            return result
+        if known is not None:  # backend changed under us; relearn next time
+            self._variants.pop(key, None)
+        raise last_error or RuntimeError(f"No endpoint available for {key}")
+
+    # ---------- Cache ----------
+    def _store(self, key: Hashable, entry: tuple) -> None:
+        """Insert as most recently used, dropping expired entries and then the least recently used."""
+        now = time.monotonic()
+        with self._lock:
+            for k in [k for k, e in self._cache.items() if e[1] <= now]:
+                del self._cache[k]
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Drop cached GETs for `path` (all params), or everything. Writes call this."""
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+            else:
+                for key in [k for k in self._cache if k[0] == path]:
+                    del self._cache[key]
+
+    def stats(self) -> dict:
+        return {"entries": len(self._cache), "hits": self.hits, "revalidated": self.revalidated,
+                "misses": self.misses, "endpoints": dict(self._variants)}
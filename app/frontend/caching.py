@@ -0,0 +1,159 @@
+# app/frontend/caching.py
+"""Caching layer for the Streamlit app.
+
+Models are loaded once per process (`st.cache_resource`); data, forecasts
+and model outputs are memoised with `st.cache_data`. File-backed entries are
+keyed by a (mtime, size) fingerprint, so replacing a CSV/GeoJSON or a
+nightly forecast file invalidates them without a restart. Hit/miss counters
+feed the sidebar panel.
+"""
+import json
+from collections import Counter
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from app.backend.config import IPC_SEVERITY_GEOJSON, MERGED_SEVERITY_GEOJSON, WFP_FOOD_PRICES
+from app.backend.tasks import forecast_file
+
+
+# ---------- Stats ----------
+@st.cache_resource(show_spinner=False)
+def _counters():
+    return {"calls": Counter(), "misses": Counter()}
+
+def _call(name: str) -> None:
+    _counters()["calls"][name] += 1
+
+def _miss(name: str) -> None:
+    # Only reached when the cached function body actually runs
+    _counters()["misses"][name] += 1
+
+def file_fingerprint(path) -> str:
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return "missing"
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+# ---------- Models ----------
+# Served by the shared inference server when it runs (app.backend.inference);
+# otherwise the first transformer call loads the model into this process
+@st.cache_data(show_spinner="Analysing sentiment…", max_entries=2048)
+def _sentiment(text: str, engine: str) -> dict:
+    _miss("sentiment")
+    from app.backend.sentiment_engines import get_engine
+    return get_engine(engine).analyze(text)
+
+def analyze_sentiment(text: str, engine: str = None) -> dict:
+    """engine: see app.backend.sentiment_engines ("cascade" for quick mood notes)."""
+    _call("sentiment")
+    return _sentiment(text, engine)
+
+@st.cache_data(show_spinner="Tagging image…", max_entries=256)
+def _tag_image(digest: str, topk: int):
+    # Content-addressed: the digest is the key, and tagging reads the stored 224 px model input
+    _miss("image_tags")
+    from app.backend.inference import tag_food_image
+    return tag_food_image(digest=digest, topk=topk)
+
+def tag_stored_image(digest: str, topk: int = 3):
+    _call("image_tags")
+    return _tag_image(digest, topk)
+
+
+# ---------- Data ----------
+@st.cache_data(show_spinner="Loading WFP prices…", max_entries=4)
+def _prices(path: str, fingerprint: str) -> pd.DataFrame:
+    _miss("prices")
+    from app.backend.data_loader import load_wfp_prices
+    return load_wfp_prices(path)
+
+def load_prices() -> pd.DataFrame:
+    _call("prices")
+    return _prices(str(WFP_FOOD_PRICES), file_fingerprint(WFP_FOOD_PRICES))
+
+@st.cache_data(show_spinner="Forecasting…", max_entries=128)
+def _forecast(commodity: str, periods: int, prices_fp: str, precomputed_fp: str) -> pd.DataFrame:
+    _miss("forecast")
+    # Prefer the nightly precomputed file (see app.backend.tasks.precompute_forecasts)
+    if precomputed_fp != "missing":
+        try:
+            data = json.loads(forecast_file(commodity).read_text())
+            if data.get("periods") == periods:
+                fcst = pd.DataFrame(data["forecast"])
+                fcst["ds"] = pd.to_datetime(fcst["ds"])
+                return fcst
+        except (OSError, ValueError, KeyError):
+            pass
+    from app.backend.ml.price_forecast import forecast_prices
+    df = load_prices()
+    _, fcst = forecast_prices(df[df["commodity"] == commodity], periods=periods)
+    return fcst
+
+def forecast_commodity(commodity: str, periods: int = 60) -> pd.DataFrame:
+    _call("forecast")
+    return _forecast(commodity, periods, file_fingerprint(WFP_FOOD_PRICES),
+                     file_fingerprint(forecast_file(commodity)))
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _geojson(path: str, fingerprint: str) -> dict:
+    _miss("geojson")
+    return json.loads(Path(path).read_text())
+
+def load_geojson(path) -> dict:
+    _call("geojson")
+    return _geojson(str(path), file_fingerprint(path))
+
+@st.cache_resource(show_spinner="Building map…", max_entries=4)
+def _severity_map(severity_fp: str, ipc_fp: str):
+    """Folium map with both overlays; returns (map, warnings). Not mutated by callers."""
+    _miss("severity_map")
+    import folium
+    m = folium.Map(location=[30.3753, 69.3451], zoom_start=5, tiles="OpenStreetMap")
+    warnings = []
+    layers = [
+        (MERGED_SEVERITY_GEOJSON, "OCHA 5W Severity", "OCHA", ["admin_code", "severity_score"], ["Admin Code", "Severity"]),
+        (IPC_SEVERITY_GEOJSON, "IPC Food Insecurity", "IPC", ["severity_score"], ["IPC Phase"]),
+    ]
+    for path, name, short, fields, aliases in layers:
+        try:
+            folium.GeoJson(
+                load_geojson(path),
+                name=name,
+                tooltip=folium.GeoJsonTooltip(fields=fields, aliases=aliases),
+            ).add_to(m)
+        except Exception as e:
+            warnings.append(f"⚠️ {short} layer not available: {e}")
+    folium.LayerControl().add_to(m)
+    return m, warnings
+
+def severity_map():
+    _call("severity_map")
+    return _severity_map(file_fingerprint(MERGED_SEVERITY_GEOJSON), file_fingerprint(IPC_SEVERITY_GEOJSON))
+
+
+# ---------- Sidebar ----------
+def render_cache_sidebar(api_client=None, run_seconds: float = None) -> None:
+    counters = _counters()
+    with st.sidebar.expander("⚡ Cache stats"):
+        if run_seconds is not None:
+            st.caption(f"This run: {run_seconds * 1000:.0f} ms")
+        rows = [
+            {"cache": name, "calls": calls, "computed": counters["misses"][name],
+             "hit rate": f"{1 - counters['misses'][name] / calls:.0%}" if calls else "–"}
+            for name, calls in sorted(counters["calls"].items())
+        ]
+        if rows:
+            st.table(pd.DataFrame(rows).set_index("cache"))
+        if api_client is not None:
+            st.caption("API client")
+            st.json(api_client.stats(), expanded=False)
+        if st.button("Clear data caches"):
+            st.cache_data.clear()
+            counters["calls"].clear()
+            counters["misses"].clear()
+            if api_client is not None:
+                api_client.invalidate()
@@ -7,28 +7,27 @@ ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
+import time
+_RUN_STARTED = time.perf_counter()
+
+# Only light imports here. folium, matplotlib, torch/transformers (models) and
+# geopandas (data_loader) are imported inside the page or cached loader that uses
+# them, so first paint doesn't wait for them. Profile with: python -m scripts.profile_imports
 import streamlit as st
-from datetime import datetime
 import json
-import folium
-from streamlit_folium import st_folium
-from geopy.geocoders import Nominatim
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import requests
-from requests.exceptions import RequestException
-
-from app.backend.config import (
-    MERGED_SEVERITY_GEOJSON,
-    IPC_SEVERITY_GEOJSON,
-    WFP_FOOD_PRICES,
+from requests.exceptions import HTTPError, RequestException
+from app.frontend.api_client import API_BASE, API_ROOT, ApiClient
+
+from app.backend.geocoding import geocode, geocode_batch
+from app.frontend.caching import (
+    analyze_sentiment,
+    forecast_commodity,
+    load_prices,
+    render_cache_sidebar,
+    severity_map,
+    tag_stored_image,
 )
-from app.backend.data_loader import load_wfp_prices
-from app.backend.models.price_forecast import forecast_prices
-from app.backend.models.image_tagging import tag_food_image
-import PIL.Image as Image
-from app.backend.models.sentiment import analyze_sentiment
 
 # --- Donor–NGO Workflow Imports (kept for reference) ---
 # These local helpers remain available but the front-end will call the backend APIs.
@@ -42,53 +41,112 @@ except Exception:
 # -----------------------------
 # API CONFIG / HELPERS
 # -----------------------------
-# Base API URL (override with STREAMLIT_API_URL env var)
-API_BASE = os.environ.get("STREAMLIT_API_URL", "http://127.0.0.1:8000/api").rstrip("/")
-API_TIMEOUT = 8  # seconds
-
-def _api_get(path: str, params: dict = None):
-    url = f"{API_BASE}{path}"
+# Base API URL (override with STREAMLIT_API_URL env var); see app/frontend/api_client.py
+@st.cache_resource(show_spinner=False)
+def get_api_client() -> ApiClient:
+    """One pooled client per Streamlit process, shared by every session and rerun."""
+    return ApiClient(API_BASE)
+
+def _auth_headers() -> dict:
+    """Bearer header for this browser session's login (see ngo_login_panel), if any."""
+    token = st.session_state.get("api_token")
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
+def _api_call(method: str, path: str, **kwargs):
     try:
-        r = requests.get(url, params=params or {}, timeout=API_TIMEOUT)
-        r.raise_for_status()
-        return r.json()
+        return getattr(get_api_client(), method)(path, headers=_auth_headers(), **kwargs)
     except RequestException as e:
-        st.error(f"API GET failed ({url}): {e}")
+        st.error(f"API {method.upper()} failed ({API_BASE}{path}): {e}")
         raise
 
+def _api_get(path: str, params: dict = None, ttl: float = None):
+    return _api_call("get", path, params=params, ttl=ttl)
+
 def _api_post(path: str, payload: dict = None, files: dict = None):
-    url = f"{API_BASE}{path}"
+    return _api_call("post", path, payload=payload, files=files)
+
+def _api_put(path: str, payload: dict = None, params: dict = None):
+    return _api_call("put", path, payload=payload, params=params)
+
+def _api_first(key: str, attempts: list):
+    """First endpoint variant that exists (learned once per process, see ApiClient.first_available)."""
+    headers = _auth_headers()
+    attempts = [(method, path, {**kwargs, "headers": headers}) for method, path, kwargs in attempts]
     try:
-        if files:
-            # multipart/form-data (files present)
-            r = requests.post(url, data=payload or {}, files=files, timeout=API_TIMEOUT)
-        else:
-            r = requests.post(url, json=payload or {}, timeout=API_TIMEOUT)
-        r.raise_for_status()
-        return r.json()
+        return get_api_client().first_available(key, attempts)
     except RequestException as e:
-        st.error(f"API POST failed ({url}): {e}")
+        st.error(f"API call failed ({key}): {e}")
         raise
 
-def _api_put(path: str, payload: dict = None):
-    url = f"{API_BASE}{path}"
-    try:
-        r = requests.put(url, json=payload or {}, timeout=API_TIMEOUT)
-        r.raise_for_status()
-        # Some put endpoints may return no json
+def _auth_failure(e: Exception):
+    """User-facing message if `e` is a 401/403 from the API (the login expired or lacks the role)."""
+    status = getattr(getattr(e, "response", None), "status_code", None)
+    if status == 401:
+        st.session_state.pop("api_token", None)
+        st.session_state.pop("api_user", None)
+        return "🔒 Your session has expired — please log in again."
+    if status == 403:
+        return "🔒 Your account doesn't have the NGO role needed for this."
+    return None
+
+def ngo_login_panel(key: str) -> bool:
+    """Login form for NGO staff (claims and deliveries need an NGO token); True once signed in."""
+    user = st.session_state.get("api_user")
+    if user:
+        col1, col2 = st.columns([4, 1])
+        col1.caption(f"Signed in as {user['name']} ({user['role']})")
+        if col2.button("Sign out", key=f"{key}_logout"):
+            st.session_state.pop("api_token", None)
+            st.session_state.pop("api_user", None)
+            st.experimental_rerun()
+        return True
+    with st.form(f"{key}_login"):
+        st.markdown("🔒 **NGO login** — required to claim donations or mark them delivered")
+        email = st.text_input("Email", key=f"{key}_email")
+        password = st.text_input("Password", type="password", key=f"{key}_password")
+        submitted = st.form_submit_button("Log in")
+    if submitted:
         try:
-            return r.json()
-        except Exception:
-            return {"status": "ok"}
-    except RequestException as e:
-        st.error(f"API PUT failed ({url}): {e}")
-        raise
+            resp = get_api_client().post("/auth/login", {"email": email, "password": password})
+        except HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            st.error("Invalid email or password." if status == 401 else f"Login failed: {e}")
+            return False
+        except RequestException as e:
+            st.error(f"Login failed — is the backend running? ({e})")
+            return False
+        st.session_state["api_token"] = resp["access_token"]
+        st.session_state["api_user"] = resp["user"]
+        st.experimental_rerun()
+    return False
 
 # Concrete API wrappers (match current backend routes)
 def api_list_donations(status: str = None):
     params = {"status": status} if status else None
     return _api_get("/donations/", params=params)
 
+def api_donations_live():
+    """
+    Donations kept in session_state and updated from the event feed: the full list is
+    fetched once (or after a reset), later reruns only apply created/claimed/delivered deltas.
+    """
+    cache = st.session_state.setdefault("donations_live", {"cursor": None, "rows": {}})
+    if cache["cursor"] is not None:
+        feed = _api_get("/events/donations/poll", params={"after": cache["cursor"]}, ttl=0)
+        if not feed.get("reset"):
+            for ev in feed.get("events", []):
+                data = ev["data"]
+                row = cache["rows"].get(data["id"], {})
+                if data.get("version", 0) >= row.get("version", -1):
+                    cache["rows"][data["id"]] = {**row, **data}
+            cache["cursor"] = feed["last_id"]
+            return list(cache["rows"].values())
+    # Take the cursor before the snapshot; replayed events are applied idempotently by version
+    cursor = _api_get("/events/donations/poll", ttl=0)["last_id"]
+    cache["rows"] = {d["id"]: d for d in _api_get("/donations/", ttl=0)}
+    cache["cursor"] = cursor
+    return list(cache["rows"].values())
+
 def api_submit_donation(donor_name, contact, location, food_desc, mood=None, image_bytes=None, image_filename=None):
     # Trying to match DonationCreate payload commonly expected by your backend.
     # If backend expects different keys, adjust accordingly.
@@ -104,52 +162,35 @@ def api_submit_donation(donor_name, contact, location, food_desc, mood=None, ima
     # If image provided, send multipart
     if image_bytes is not None and image_filename:
         files = {"image": (image_filename, image_bytes, "image/jpeg")}
-        url = f"{API_BASE}/donations/"  # call directly for file upload
-        try:
-            r = requests.post(url, data=payload, files=files, timeout=API_TIMEOUT)
-            r.raise_for_status()
-            return r.json()
-        except RequestException as e:
-            st.error(f"API POST file upload failed ({url}): {e}")
-            raise
+        return _api_post("/donations/", payload, files=files)
     else:
         return _api_post("/donations/", payload)
 
 def api_claim_donation(donation_id: int, ngo_name: str, ngo_contact: str = ""):
-    # Backend exposes PUT /donations/{id}/claim
-    payload = {"ngo_name": ngo_name, "ngo_contact": ngo_contact}
-    return _api_put(f"/donations/{donation_id}/claim", payload)
+    # Backend exposes PUT /donations/{id}/claim?ngo_name=...&ngo_contact=... (NGO token required)
+    params = {"ngo_name": ngo_name, "ngo_contact": ngo_contact or None}
+    return _api_put(f"/donations/{donation_id}/claim", params={k: v for k, v in params.items() if v})
 
 def api_mark_delivered(donation_id: int):
-    # Try a donation-level endpoint first: POST /donations/{id}/deliver
-    try:
-        return _api_post(f"/donations/{donation_id}/deliver", {"donation_id": donation_id})
-    except Exception:
-        # Fallback: try updating a delivery record if backend uses delivery endpoints.
-        try:
-            return _api_put(f"/delivery/{donation_id}/update-status", {"status": "delivered"})
-        except Exception:
-            raise RuntimeError("No delivery endpoint available to mark delivered")
+    # POST /donations/{id}/deliver, or a delivery-record update on older backends
+    return _api_first("mark_delivered", [
+        ("post", f"/donations/{donation_id}/deliver", {"payload": {"donation_id": donation_id}}),
+        ("put", f"/delivery/{donation_id}/update-status", {"payload": {"status": "delivered"}}),
+    ])
 
 def api_get_deliveries():
-    # Try common endpoints
-    try:
-        return _api_get("/delivery/routes")
-    except Exception:
-        try:
-            return _api_get("/delivery")
-        except Exception:
-            # last attempt
-            return _api_get("/deliveries")
+    return _api_first("deliveries", [
+        ("get", "/delivery/routes", {}),
+        ("get", "/delivery", {}),
+        ("get", "/deliveries", {}),
+    ])
 
 def api_get_analytics():
-    try:
-        return _api_get("/analytics/summary")
-    except Exception:
-        try:
-            return _api_get("/analytics")
-        except Exception:
-            return _api_get("/analytics/severity")
+    return _api_first("analytics", [
+        ("get", "/analytics/summary", {}),
+        ("get", "/analytics", {}),
+        ("get", f"{API_ROOT}/analytics/severity", {}),
+    ])
 
 # -----------------------------
 # Local JSON helpers (kept for compatibility but NOT used if API is available)
@@ -173,15 +214,8 @@ def save_donations_json_local(data):
 # -----------------------------
 @st.cache_data(show_spinner=False)
 def geocode_location_cached(location_text):
-    """Cache geocoding results to avoid re-fetching same location."""
-    geolocator = Nominatim(user_agent="share2care_geocoder")
-    try:
-        loc = geolocator.geocode(location_text, timeout=6)
-        if loc:
-            return (loc.latitude, loc.longitude)
-    except Exception:
-        return None
-    return None
+    """Cache geocoding results to avoid re-fetching same location (offline gazetteer)."""
+    return geocode(location_text)
 
 # -----------------------------
 # PAGE CONFIG
@@ -201,7 +235,8 @@ st.markdown(
 # -----------------------------
 # NAVIGATION
 # -----------------------------
-tabs = st.tabs([
+# st.tabs runs every tab body on each rerun; a radio only runs the selected page (dispatched at the end)
+PAGES = [
     "🗺️ Map View",
     "📊 Prices & Forecast",
     "💚 Psychology Layer",
@@ -210,49 +245,31 @@ tabs = st.tabs([
     "🍛 Donate Food",
     "🤝 NGO Dashboard",
     "🚚 Volunteer / Delivery"
-])
+]
+page = st.radio("Navigate", PAGES, horizontal=True, key="page", label_visibility="collapsed")
 
 # -----------------------------
 # TAB 1: MAP VIEW
 # -----------------------------
-with tabs[0]:
+def page_map():
+    from streamlit_folium import st_folium
     st.subheader("Food Insecurity Map of Pakistan")
 
-    m = folium.Map(location=[30.3753, 69.3451], zoom_start=5, tiles="OpenStreetMap")
-
-    # OCHA 5W overlay
-    try:
-        folium.GeoJson(
-            str(MERGED_SEVERITY_GEOJSON),
-            name="OCHA 5W Severity",
-            tooltip=folium.GeoJsonTooltip(fields=["admin_code", "severity_score"],
-                                          aliases=["Admin Code", "Severity"])
-        ).add_to(m)
-    except Exception as e:
-        st.warning(f"⚠️ OCHA layer not available: {e}")
-
-    # IPC overlay
-    try:
-        folium.GeoJson(
-            str(IPC_SEVERITY_GEOJSON),
-            name="IPC Food Insecurity",
-            tooltip=folium.GeoJsonTooltip(fields=["severity_score"],
-                                          aliases=["IPC Phase"])
-        ).add_to(m)
-    except Exception as e:
-        st.warning(f"⚠️ IPC layer not available: {e}")
-
-    folium.LayerControl().add_to(m)
+    # OCHA 5W + IPC overlays; built once per GeoJSON version (see app/frontend/caching.py)
+    m, layer_warnings = severity_map()
+    for w in layer_warnings:
+        st.warning(w)
     st_map = st_folium(m, width=1000, height=600)
 
 # -----------------------------
 # TAB 2: PRICES
 # -----------------------------
-with tabs[1]:
+def page_prices():
+    import matplotlib.pyplot as plt
     st.subheader("Food Prices & Forecast (WFP Data)")
 
     try:
-        df = load_wfp_prices()
+        df = load_prices()
         commodities = df["commodity"].unique().tolist()
         selected = st.selectbox("Choose a commodity:", commodities)
 
@@ -262,9 +279,9 @@ with tabs[1]:
         fig, ax = plt.subplots(figsize=(8, 4))
         ax.plot(df_sel["date"], df_sel["price"], label="Observed")
 
-        # Forecast future (uses your existing forecast_prices function)
+        # Forecast future (nightly precomputed file when available, else computed once and cached)
         try:
-            hist, fcst = forecast_prices(df_sel, periods=60)
+            fcst = forecast_commodity(selected, periods=60)
             ax.plot(fcst["ds"], fcst["yhat"], label="Forecast")
             # Some fcst implementations may lack bounds — guard access
             if "yhat_lower" in fcst.columns and "yhat_upper" in fcst.columns:
@@ -284,7 +301,7 @@ with tabs[1]:
 # -----------------------------
 # TAB 3: PSYCHOLOGY LAYER
 # -----------------------------
-with tabs[2]:
+def page_psychology():
     st.subheader("Psychology Layer 💚")
 
     st.markdown("Boost altruism, form habits, and reflect on your mood.")
@@ -304,7 +321,7 @@ with tabs[2]:
 
     if st.button("Analyze Mood"):
         if note.strip():
-            res = analyze_sentiment(note)
+            res = analyze_sentiment(note, engine="cascade")
             label, score = res["label"], res["score"]
 
             st.write(f"Your note: *{note}*")
@@ -320,18 +337,26 @@ with tabs[2]:
 # -----------------------------
 # TAB 4: FOOD IMAGE TAGGING
 # -----------------------------
-with tabs[3]:
+def page_food_recognition():
+    from app.backend.images import ImageRejected, get_image_store
     st.subheader("🍲 Food Recognition")
 
     st.markdown("Upload a food photo and the app will auto-tag it using MobileNet.")
 
     uploaded = st.file_uploader("Upload a food image", type=["jpg","jpeg","png"])
     if uploaded:
-        img = Image.open(uploaded).convert("RGB")
-        st.image(img, caption="Uploaded Image", use_column_width=True)
+        # Stored once per distinct photo; the preview is the small thumbnail, not a full-size decode
+        store = get_image_store()
+        try:
+            uploaded.seek(0)
+            stored = store.put(uploaded)
+        except ImageRejected as e:
+            st.error(f"❌ {e}")
+            return
+        st.image(str(store.derivative(stored.digest, "thumb")), caption="Uploaded Image")
 
         try:
-            labels = tag_food_image(img, topk=3)
+            labels = tag_stored_image(stored.digest, topk=3)
 
             if labels and labels[0][0] == "No food detected":
                 st.warning("⚠️ No food items detected in this image. Try another photo with clearer food content.")
@@ -347,7 +372,7 @@ with tabs[3]:
 # -----------------------------
 # TAB 5: SENTIMENT ANALYSIS
 # -----------------------------
-with tabs[4]:
+def page_sentiment():
     st.subheader("📝 Donor Note Sentiment Analysis")
 
     st.markdown("Write a short note about your pledge or how you feel, and AI will analyze it instantly.")
@@ -372,7 +397,7 @@ with tabs[4]:
 # ----------------------------- #
 # TAB 6: DONOR–NGO WORKFLOW
 # ----------------------------- #
-with tabs[5]:
+def page_donate():
     st.subheader("🤝 Donor–NGO Food Sharing Workflow")
 
     st.markdown("""
@@ -398,7 +423,8 @@ with tabs[5]:
         # --- Sentiment Analysis ---
         mood = None
         if note.strip():
-            res = analyze_sentiment(note)
+            # Only picks one of three encouragement messages: the lexicon settles most notes
+            res = analyze_sentiment(note, engine="cascade")
             mood = res["label"]
 
         if st.button("🚀 Submit Donation"):
@@ -448,34 +474,47 @@ with tabs[5]:
             id_col = "id" if "id" in available_df.columns else ("donation_id" if "donation_id" in available_df.columns else None)
             id_choices = available_df[id_col].tolist() if id_col else []
             selected_id = st.selectbox("Select Donation ID to Claim:", id_choices)
+            signed_in = ngo_login_panel("donate")
             ngo_name = st.text_input("Enter your NGO Name")
             ngo_contact = st.text_input("Enter NGO contact (optional)")
 
-            if st.button("Claim Selected Donation"):
+            if st.button("Claim Selected Donation", disabled=not signed_in):
                 if ngo_name.strip():
                     try:
                         claim_resp = api_claim_donation(selected_id, ngo_name, ngo_contact)
                         st.success(f"✅ Donation ID {selected_id} has been claimed by {ngo_name}!")
                         st.json(claim_resp)
-                    except Exception:
-                        st.error("❌ Claim failed — ensure backend is running and endpoint exists.")
+                    except Exception as e:
+                        st.error(_auth_failure(e) or "❌ Claim failed — ensure backend is running and endpoint exists.")
                 else:
                     st.error("Please enter your NGO name before claiming.")
 
 # ----------------------------- #
 # TAB 7: NGO DASHBOARD
 # ----------------------------- #
-with tabs[6]:
+def page_ngo_dashboard():
     st.subheader("📊 NGO Dashboard — Donation Status Overview")
 
     # Fetch full donation list (all statuses)
     try:
-        donations_list_all = _api_get("/donations/")
+        donations_list_all = api_donations_live()
         df = pd.DataFrame(donations_list_all) if donations_list_all else pd.DataFrame()
     except Exception:
         st.error("❌ Could not fetch donations from backend. Please start the backend and set STREAMLIT_API_URL.")
         st.stop()
 
+    # --- Daily trend from pre-aggregated rollups (a few rows, not the raw table) ---
+    try:
+        trend = _api_get(f"{API_ROOT}/analytics/rollups", params={"dimension": "status", "granularity": "day"})
+        trend_df = pd.DataFrame(trend.get("buckets", []))
+        if not trend_df.empty:
+            st.markdown("### 📈 Donations per Day by Status (last 30 days)")
+            st.line_chart(trend_df.pivot_table(index="bucket_start", columns="value", values="count", fill_value=0))
+    except RequestException:
+        pass  # _api_get has already shown the error
+    except (KeyError, ValueError) as e:
+        st.warning(f"Could not draw the status trend: {e}")
+
     if df.empty:
         st.info("No donations submitted yet.")
     else:
@@ -486,51 +525,54 @@ with tabs[6]:
         st.markdown("### 🔍 Filter by Status")
         filter_option = st.selectbox("Select Status", ["All", "Available", "Claimed", "Delivered", "Open"])
         if filter_option != "All":
-            df = df[df["status"].str.contains(filter_option, na=False)]
+            df = df[df["status"].str.contains(filter_option, case=False, na=False)]
 
         st.dataframe(df)
 
         # --- Claimed donations summary ---
         st.markdown("### 🏢 Claimed Donations Summary")
-        claimed_df = df[df["status"].str.contains("Claimed", na=False)]
+        claimed_df = df[df["status"].str.contains("Claimed", case=False, na=False)]
         if claimed_df.empty:
             st.info("No donations have been claimed yet.")
         else:
-            cols_show = [c for c in ["donation_id", "id", "donor_name", "ngo_name", "claimed_at", "food_description", "food_item"] if c in claimed_df.columns]
+            cols_show = [c for c in ["donation_id", "id", "donor_name", "ngo_name", "claimed_by", "claimed_at", "food_description", "food_item"] if c in claimed_df.columns]
             st.table(claimed_df[cols_show])
 
         # --- Donor → NGO Claim Workflow (also allow claim from dashboard) ---
         st.markdown("### 🤝 Claim a Donation")
+        signed_in = ngo_login_panel("dashboard")
         donation_id_claim = st.number_input("Enter Donation ID to claim", min_value=1, step=1, key="claim_id_dashboard")
         ngo_name = st.text_input("NGO Name", key="ngo_name_input_dashboard")
         ngo_contact = st.text_input("NGO Contact (optional)", key="ngo_contact_input_dashboard")
 
-        if st.button("Claim Donation (Dashboard)"):
+        if st.button("Claim Donation (Dashboard)", disabled=not signed_in):
             try:
                 resp = api_claim_donation(donation_id_claim, ngo_name, ngo_contact)
                 st.success(f"Donation {donation_id_claim} successfully claimed by {ngo_name}.")
                 st.json(resp)
                 st.experimental_rerun()
-            except Exception:
-                st.error("❌ Could not claim donation — check backend endpoints and ID.")
+            except Exception as e:
+                st.error(_auth_failure(e) or "❌ Could not claim donation — check backend endpoints and ID.")
 
         # --- Mark Claimed Donations as Delivered ---
         st.markdown("### 📦 Mark Donation as Delivered")
         donation_id_deliver = st.number_input("Enter Claimed Donation ID", min_value=1, step=1, key="deliver_id_dashboard")
 
-        if st.button("Mark as Delivered"):
+        if st.button("Mark as Delivered", disabled=not signed_in):
             try:
                 resp = api_mark_delivered(donation_id_deliver)
                 st.success(f"Donation {donation_id_deliver} marked as Delivered.")
                 st.json(resp)
                 st.experimental_rerun()
-            except Exception:
-                st.error("❌ Could not mark as delivered — check backend endpoints and ID.")
+            except Exception as e:
+                st.error(_auth_failure(e) or "❌ Could not mark as delivered — check backend endpoints and ID.")
 
 # ----------------------------- #
 # TAB 8: VOLUNTEER / DELIVERY COORDINATION
 # ----------------------------- #
-with tabs[7]:
+def page_delivery():
+    import folium
+    from streamlit_folium import st_folium
     st.subheader("🚚 Volunteer / Delivery Coordination")
 
     st.markdown(
@@ -563,6 +605,9 @@ with tabs[7]:
         show_routes = st.checkbox("Show map with delivery points & routes")
         if show_routes:
             m = folium.Map(location=[30.3753, 69.3451], zoom_start=5)
+            # resolve every text location in one pass (local gazetteer + shared cache)
+            text_locations = [d.get(k) for d in deliveries for k in ("pickup_location", "dropoff_location") if d.get(k)]
+            geocoded = geocode_batch(text_locations) if text_locations else {}
             for d in deliveries:
                 # Expecting each delivery may have 'pickup_coords'/'dropoff_coords' or lat/lon fields
                 pickup = d.get("pickup_coords") or d.get("pickup_latlon") or d.get("pickup") or d.get("pickup_coords_list")
@@ -571,9 +616,9 @@ with tabs[7]:
                 status = d.get("status", "scheduled")
                 # attempt to geocode text locations if coords not present
                 if not pickup and d.get("pickup_location"):
-                    pickup = geocode_location_cached(d.get("pickup_location"))
+                    pickup = geocoded.get(d.get("pickup_location"))
                 if not dropoff and d.get("dropoff_location"):
-                    dropoff = geocode_location_cached(d.get("dropoff_location"))
+                    dropoff = geocoded.get(d.get("dropoff_location"))
 
                 if pickup and isinstance(pickup, (list, tuple)) and len(pickup) >= 2:
                     folium.Marker([pickup[0], pickup[1]], popup=f"Pickup - {d.get('delivery_id') or d.get('id','')}\nVolunteer: {volunteer}", icon=folium.Icon(color="green")).add_to(m)
@@ -595,3 +640,19 @@ with tabs[7]:
             st.json(analytics)
         except Exception:
             st.error("❌ Could not fetch analytics from backend.")
+
+PAGE_RENDERERS = dict(zip(PAGES, [
+    page_map,
+    page_prices,
+    page_psychology,
+    page_food_recognition,
+    page_sentiment,
+    page_donate,
+    page_ngo_dashboard,
+    page_delivery,
+]))
+try:
+    PAGE_RENDERERS[page]()
+finally:
+    # Rendered last so the numbers include this run (also after a page calls st.stop())
+    render_cache_sidebar(get_api_client(), run_seconds=time.perf_counter() - _RUN_STARTED)
@@ -0,0 +1,137 @@
+"""Benchmark bulk donation ingestion against the one-donation-per-request path.
+
+Loads the same generated donations into two throwaway SQLite databases: once
+through routes.donations.create_donation (one ORM insert, aggregate/rollup
+update and commit per donation) and once through bulk_create_donations fed
+an NDJSON/CSV/JSON body in small pieces, as it would arrive over the network.
+Reports rows/s for each and checks both paths leave identical
+community_stats.
+
+    python -m scripts.bench_bulk_ingest --rows 20000 --format ndjson
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine, select
+from starlette.requests import Request
+
+from app.backend import ingest, models
+from app.backend.routes.donations import bulk_create_donations, create_donation
+
+CONTENT_TYPES = {"json": "application/json", "ndjson": "application/x-ndjson", "csv": "text/csv"}
+CATEGORIES = ["Food", "Water", "Medicine", "Clothing", "Shelter"]
+
+
+def _engine(path: str):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA journal_mode=WAL")
+        dbapi_conn.execute("PRAGMA synchronous=NORMAL")
+
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as s:
+        s.add_all(models.Community(name=f"community {i}", location="", population=1000 * (i + 1)) for i in range(20))
+        s.commit()
+    return engine
+
+
+def make_rows(n: int, invalid_every: int, seed: int = 7):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        row = {"title": f"{rng.choice(CATEGORIES).lower()} #{i}", "quantity": rng.randint(1, 50),
+               "category": rng.choice(CATEGORIES), "community_id": rng.randint(1, 20)}
+        if invalid_every and i % invalid_every == invalid_every - 1:
+            row["quantity"] = "lots"  # fails validation on both paths
+        rows.append(row)
+    return rows
+
+
+def encode(rows, fmt: str) -> bytes:
+    if fmt == "json":
+        return json.dumps(rows).encode()
+    if fmt == "ndjson":
+        return "".join(json.dumps(r) + "\n" for r in rows).encode()
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=["title", "quantity", "category", "community_id"])
+    writer.writeheader()
+    writer.writerows(rows)
+    return buf.getvalue().encode()
+
+
+def per_item(engine, rows):
+    ok = 0
+    for row in rows:
+        try:
+            payload = models.DonationCreate.model_validate(row)
+        except ValueError:
+            continue
+        with Session(engine) as s:
+            create_donation(payload, session=s)
+        ok += 1
+    return ok
+
+
+def bulk(engine, body: bytes, fmt: str, piece: int = 64 * 1024):
+    pieces = [body[i:i + piece] for i in range(0, len(body), piece)]
+
+    async def receive():
+        return {"type": "http.request", "body": pieces.pop(0) if pieces else b"", "more_body": bool(pieces)}
+
+    async def go():
+        scope = {"type": "http", "method": "POST", "path": "/api/donations/bulk", "query_string": b"",
+                 "headers": [(b"content-type", CONTENT_TYPES[fmt].encode())]}
+        with Session(engine) as s:
+            return await bulk_create_donations(Request(scope, receive), format=None, atomic=False,
+                                               errors_only=True, session=s)
+
+    return asyncio.run(go())
+
+
+def community_stats(engine):
+    S = models.CommunityStats
+    with Session(engine) as s:
+        return s.exec(select(S.community_id, S.donations_received, S.quantity_received, S.open_count)
+                      .order_by(S.community_id)).all()
+
+
+def run(n_rows: int, fmt: str, invalid_every: int, tmp: str):
+    rows = make_rows(n_rows, invalid_every)
+    body = encode(rows, fmt)
+    print(f"{n_rows:,} rows ({len(body) / 1e6:.1f} MB {fmt}), chunk size {ingest.BULK_CHUNK_SIZE}")
+
+    single_engine = _engine(os.path.join(tmp, "per_item.db"))
+    t0 = time.perf_counter()
+    ok = per_item(single_engine, rows)
+    dt_single = time.perf_counter() - t0
+    print(f"per-item: {ok:,} created in {dt_single:.2f}s ({ok / dt_single:,.0f} rows/s)")
+
+    bulk_engine = _engine(os.path.join(tmp, "bulk.db"))
+    t0 = time.perf_counter()
+    report = bulk(bulk_engine, body, fmt)
+    dt_bulk = time.perf_counter() - t0
+    print(f"bulk:     {report.created:,} created, {report.failed:,} rejected in {dt_bulk:.2f}s "
+          f"({report.received / dt_bulk:,.0f} rows/s)  -> {dt_single / dt_bulk:.1f}x")
+
+    assert report.created == ok, f"bulk created {report.created}, per-item {ok}"
+    assert community_stats(single_engine) == community_stats(bulk_engine), "community_stats differ between paths"
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=5000)
+    ap.add_argument("--format", choices=sorted(CONTENT_TYPES), default="ndjson")
+    ap.add_argument("--invalid-every", type=int, default=100, help="make every Nth row invalid (0 = none)")
+    args = ap.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        run(args.rows, args.format, args.invalid_every, tmp)
@@ -0,0 +1,96 @@
+"""Contention benchmark for the atomic donation claim route.
+
+Hundreds of concurrent "NGOs" race to claim the same donations through
+routes.donations.claim_donation / bulk_claim_donations against a throwaway
+SQLite database. Verifies every donation is claimed exactly once and reports
+throughput.
+
+    python -m scripts.bench_claim_contention --donations 500 --claimers 200
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from app.backend import models
+from app.backend.routes.donations import claim_donation, bulk_claim_donations
+
+
+def _engine(path: str, pool_size: int):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30},
+                           pool_size=pool_size, max_overflow=0)
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA journal_mode=WAL")
+        dbapi_conn.execute("PRAGMA synchronous=NORMAL")
+
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def run(n_donations: int, n_claimers: int, bulk_size: int, path: str):
+    engine = _engine(path, pool_size=n_claimers)
+    with Session(engine) as s:
+        s.add_all(models.Donation(title=f"rice #{i}", quantity=5) for i in range(n_donations))
+        s.commit()
+        ids = s.exec(select(models.Donation.id)).all()
+
+    def single(args):
+        claimer, donation_id = args
+        with Session(engine) as s:
+            try:
+                claim_donation(donation_id, ngo_name=f"ngo{claimer}", session=s)
+                return 200
+            except HTTPException as e:
+                return e.status_code
+
+    # every claimer tries every donation, interleaved
+    work = [(c, ids[(c + k) % len(ids)]) for k in range(len(ids)) for c in range(n_claimers)]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_claimers) as pool:
+        codes = list(pool.map(single, work))
+    dt = time.perf_counter() - t0
+    ok, conflicts = codes.count(200), codes.count(409)
+    print(f"single: {len(work):,} claim requests from {n_claimers} claimers in {dt:.2f}s "
+          f"({len(work) / dt:,.0f} req/s); 200={ok} 409={conflicts} other={len(codes) - ok - conflicts}")
+    assert ok == len(ids), f"expected exactly {len(ids)} successful claims, got {ok}"
+
+    # reset and race bulk claims over overlapping batches
+    with Session(engine) as s:
+        for d in s.exec(select(models.Donation)).all():
+            d.status, d.claimed_by = models.DonationStatus.PENDING.value, None
+            s.add(d)
+        s.commit()
+
+    def bulk(claimer):
+        start = (claimer * bulk_size // 2) % len(ids)
+        batch = [ids[(start + k) % len(ids)] for k in range(bulk_size)]
+        with Session(engine) as s:
+            req = models.BulkClaimRequest(donation_ids=batch, ngo_name=f"ngo{claimer}")
+            return len(bulk_claim_donations(req, session=s).claimed)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_claimers) as pool:
+        claimed = sum(pool.map(bulk, range(n_claimers)))
+    dt = time.perf_counter() - t0
+    with Session(engine) as s:
+        in_db = len(s.exec(select(models.Donation).where(models.Donation.status == "claimed")).all())
+    print(f"bulk:   {n_claimers} requests x {bulk_size} ids in {dt:.2f}s "
+          f"({n_claimers * bulk_size / dt:,.0f} ids/s); claimed={claimed} rows claimed in db={in_db}")
+    assert claimed == in_db, "a donation was reported claimed twice"
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--donations", type=int, default=500)
+    ap.add_argument("--claimers", type=int, default=200)
+    ap.add_argument("--bulk-size", type=int, default=50)
+    args = ap.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        run(args.donations, args.claimers, args.bulk_size, os.path.join(tmp, "contention.db"))
@@ -0,0 +1,87 @@
+"""Benchmark the tagger's image preprocessing on phone-photo sized JPEGs.
+
+Compares the old torchvision path (full decode, Resize(256), CenterCrop(224),
+ToTensor, Normalize) with app.backend.ml.preprocess (draft-mode decode,
+one fused resize-crop, in-place normalise into a channels-last buffer), per
+image size, and reports how far apart the two tensors are. With --forward it
+also times a MobileNetV2 forward pass (random weights, no download) for
+scale.
+
+    python -m scripts.bench_image_preprocess --sizes 4032x3024,3264x2448,1920x1080 --repeat 20
+"""
+import argparse
+import io
+import time
+
+import numpy as np
+import torch
+import torchvision.transforms as T
+from PIL import Image
+
+from app.backend.ml.preprocess import open_image, preprocess
+
+LEGACY = T.Compose([
+    T.Resize(256),
+    T.CenterCrop(224),
+    T.ToTensor(),
+    T.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+])
+
+
+def synthetic_jpeg(width: int, height: int, seed: int = 0) -> bytes:
+    """Smooth gradients plus sensor-like noise, so the JPEG compresses like a photo."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([x / width, y / height, (x + y) / (width + height)], axis=-1) * 200
+    pixels = np.clip(base + rng.normal(0, 12, size=base.shape), 0, 255).astype(np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+
+def timed(fn, repeat: int):
+    fn()  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return (time.perf_counter() - t0) / repeat * 1000, out
+
+
+def legacy(data: bytes) -> torch.Tensor:
+    img = Image.open(io.BytesIO(data)).convert("RGB")
+    return LEGACY(img).unsqueeze(0)
+
+
+def main(sizes, repeat: int, forward: bool, threads: int):
+    torch.set_num_threads(threads)
+    print(f"{'size':>11} {'MB':>5} | {'legacy decode':>13} {'legacy total':>12} | "
+          f"{'fast decode':>11} {'fast total':>10} | {'speedup':>7} {'mean |diff|':>11}")
+    for width, height in sizes:
+        data = synthetic_jpeg(width, height)
+        legacy_decode, _ = timed(lambda: Image.open(io.BytesIO(data)).convert("RGB"), repeat)
+        legacy_total, ref = timed(lambda: legacy(data), repeat)
+        fast_decode, _ = timed(lambda: open_image(data).load(), repeat)
+        fast_total, out = timed(lambda: preprocess(data).clone(), repeat)
+        diff = (ref - out).abs().mean().item()
+        print(f"{width:>5}x{height:<5} {len(data) / 1e6:5.1f} | {legacy_decode:10.1f} ms {legacy_total:9.1f} ms | "
+              f"{fast_decode:8.1f} ms {fast_total:7.1f} ms | {legacy_total / fast_total:6.1f}x {diff:11.4f}")
+
+    if forward:
+        from torchvision import models
+        model = models.mobilenet_v2(weights=None).eval().to(memory_format=torch.channels_last)
+        inp = preprocess(synthetic_jpeg(*sizes[0])).clone()
+        with torch.no_grad():
+            ms, _ = timed(lambda: model(inp), repeat)
+        print(f"\nMobileNetV2 forward pass (batch 1, {threads} threads): {ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", default="4032x3024,3264x2448,1920x1080",
+                    help="comma-separated WxH (defaults: 12 MP, 8 MP and 2 MP phone photos)")
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--threads", type=int, default=1, help="torch intra-op threads (web workers usually get 1)")
+    ap.add_argument("--forward", action="store_true", help="also time a MobileNetV2 forward pass")
+    args = ap.parse_args()
+    sizes = [tuple(int(v) for v in s.lower().split("x")) for s in args.sizes.split(",")]
+    main(sizes, args.repeat, args.forward, args.threads)
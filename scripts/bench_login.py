@@ -0,0 +1,50 @@
+"""Password-verification throughput benchmark.
+
+Reports bcrypt verifies/sec inline (what a login used to cost a web worker)
+and through the security module's process pool, normalised per core.
+
+    BCRYPT_ROUNDS=12 PASSWORD_HASH_WORKERS=4 python -m scripts.bench_login --logins 200
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from app.backend import security
+
+
+async def _pooled(n: int, hashed: str):
+    # stay under the queue limit so the benchmark measures throughput, not shedding
+    sem = asyncio.Semaphore(security.HASH_QUEUE_LIMIT)
+
+    async def one():
+        async with sem:
+            ok, _ = await security.verify_password("correct horse", hashed)
+            assert ok
+
+    await asyncio.gather(*(one() for _ in range(n)))
+
+
+def main(n: int):
+    hashed = security.pwd_context.hash("correct horse")
+    print(f"bcrypt rounds={security.BCRYPT_ROUNDS}, pool workers={security.HASH_WORKERS}, cores={os.cpu_count()}")
+
+    t0 = time.perf_counter()
+    for _ in range(max(1, n // 10)):
+        security.pwd_context.verify("correct horse", hashed)
+    inline = max(1, n // 10) / (time.perf_counter() - t0)
+    print(f"inline:  {inline:,.1f} logins/s (one thread, blocks the caller ~{1000 / inline:.0f} ms each)")
+
+    asyncio.run(_pooled(security.HASH_WORKERS, hashed))  # warm up worker processes
+    t0 = time.perf_counter()
+    asyncio.run(_pooled(n, hashed))
+    pooled = n / (time.perf_counter() - t0)
+    print(f"pooled:  {pooled:,.1f} logins/s total, {pooled / security.HASH_WORKERS:,.1f} logins/s per core")
+    security.shutdown_pool()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--logins", type=int, default=200)
+    args = ap.parse_args()
+    main(args.logins)
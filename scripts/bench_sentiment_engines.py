@@ -0,0 +1,101 @@
+"""Throughput and agreement of the sentiment engines against DistilBERT.
+
+Scores a corpus with every engine in app.backend.sentiment_engines and
+reports microseconds per text, texts/s, agreement with the transformer's
+labels and, for the cascade, how many texts were escalated. The corpus is
+the mood-log notes in the database (--from-db) or generated short notes.
+
+    python -m scripts.bench_sentiment_engines --texts 2000
+    python -m scripts.bench_sentiment_engines --from-db --limit 20000 --threshold 0.85
+"""
+import argparse
+import random
+import time
+
+from app.backend import sentiment_engines
+from app.backend.sentiment_engines import CascadeEngine, get_engine
+
+POSITIVE = [
+    "Feeling grateful I could share extra rice with families nearby",
+    "So happy to see the kids smile after the meal",
+    "Great day at the distribution point, everyone was kind",
+    "Proud of our volunteers, the delivery went really well",
+    "Hopeful that next week we can help even more people",
+    "Glad the bread reached the shelter while still fresh",
+]
+NEGATIVE = [
+    "Exhausted and worried we won't have enough for everyone",
+    "Sad to see so many hungry children again today",
+    "Frustrated that the truck broke down and the food spoiled",
+    "Feeling lonely and overwhelmed with work this week",
+    "Stressed, the prices went up and donations are down",
+    "Not a good day, nothing went as planned",
+]
+NEUTRAL = [
+    "Dropped off two bags of lentils at the community centre",
+    "Pickup moved to Thursday at 10am",
+    "Three boxes of canned beans, expiry next month",
+]
+PREFIXES = ["", "Honestly, ", "Today: ", "Update - ", "Note: "]
+
+
+def generated_corpus(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    pool = POSITIVE + NEGATIVE + NEUTRAL
+    return [rng.choice(PREFIXES) + rng.choice(pool) for _ in range(n)]
+
+
+def db_corpus(limit: int):
+    from sqlmodel import Session, select
+    from app.backend import models
+    from app.backend.database import engine
+    with Session(engine) as s:
+        notes = s.exec(select(models.MoodLog.note).where(models.MoodLog.note.isnot(None)).limit(limit)).all()
+    return [n for n in notes if n and n.strip()]
+
+
+def timed(engine, texts, batch_size: int):
+    t0 = time.perf_counter()
+    out = []
+    for i in range(0, len(texts), batch_size):
+        out.extend(engine.analyze_batch(texts[i:i + batch_size]))
+    return time.perf_counter() - t0, out
+
+
+def main(texts, batch_size: int, threshold: float):
+    print(f"{len(texts):,} texts, batch size {batch_size}, cascade threshold {threshold}")
+    transformer = get_engine("transformer")
+    transformer.analyze_batch(texts[:8])  # load the model (or connect to the server) outside the timing
+    dt, reference = timed(transformer, texts, batch_size)
+    ref_labels = [r["label"] for r in reference]
+    rows = [("transformer", dt, reference)]
+
+    lexicon = get_engine("lexicon")
+    rows.append(("lexicon", *timed(lexicon, texts, batch_size)))
+    cascade = CascadeEngine(lexicon, transformer, threshold=threshold)
+    rows.append((f"cascade@{threshold:g}", *timed(cascade, texts, batch_size)))
+
+    print(f"{'engine':>16} {'us/text':>10} {'texts/s':>10} {'agreement':>10} {'escalated':>10}")
+    for name, dt, out in rows:
+        agree = sum(r["label"] == ref for r, ref in zip(out, ref_labels)) / len(texts)
+        escalated = sum(r.get("engine") == "transformer" for r in out) / len(texts) if name.startswith("cascade") else None
+        print(f"{name:>16} {dt / len(texts) * 1e6:10.1f} {len(texts) / dt:10,.0f} {agree:10.1%} "
+              f"{'' if escalated is None else f'{escalated:.1%}':>10}")
+    decided = [(r, ref) for r, ref in zip(rows[1][2], ref_labels) if r["score"] >= threshold]
+    if decided:
+        kept = sum(r["label"] == ref for r, ref in decided) / len(decided)
+        print(f"\nlexicon alone on the {len(decided) / len(texts):.0%} of texts it is confident about: {kept:.1%} agreement")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--texts", type=int, default=2000, help="generated notes to score")
+    ap.add_argument("--from-db", action="store_true", help="score MoodLog notes from DATABASE_URL instead")
+    ap.add_argument("--limit", type=int, default=20000)
+    ap.add_argument("--batch-size", type=int, default=64)
+    ap.add_argument("--threshold", type=float, default=sentiment_engines.SENTIMENT_CASCADE_THRESHOLD)
+    args = ap.parse_args()
+    corpus = db_corpus(args.limit) if args.from_db else generated_corpus(args.texts)
+    if not corpus:
+        raise SystemExit("no texts to score")
+    main(corpus, args.batch_size, args.threshold)
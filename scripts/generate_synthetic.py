@@ -0,0 +1,292 @@
+"""Deterministic synthetic dataset for scale testing.
+
+Bulk-loads users, communities, donations, deliveries and mood logs (70% with
+a free-text note, for the sentiment engines and rescoring) into the SQLModel
+schema, then rebuilds community_stats and the rollups. It also writes a
+synthetic WFP price series and severity layers to --out-dir.
+Locations are the Pakistan admin units from the gazetteer (pcodes,
+names, coordinates). The same --seed always produces the same data.
+
+Rows are generated in numpy chunks and loaded with COPY on Postgres or one
+executemany per chunk on SQLite, inside a single transaction. No ORM
+objects are created, so a million donations load in seconds.
+
+    python -m scripts.generate_synthetic --database-url sqlite:///scale.db --donations 1000000
+    DATABASE_URL=postgresql://... python -m scripts.generate_synthetic --donations 1000000 --users 100000
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+CHUNK = 100_000
+CATEGORIES = np.array(["Food", "Rice", "Wheat flour", "Lentils", "Cooked meals", "Milk", "Cooking oil", "Vegetables"])
+MOODS = np.array(["POSITIVE", "NEGATIVE", "NEUTRAL"])
+# Share of mood logs with a free-text note (the rest are a bare mood pick), and of those, long diary
+# entries that run past the sentiment model's 512-token window
+NOTE_SHARE, LONG_NOTE_SHARE = 0.7, 0.03
+# Openers per mood, each paired with a random NOTE_DETAILS clause; some openers lean the other way
+# ("not too bad") so lexicon and model scores disagree on part of the data, as on real notes
+NOTE_OPENERS = {
+    "POSITIVE": ["Feeling grateful today.", "So happy the rice arrived on time.", "Really thankful for the help.",
+                 "Good day, the kids ate well.", "Hopeful for the first time in weeks.", "Not too bad this week."],
+    "NEGATIVE": ["Tired and worried.", "The delivery was late again and we went hungry.", "Feeling hopeless.",
+                 "Stressed about money and food.", "Nobody came today, very upset.", "Not good, the flour ran out."],
+    "NEUTRAL": ["Collected the ration at noon.", "Same as yesterday.", "Waiting for the truck.",
+                "Shared the lentils with neighbours.", "Went to the distribution point.", "Nothing new to report."],
+}
+NOTE_DETAILS = ["", "Prices at the market went up again.", "The NGO volunteers were kind.",
+                "My mother is still sick.", "We cooked for the whole street.", "School reopens next week.",
+                "Water was short in the afternoon.", "Thank you to the donors."]
+# Same shares the UI sees in practice: most donations open, fewer claimed, fewest delivered
+STATUSES = np.array(["pending", "claimed", "delivered"])
+STATUS_P = [0.55, 0.3, 0.15]
+COMMODITIES = {"Wheat flour": 60.0, "Rice (basmati)": 180.0, "Lentils (masur)": 220.0, "Sugar": 95.0,
+               "Cooking oil": 350.0, "Milk (fresh)": 120.0, "Eggs": 240.0, "Potatoes": 50.0}
+
+
+# ---------- Helpers ----------
+def _places(level: str = "adm2"):
+    from app.backend.config import PAK_GAZETTEER_CSV
+    with open(PAK_GAZETTEER_CSV, newline="", encoding="utf-8") as f:
+        rows = [r for r in csv.DictReader(f) if r["level"] == level]
+    if not rows:
+        raise SystemExit(f"No {level} rows in {PAK_GAZETTEER_CSV}; run scripts.prepare_core first")
+    return rows
+
+def _timestamps(rng, n: int, start: datetime, days: int):
+    """SQLAlchemy's text format for DateTime ("YYYY-MM-DD HH:MM:SS.ffffff"), valid for COPY too."""
+    base = np.datetime64(start, "us")
+    offsets = rng.integers(0, days * 86_400_000_000, size=n).astype("timedelta64[us]")
+    return np.char.replace(np.datetime_as_string(base + offsets, unit="us"), "T", " ")
+
+
+class Loader:
+    """COPY (Postgres) or executemany (SQLite) into one table, all in the caller's transaction."""
+
+    def __init__(self, raw_conn, dialect: str):
+        self.raw = raw_conn
+        self.dialect = dialect
+
+    def next_id(self, table: str) -> int:
+        cur = self.raw.cursor()
+        cur.execute(f'SELECT COALESCE(MAX(id), 0) + 1 FROM "{table}"')
+        value = cur.fetchone()[0]
+        cur.close()
+        return value
+
+    def load(self, table: str, columns, rows) -> int:
+        rows = list(rows)
+        if not rows:
+            return 0
+        cur = self.raw.cursor()
+        if self.dialect == "postgresql":
+            buf = io.StringIO()
+            csv.writer(buf).writerows(rows)
+            buf.seek(0)
+            cur.copy_expert(f'COPY "{table}" ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)', buf)
+        else:
+            marks = ", ".join("?" for _ in columns)
+            cur.executemany(f'INSERT INTO "{table}" ({", ".join(columns)}) VALUES ({marks})', rows)
+        cur.close()
+        return len(rows)
+
+
+# ---------- Tables ----------
+def gen_users(rng, n: int, password_hash: str, now: str):
+    roles = rng.choice(np.array(["donor", "ngo", "volunteer"]), size=n, p=[0.85, 0.1, 0.05])
+    for i, role in enumerate(roles.tolist()):
+        yield (f"User {i}", f"user{i}@synthetic.local", role, password_hash, now)
+
+def gen_communities(rng, places, n: int):
+    idx = rng.integers(0, len(places), size=n)
+    pops = rng.lognormal(mean=9.0, sigma=1.0, size=n).astype(int) + 200
+    needs = rng.choice(CATEGORIES, size=n)
+    urgent = rng.random(n) < 0.15
+    for i, (p, pop, need, u) in enumerate(zip(idx.tolist(), pops.tolist(), needs.tolist(), urgent.tolist())):
+        place = places[p]
+        yield (f"{place['name']} community {i}", f"{place['name']} ({place['pcode']})", pop, need.lower(), u)
+
+def gen_donations(rng, start_id: int, n: int, users: range, communities: range, start: datetime, days: int):
+    status = rng.choice(STATUSES, size=n, p=STATUS_P)
+    cats = rng.choice(CATEGORIES, size=n)
+    qty = rng.integers(1, 60, size=n)
+    donor = rng.integers(users.start, users.stop, size=n)
+    community = rng.integers(communities.start, communities.stop, size=n)
+    ts = _timestamps(rng, n, start, days)
+    ngo = rng.integers(1, 500, size=n)
+    for i, (st, cat, q, d, c, t, g) in enumerate(zip(status.tolist(), cats.tolist(), qty.tolist(), donor.tolist(),
+                                                     community.tolist(), ts.tolist(), ngo.tolist())):
+        claimed = st != "pending"
+        yield (start_id + i, f"{cat} lot {start_id + i}", cat, q, st, d, c, t, int(claimed) + (st == "delivered"),
+               f"NGO {g}" if claimed else None, t if claimed else None)
+
+def gen_deliveries(rng, n: int, donations: range, start: datetime, days: int):
+    donation = rng.integers(donations.start, donations.stop, size=n)
+    drivers = rng.integers(1, 2000, size=n)
+    status = rng.choice(np.array(["scheduled", "en_route", "delivered"]), size=n, p=[0.3, 0.2, 0.5])
+    eta = rng.integers(5, 180, size=n)
+    ts = _timestamps(rng, n, start, days)
+    for i, (d, drv, s, e, t) in enumerate(zip(donation.tolist(), drivers.tolist(), status.tolist(), eta.tolist(),
+                                              ts.tolist())):
+        yield (d, f"Driver {drv}", f"PK-{drv:04d}", s, e, t)
+
+def _note(mood: str, opener: int, detail: int, long: bool) -> str:
+    note = f"{NOTE_OPENERS[mood][opener]} {NOTE_DETAILS[detail]}".strip()
+    return " ".join([note] * 60) if long else note
+
+def gen_moods(rng, n: int, users: range, start: datetime, days: int):
+    users = rng.integers(users.start, users.stop, size=n)
+    moods = rng.choice(MOODS, size=n, p=[0.6, 0.15, 0.25])
+    ts = _timestamps(rng, n, start, days)
+    has_note = rng.random(n) < NOTE_SHARE
+    opener = rng.integers(0, len(NOTE_OPENERS["POSITIVE"]), size=n)
+    detail = rng.integers(0, len(NOTE_DETAILS), size=n)
+    long = rng.random(n) < LONG_NOTE_SHARE
+    for u, m, t, h, o, d, lg in zip(users.tolist(), moods.tolist(), ts.tolist(), has_note.tolist(),
+                                    opener.tolist(), detail.tolist(), long.tolist()):
+        yield (u, m, _note(m, o, d, lg) if h else None, t)
+
+
+# ---------- Files ----------
+def write_prices(rng, places, out_dir: Path, start: datetime, months: int) -> Path:
+    """Monthly random-walk prices with seasonality per commodity x market (load_wfp_prices format)."""
+    markets = [p["name"] for p in places[:: max(1, len(places) // 40)]]
+    path = out_dir / "wfp_food_prices_synthetic.csv"
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["date", "commodity", "market", "price"])
+        for commodity, base in COMMODITIES.items():
+            for market in markets:
+                shocks = rng.normal(0.006, 0.03, size=months).cumsum()
+                season = 0.05 * np.sin(np.arange(months) * 2 * np.pi / 12 + rng.uniform(0, 2 * np.pi))
+                prices = base * np.exp(shocks + season) * rng.uniform(0.9, 1.1)
+                for m, price in enumerate(prices.tolist()):
+                    month = (start.month - 1 + m) % 12 + 1
+                    year = start.year + (start.month - 1 + m) // 12
+                    w.writerow([f"{year}-{month:02d}-15", commodity, market, round(price, 2)])
+    return path
+
+def write_severity_layers(rng, places, out_dir: Path):
+    """Point GeoJSON per admin unit, same properties as the processed OCHA/IPC layers."""
+    paths = []
+    for name, scale in (("merged_severity_synthetic.geojson", 5.0), ("ipc_severity_synthetic.geojson", None)):
+        features = []
+        for p in places:
+            score = round(float(rng.beta(2, 3) * scale), 2) if scale else int(rng.choice([1, 2, 3, 4, 5], p=[.2, .3, .3, .15, .05]))
+            features.append({
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [float(p["lon"]), float(p["lat"])]},
+                "properties": {"admin_code": p["pcode"], "name": p["name"], "severity_score": score},
+            })
+        path = out_dir / name
+        path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+        paths.append(path)
+    return paths
+
+
+# ---------- Main ----------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL / the app's database")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--communities", type=int, default=5_000)
+    parser.add_argument("--donations", type=int, default=1_000_000)
+    parser.add_argument("--deliveries", type=int, default=200_000)
+    parser.add_argument("--mood-logs", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=365, help="spread timestamps over this many days")
+    parser.add_argument("--out-dir", default="app/data/synthetic", help="price series and severity layers")
+    parser.add_argument("--skip-aggregates", action="store_true", help="don't rebuild community_stats/rollups")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    from sqlmodel import Session
+    from app.backend.aggregates import refresh_community_stats
+    from app.backend.database import engine, init_db
+    from app.backend.rollups import compact_rollups
+    from app.backend.security import pwd_context
+
+    init_db()
+    rng = np.random.default_rng(args.seed)
+    start = datetime(2025, 1, 1)
+    now = start.strftime("%Y-%m-%d %H:%M:%S.000000")
+    places = _places("adm2")
+    dialect = engine.dialect.name
+    password_hash = pwd_context.hash("synthetic")  # shared by every user; one bcrypt call
+
+    raw = engine.raw_connection()
+    try:
+        loader = Loader(raw, dialect)
+        if dialect == "sqlite":
+            cur = raw.cursor()
+            cur.execute("PRAGMA synchronous=OFF")
+            cur.close()
+        # Ids the new rows will get, so foreign keys point at this run's rows
+        users = range(loader.next_id("user"), loader.next_id("user") + args.users)
+        communities = range(loader.next_id("community"), loader.next_id("community") + args.communities)
+        donations = range(loader.next_id("donation"), loader.next_id("donation") + args.donations)
+        t_all = time.perf_counter()
+
+        def timed(label, table, columns, chunks):
+            t0, n = time.perf_counter(), 0
+            for rows in chunks:
+                n += loader.load(table, columns, rows)
+            dt = time.perf_counter() - t0
+            print(f"{label:12s} {n:>10,} rows in {dt:6.2f}s ({n / max(dt, 1e-9):,.0f}/s)")
+
+        timed("users", "user", ["name", "email", "role", "password", "created_at"],
+              [gen_users(rng, args.users, password_hash, now)])
+        timed("communities", "community", ["name", "location", "population", "urgent_needs", "urgent_need"],
+              [gen_communities(rng, places, args.communities)])
+
+        # Explicit ids keep chunks independent and the output identical run to run
+        donation_chunks = (
+            gen_donations(rng, donations.start + off, min(CHUNK, args.donations - off), users, communities,
+                          start, args.days)
+            for off in range(0, args.donations, CHUNK)
+        )
+        timed("donations", "donation", ["id", "title", "category", "quantity", "status", "donor_id", "community_id",
+                                         "timestamp", "version", "claimed_by", "claimed_at"], donation_chunks)
+        timed("deliveries", "delivery", ["donation_id", "driver_name", "vehicle_number", "delivery_status",
+                                          "eta_minutes", "assigned_at"],
+              (gen_deliveries(rng, min(CHUNK, args.deliveries - off), donations, start, args.days)
+               for off in range(0, args.deliveries, CHUNK)))
+        timed("mood logs", "moodlog", ["user_id", "mood", "note", "timestamp"],
+              (gen_moods(rng, min(CHUNK, args.mood_logs - off), users, start, args.days)
+               for off in range(0, args.mood_logs, CHUNK)))
+        if dialect == "postgresql":
+            # COPY with explicit ids doesn't advance the serial sequence
+            cur = raw.cursor()
+            cur.execute("SELECT setval(pg_get_serial_sequence('donation', 'id'), (SELECT MAX(id) FROM donation))")
+            cur.close()
+        raw.commit()
+        print(f"{'total':12s} loaded in {time.perf_counter() - t_all:.2f}s")
+    finally:
+        raw.close()
+
+    if not args.skip_aggregates:
+        t0 = time.perf_counter()
+        with Session(engine) as s:
+            refresh_community_stats(s)
+            compact_rollups(s)
+        print(f"community_stats + rollups rebuilt in {time.perf_counter() - t0:.2f}s")
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    months = max(24, args.days // 30)
+    written = [write_prices(rng, places, out_dir, start - timedelta(days=30 * months), months)]
+    written += write_severity_layers(rng, _places("adm2"), out_dir)
+    for p in written:
+        print(f"wrote {p}")
+
+
+if __name__ == "__main__":
+    main()
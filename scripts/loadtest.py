@@ -0,0 +1,333 @@
+"""Mixed-workload load test for the backend API.
+
+Boots the FastAPI app in-process (uvicorn, random port) against a throwaway
+SQLite database (or --database-url, e.g. a scratch Postgres), seeds users,
+communities, donations and deliveries, then drives a weighted mix of auth,
+donation, community, delivery, analytics, psychology and admin calls from
+--concurrency client threads. Reports RPS, p50/p95/p99 latency and errors
+per route. --stub-models swaps DistilBERT and Prophet for constant stubs so
+the numbers measure the web/DB path only.
+
+    python -m scripts.loadtest --duration 30 --concurrency 16 --stub-models
+    python -m scripts.loadtest --stub-models --save-baseline loadtest_baseline.json
+    python -m scripts.loadtest --stub-models --baseline loadtest_baseline.json   # exit 1 on regression
+    python -m scripts.loadtest --url http://127.0.0.1:8000 --no-seed             # an already seeded, running server
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import requests
+
+PASSWORD = "loadtest-password"
+ADMIN_EMAIL = "admin@loadtest.local"
+NGO_EMAIL = "ngo@loadtest.local"
+
+
+# ---------- App boot ----------
+def _install_model_stubs():
+    """Replace the sentiment model module before the app imports it (psychology route via app.backend.inference)."""
+    fake = types.ModuleType("app.backend.ml.sentiment")
+    fake.analyze_sentiment_batch = lambda texts, **kw: [{"label": "POSITIVE", "score": 0.99} for _ in texts]
+    fake.analyze_sentiment = lambda text: fake.analyze_sentiment_batch([text])[0]
+    sys.modules["app.backend.ml.sentiment"] = fake
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def boot(database_url: str, workdir: str, stub_models: bool):
+    """Start the app in a background thread; returns (base_url, server, thread)."""
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("LOGIN_MAX_ATTEMPTS", "1000000")  # the limiter would dominate the login numbers
+    if stub_models:
+        os.environ["INFERENCE_MODE"] = "local"  # never hand requests to a real inference server
+        _install_model_stubs()
+
+    import uvicorn
+    from app.backend import jobs
+    from app.backend.main import app
+
+    # Keep job state out of the repo's data dir
+    jobs._queue = jobs.JobQueue(db_path=os.path.join(workdir, "jobs.sqlite"))
+    if stub_models:
+        @jobs.job("simulated_price_forecast")
+        def _stub_forecast(periods: int = 30):
+            start = datetime.utcnow().date()
+            return [{"ds": str(start + timedelta(days=i)), "yhat": 100.0, "yhat_lower": 95.0, "yhat_upper": 105.0}
+                    for i in range(periods)]
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 60
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("server did not start")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server, thread
+
+
+# ---------- Seeding ----------
+def seed(n_users: int, n_communities: int, n_donations: int, n_deliveries: int, rng: random.Random):
+    from sqlalchemy import insert
+    from sqlmodel import Session, select
+    from app.backend import models
+    from app.backend.aggregates import refresh_community_stats
+    from app.backend.database import engine, init_db
+    from app.backend.rollups import compact_rollups
+    from app.backend.security import pwd_context
+
+    init_db()
+    hashed = pwd_context.hash(PASSWORD)  # one bcrypt call; every seeded user shares it
+    now = datetime.utcnow()
+    statuses = ["pending"] * 6 + ["claimed"] * 3 + ["delivered"]
+    categories = ["Food", "Rice", "Flour", "Lentils", "Cooked meals", "Milk"]
+
+    users = [{"name": f"user{i}", "email": f"user{i}@loadtest.local", "password": hashed,
+              "role": "ngo" if i % 5 == 0 else "donor", "created_at": now} for i in range(n_users)]
+    users += [{"name": "admin", "email": ADMIN_EMAIL, "password": hashed, "role": "admin", "created_at": now},
+              {"name": "ngo", "email": NGO_EMAIL, "password": hashed, "role": "ngo", "created_at": now}]
+    communities = [{"name": f"Community {i}", "location": f"District {i % 150}",
+                    "population": rng.randint(500, 50000), "urgent_needs": rng.choice(categories).lower(),
+                    "urgent_need": rng.random() < 0.2} for i in range(n_communities)]
+    with Session(engine) as s:
+        s.execute(insert(models.User), users)
+        s.execute(insert(models.Community), communities)
+        s.commit()
+        community_ids = s.exec(select(models.Community.id)).all()
+        donations = []
+        for i in range(n_donations):
+            status = rng.choice(statuses)
+            donations.append({
+                "title": f"{rng.choice(categories)} lot {i}", "quantity": rng.randint(1, 50),
+                "category": rng.choice(categories), "status": status, "donor_id": rng.randint(1, max(1, n_users)),
+                "community_id": rng.choice(community_ids) if community_ids else None,
+                "timestamp": now - timedelta(minutes=rng.randint(0, 60 * 24 * 30)), "version": 0,
+                "claimed_by": "seed-ngo" if status != "pending" else None,
+            })
+        for start in range(0, len(donations), 5000):
+            s.execute(insert(models.Donation), donations[start:start + 5000])
+        s.execute(insert(models.Delivery), [
+            {"donation_id": rng.randint(1, max(1, n_donations)), "driver_name": f"driver{i % 40}",
+             "vehicle_number": f"LHR-{1000 + i}", "delivery_status": rng.choice(["scheduled", "en_route", "delivered"]),
+             "eta_minutes": rng.randint(5, 120), "assigned_at": now} for i in range(n_deliveries)
+        ])
+        s.commit()
+        refresh_community_stats(s)
+        compact_rollups(s)
+
+
+# ---------- Workload ----------
+class Client:
+    def __init__(self, base: str, tokens: dict, rng: random.Random, max_donation_id: int):
+        self.base = base
+        self.http = requests.Session()
+        self.tokens = tokens
+        self.rng = rng
+        self.max_donation_id = max(1, max_donation_id)
+        self.event_cursor = None
+
+    def call(self, method, path, role=None, **kwargs):
+        headers = {"Authorization": f"Bearer {self.tokens[role]}"} if role else {}
+        return self.http.request(method, self.base + path, headers=headers, timeout=30, **kwargs)
+
+    def donation_id(self) -> int:
+        return self.rng.randint(1, self.max_donation_id)
+
+
+def _poll_events(c: Client):
+    resp = c.call("GET", "/api/events/donations/poll", params={"after": c.event_cursor} if c.event_cursor else None)
+    if resp.ok:
+        c.event_cursor = resp.json().get("last_id")
+    return resp
+
+# (name, weight, expected non-error statuses, request)
+OPERATIONS = [
+    ("GET /api/donations/", 6, {200}, lambda c: c.call("GET", "/api/donations/")),
+    ("GET /api/donations/{id}", 20, {200, 404}, lambda c: c.call("GET", f"/api/donations/{c.donation_id()}")),
+    ("POST /api/donations/", 10, {200}, lambda c: c.call("POST", "/api/donations/", json={
+        "title": "surplus bread", "quantity": c.rng.randint(1, 20), "category": "Food"})),
+    ("PUT /api/donations/{id}/claim", 8, {200, 409, 404}, lambda c: c.call(
+        "PUT", f"/api/donations/{c.donation_id()}/claim", role="ngo", params={"ngo_name": "loadtest-ngo"})),
+    ("POST /api/donations/claim", 2, {200}, lambda c: c.call("POST", "/api/donations/claim", role="ngo", json={
+        "ngo_name": "loadtest-ngo", "donation_ids": [c.donation_id() for _ in range(10)]})),
+    ("POST /api/donations/{id}/deliver", 3, {200, 409, 404}, lambda c: c.call(
+        "POST", f"/api/donations/{c.donation_id()}/deliver", role="ngo")),
+    ("GET /api/communities/", 8, {200}, lambda c: c.call("GET", "/api/communities/")),
+    ("GET /delivery/routes", 4, {200, 404}, lambda c: c.call("GET", "/delivery/routes")),
+    ("GET /analytics/severity", 6, {200}, lambda c: c.call("GET", "/analytics/severity")),
+    ("GET /analytics/rollups", 6, {200}, lambda c: c.call("GET", "/analytics/rollups", params={"dimension": "status"})),
+    ("GET /forecasting/prices", 2, {200, 202}, lambda c: c.call("GET", "/forecasting/prices")),
+    ("POST /psychology/sentiment", 4, {200}, lambda c: c.call(
+        "POST", "/psychology/sentiment", json={"text": "Happy to help the community this week"})),
+    ("GET /api/admin/summary", 2, {200}, lambda c: c.call("GET", "/api/admin/summary", role="admin")),
+    ("POST /api/auth/login", 2, {200, 429, 503}, lambda c: c.call("POST", "/api/auth/login", json={
+        "email": f"user{c.rng.randint(0, 99)}@loadtest.local", "password": PASSWORD})),
+    ("GET /api/events/donations/poll", 5, {200}, _poll_events),
+]
+
+
+def _login(base: str, email: str) -> str:
+    resp = requests.post(f"{base}/api/auth/login", json={"email": email, "password": PASSWORD}, timeout=60)
+    resp.raise_for_status()
+    return resp.json()["access_token"]
+
+
+def drive(base: str, concurrency: int, duration: float, warmup: float, max_donation_id: int, seed_value: int,
+          only=None):
+    tokens = {"admin": _login(base, ADMIN_EMAIL), "ngo": _login(base, NGO_EMAIL)}
+    ops = [op for op in OPERATIONS if not only or any(o in op[0] for o in only)]
+    weights = [op[1] for op in ops]
+    samples = defaultdict(list)   # name -> [latency_s]
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    start = time.perf_counter()
+    measure_from, stop_at = start + warmup, start + warmup + duration
+
+    def worker(i: int):
+        c = Client(base, tokens, random.Random(seed_value + i), max_donation_id)
+        local, local_err = defaultdict(list), defaultdict(int)
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                break
+            name, _, ok_codes, fn = c.rng.choices(ops, weights)[0]
+            t0 = time.perf_counter()
+            try:
+                failed = fn(c).status_code not in ok_codes
+            except requests.RequestException:
+                failed = True
+            if t0 >= measure_from:
+                local[name].append(time.perf_counter() - t0)
+                local_err[name] += failed
+        with lock:
+            for k, v in local.items():
+                samples[k].extend(v)
+            for k, v in local_err.items():
+                errors[k] += v
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return summarize(samples, errors, duration)
+
+
+# ---------- Reporting ----------
+def _pct(sorted_vals, q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))]
+
+def summarize(samples, errors, duration: float) -> dict:
+    routes = {}
+    everything = []
+    for name, vals in samples.items():
+        vals.sort()
+        everything.extend(vals)
+        routes[name] = {"count": len(vals), "rps": len(vals) / duration, "errors": errors[name],
+                        "p50_ms": _pct(vals, 0.50) * 1000, "p95_ms": _pct(vals, 0.95) * 1000,
+                        "p99_ms": _pct(vals, 0.99) * 1000}
+    everything.sort()
+    total = {"count": len(everything), "rps": len(everything) / duration, "errors": sum(errors.values()),
+             "p50_ms": _pct(everything, 0.50) * 1000, "p95_ms": _pct(everything, 0.95) * 1000,
+             "p99_ms": _pct(everything, 0.99) * 1000}
+    return {"routes": routes, "total": total}
+
+def print_report(result: dict) -> None:
+    print(f"{'route':36s} {'count':>7s} {'rps':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'errors':>7s}")
+    rows = sorted(result["routes"].items()) + [("TOTAL", result["total"])]
+    for name, r in rows:
+        print(f"{name:36s} {r['count']:7d} {r['rps']:8.1f} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} "
+              f"{r['p99_ms']:8.1f} {r['errors']:7d}")
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions vs a saved run: p95 slower / RPS lower beyond tolerance, or a higher error rate."""
+    problems = []
+    for name, base in baseline["routes"].items():
+        cur = result["routes"].get(name)
+        if cur is None or not cur["count"]:
+            continue
+        # ignore sub-millisecond jitter on very fast routes
+        if cur["p95_ms"] > base["p95_ms"] * (1 + tolerance) and cur["p95_ms"] - base["p95_ms"] > 2:
+            problems.append(f"{name}: p95 {base['p95_ms']:.1f} -> {cur['p95_ms']:.1f} ms")
+        if cur["rps"] < base["rps"] * (1 - tolerance):
+            problems.append(f"{name}: rps {base['rps']:.1f} -> {cur['rps']:.1f}")
+        base_rate = base["errors"] / max(1, base["count"])
+        cur_rate = cur["errors"] / max(1, cur["count"])
+        if cur_rate > base_rate + 0.01:
+            problems.append(f"{name}: error rate {base_rate:.1%} -> {cur_rate:.1%}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="target an already running server instead of booting one")
+    parser.add_argument("--database-url", help="database for the booted app (default: temp SQLite)")
+    parser.add_argument("--no-seed", action="store_true")
+    parser.add_argument("--stub-models", action="store_true", help="constant stubs for DistilBERT/Prophet")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--communities", type=int, default=100)
+    parser.add_argument("--donations", type=int, default=5000)
+    parser.add_argument("--deliveries", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--only", nargs="*", help="substrings of route names to include")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write the JSON result here")
+    parser.add_argument("--save-baseline", help="write the result as the new baseline")
+    parser.add_argument("--baseline", help="compare against this baseline; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = None
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.url:
+            base = args.url.rstrip("/")
+        else:
+            database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'loadtest.db')}"
+            base, server, thread = boot(database_url, workdir, args.stub_models)
+        if not args.no_seed:
+            t0 = time.perf_counter()
+            seed(args.users, args.communities, args.donations, args.deliveries, random.Random(args.seed))
+            print(f"seeded {args.users} users, {args.communities} communities, {args.donations} donations, "
+                  f"{args.deliveries} deliveries in {time.perf_counter() - t0:.1f}s")
+        print(f"driving {base} with {args.concurrency} clients for {args.duration:.0f}s (+{args.warmup:.0f}s warmup)")
+        result = drive(base, args.concurrency, args.duration, args.warmup, args.donations, args.seed, args.only)
+        result["meta"] = {k: getattr(args, k) for k in ("concurrency", "duration", "donations", "stub_models")}
+        if server is not None:
+            server.should_exit = True
+            thread.join(timeout=10)
+
+    print_report(result)
+    for path in filter(None, (args.out, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"wrote {path}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(result, json.load(f), args.tolerance)
+        if problems:
+            print("REGRESSIONS:\n  " + "\n  ".join(problems))
+            sys.exit(1)
+        print(f"no regressions vs {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Import-time profile of the Streamlit app (python -X importtime, per module).
+
+Shows what the app pays before first paint (the modules streamlit_app.py
+imports at the top) against what each page defers until it is opened, plus
+the heaviest individual imports on the startup path.
+
+    python -m scripts.profile_imports --top 15
+"""
+import argparse
+import subprocess
+import sys
+
+# Imported at the top of app/frontend/streamlit_app.py
+STARTUP = [
+    "streamlit",
+    "pandas",
+    "requests",
+    "app.frontend.api_client",
+    "app.backend.geocoding",
+    "app.frontend.caching",
+    "app.backend.workflow.donor",
+    "app.backend.workflow.ngo",
+]
+
+# Imported only by the page / cached loader that needs them
+DEFERRED = [
+    "folium",
+    "streamlit_folium",
+    "matplotlib.pyplot",
+    "PIL.Image",
+    "app.backend.data_loader",
+    "app.backend.ml.price_forecast",
+    "app.backend.ml.sentiment",
+    "app.backend.ml.image_tagging",
+]
+
+
+def importtime(modules):
+    """Run a fresh interpreter importing `modules`; returns [(self_us, cumulative_us, name)]."""
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(self_us), int(cum_us), name))
+    if proc.returncode != 0:
+        err = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error"
+        raise ImportError(err)
+    return rows
+
+
+def total_ms(rows) -> float:
+    return sum(r[0] for r in rows) / 1000
+
+
+def main(top: int):
+    try:
+        startup = importtime(STARTUP)
+    except ImportError as e:
+        print(f"startup imports failed: {e}")
+        return
+    print(f"startup path (before first paint): {total_ms(startup):8.0f} ms  [{', '.join(STARTUP)}]")
+
+    already = {r[2].strip() for r in startup}
+    print("\ndeferred until the page that uses them is opened (incremental over startup):")
+    for module in DEFERRED:
+        try:
+            rows = importtime(STARTUP + [module])
+        except ImportError as e:
+            print(f"  {module:38s} unavailable ({e})")
+            continue
+        extra = [r for r in rows if r[2].strip() not in already]
+        print(f"  {module:38s} {total_ms(extra):8.0f} ms")
+
+    print("\nheaviest startup imports (cumulative):")
+    for self_us, cum_us, name in sorted(startup, key=lambda r: -r[1])[:top]:
+        print(f"  {cum_us / 1000:8.1f} ms  {name.strip()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=15)
+    main(parser.parse_args().top)
@@ -0,0 +1,42 @@
+"""Label unscored or stale notes with the pinned sentiment model, in bulk.
+
+Runs app.backend.rescoring over the MoodLog notes in DATABASE_URL and the
+donor–NGO workflow store, printing throughput per chunk. Interrupt it at any
+time; the next run resumes from the checkpoint. Start the inference server
+first to score through it, otherwise each worker process loads the model.
+
+    python -m scripts.rescore_sentiment
+    python -m scripts.rescore_sentiment --source moodlog --workers 4 --chunk-size 5000
+    python -m scripts.rescore_sentiment --restart   # re-label everything
+"""
+import argparse
+
+from app.backend import rescoring
+
+
+def report(stats: dict) -> None:
+    rate = stats["scored"] / stats["seconds"] if stats["seconds"] else 0.0
+    print(f"  {stats['source']}: {stats['scored']:,} scored, up to id {stats['last_id']} ({rate:,.0f} notes/s)")
+
+
+def main(sources, chunk_size: int, batch_size: int, workers: int, limit, restart: bool):
+    for source in sources:
+        print(f"{source}: scoring with {rescoring.SENTIMENT_MODEL_TAG}")
+        stats = rescoring.rescore(source, chunk_size=chunk_size, batch_size=batch_size, workers=workers,
+                                  limit=limit, restart=restart, progress=report)
+        print(f"{source}: {stats['scored']:,} notes labelled in {stats['seconds']:.1f} s "
+              f"(resumed after id {stats['resumed_from']})")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--source", choices=sorted(rescoring.SOURCES), action="append",
+                    help="repeatable; default: all sources")
+    ap.add_argument("--chunk-size", type=int, default=rescoring.RESCORE_CHUNK_SIZE, help="rows per read/write")
+    ap.add_argument("--batch-size", type=int, default=rescoring.RESCORE_BATCH_SIZE, help="texts per model call")
+    ap.add_argument("--workers", type=int, default=rescoring.RESCORE_WORKERS)
+    ap.add_argument("--limit", type=int, help="stop after this many rows per source")
+    ap.add_argument("--restart", action="store_true", help="ignore the checkpoint and walk from the first row")
+    args = ap.parse_args()
+    main(args.source or sorted(rescoring.SOURCES), args.chunk_size, args.batch_size, args.workers,
+         args.limit, args.restart)
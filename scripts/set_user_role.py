@@ -0,0 +1,33 @@
+"""Grant a role to an existing user directly in the database.
+
+Self-registration only ever creates donors, and PUT /api/admin/users/{id}/role
+needs an admin token, so the first admin (and NGO accounts on a fresh
+install) are set up with this script.
+
+    python -m scripts.set_user_role --email admin@example.org --role admin
+"""
+import argparse
+
+from sqlmodel import Session, select
+
+from app.backend import models
+from app.backend.database import engine
+
+
+def main(email: str, role: str) -> None:
+    with Session(engine) as session:
+        user = session.exec(select(models.User).where(models.User.email == email)).first()
+        if user is None:
+            raise SystemExit(f"No user with email {email}; register first via POST /api/auth/register")
+        old, user.role = user.role, role
+        session.add(user)
+        session.commit()
+    print(f"{email}: {old} -> {role} (running API workers see it within ROLE_CACHE_TTL_SECONDS)")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--email", required=True)
+    ap.add_argument("--role", required=True, choices=models.USER_ROLES)
+    args = ap.parse_args()
+    main(args.email, args.role)
@@ -0,0 +1,28 @@
+import json
+
+from app.backend.workflow.event_log import DonationEventLog
+
+
+def _donation(i: int) -> dict:
+    return {"donation_id": f"d{i}", "donor_name": "Ayesha", "food_type": "rice", "status": "Available"}
+
+
+def test_compacts_after_compact_every_events(tmp_path):
+    path = str(tmp_path / "donation_events.jsonl")
+    log = DonationEventLog(path, compact_every=6, fsync=False)
+    for i in range(4):
+        log.create(_donation(i))
+    assert log.claim("d0", "Rizq") is None
+    assert log.claim("d1", "Rizq") is None  # 6th event: compacts
+    expected = log.records()
+
+    with open(path) as f:
+        lines = [json.loads(line) for line in f]
+    assert [e["op"] for e in lines] == ["snapshot"] * 4
+
+    # a fresh reader (another process) rebuilds the same view from the compacted file
+    assert DonationEventLog(path, compact_every=6, fsync=False).records() == expected
+    assert {r["donation_id"]: r["status"] for r in expected}["d1"] == "Claimed by Rizq"
+
+    log.create(_donation(4))
+    assert len(open(path).readlines()) == 5  # snapshots don't count toward the next compaction
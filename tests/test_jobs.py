@@ -0,0 +1,50 @@
+import time
+
+from app.backend import jobs
+
+
+@jobs.job("test_sleep")
+def _sleep(seconds: float = 0.5):
+    time.sleep(seconds)
+    return seconds
+
+
+def test_sibling_start_keeps_live_jobs(tmp_path):
+    first = jobs.JobQueue(tmp_path / "jobs.sqlite", workers=1)
+    sibling = jobs.JobQueue(tmp_path / "jobs.sqlite", workers=1)
+    first.owner, sibling.owner = "host:1", "host:2"
+    first.start()
+    try:
+        job_id = first.submit("test_sleep", {"seconds": 0.5})
+        deadline = time.monotonic() + 5
+        while first.get(job_id)["status"] != "running" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        sibling.heartbeat()  # what a restarting worker runs on start
+        assert first.get(job_id)["status"] == "running"
+        done = first.wait(job_id, timeout=5)
+        assert (done["status"], done["attempts"]) == ("done", 1)
+    finally:
+        first.stop()
+
+
+def test_expired_lease_is_requeued(tmp_path):
+    dead = jobs.JobQueue(tmp_path / "jobs.sqlite", workers=1)
+    dead.owner = "host:1"
+    job_id = dead.submit("test_sleep")
+    dead._claim_next()
+    with dead._tx() as conn:
+        conn.execute("UPDATE jobs SET lease_until=0 WHERE id=?", (job_id,))
+
+    survivor = jobs.JobQueue(tmp_path / "jobs.sqlite", workers=1)
+    survivor.owner = "host:2"
+    survivor.heartbeat()
+    assert survivor.get(job_id)["status"] == "queued"
+
+
+def test_one_scheduler_lease_holder(tmp_path):
+    a = jobs.JobQueue(tmp_path / "jobs.sqlite")
+    b = jobs.JobQueue(tmp_path / "jobs.sqlite")
+    a.owner, b.owner = "host:1", "host:2"
+    assert a.acquire_lease("scheduler")
+    assert not b.acquire_lease("scheduler")
+    assert a.acquire_lease("scheduler")  # renewing its own lease
@@ -0,0 +1,45 @@
+import ast
+import importlib
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parents[1] / "app" / "backend"
+
+# Modules on the sentiment / tagging path; the first few import the model code lazily
+LAZY_IMPORTERS = ["inference", "sentiment_engines", "rescoring", "tasks", "ml/image_tagging", "ml/preprocess"]
+
+
+def _backend_imports(module: str):
+    """Absolute names of every app.backend module `module` imports, at any depth in the file."""
+    tree = ast.parse((BACKEND / f"{module}.py").read_text())
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.ImportFrom):
+            continue
+        if node.level:
+            name = importlib.util.resolve_name("." * node.level + (node.module or ""), "app.backend")
+        else:
+            name = node.module or ""
+        if name.startswith("app.backend"):
+            yield name
+
+
+@pytest.mark.parametrize("module", LAZY_IMPORTERS)
+def test_lazy_imports_resolve(module):
+    for name in _backend_imports(module):
+        assert importlib.util.find_spec(name) is not None, f"{module} imports missing module {name}"
+
+
+def test_model_modules_live_in_a_package():
+    for name in ["sentiment", "image_tagging", "price_forecast"]:
+        spec = importlib.util.find_spec(f"app.backend.ml.{name}")
+        assert spec is not None and Path(spec.origin).parent.name == "ml"
+
+
+def test_sentiment_route_chain():
+    importlib.import_module("app.backend.sentiment_engines")
+    importlib.import_module("app.backend.inference")
+    pytest.importorskip("fastapi")
+    pytest.importorskip("sqlmodel")
+    importlib.import_module("app.backend.routes.psychology")
@@ -0,0 +1,51 @@
+import pytest
+
+pytest.importorskip("sqlmodel")
+pytest.importorskip("httpx")
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.backend import inference
+from app.backend.routes import psychology
+
+
+def _fake_model(texts):
+    return [{"label": "NEGATIVE", "score": 0.97} if "late" in t else {"label": "POSITIVE", "score": 0.99}
+            for t in texts]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(inference, "analyze_sentiment_batch", _fake_model)  # no model download
+    app = FastAPI()
+    app.include_router(psychology.router)
+    return TestClient(app)
+
+
+def _sentiment(client, text, engine):
+    resp = client.post("/psychology/sentiment", params={"engine": engine}, json={"text": text})
+    assert resp.status_code == 200
+    return resp.json()["sentiment"]
+
+
+def test_transformer_engine(client):
+    assert _sentiment(client, "The rice arrived, thank you", "transformer") == "positive"
+    assert _sentiment(client, "The truck was late again", "transformer") == "negative"
+
+
+def test_lexicon_engine(client):
+    assert _sentiment(client, "So grateful and happy today", "lexicon") == "positive"
+    assert _sentiment(client, "I feel hopeless and tired", "lexicon") == "negative"
+    assert _sentiment(client, "The truck arrived at noon.", "lexicon") == "neutral"
+    assert _sentiment(client, "   ", "lexicon") == "neutral"
+
+
+def test_cascade_engine(client):
+    # confident lexicon answers stay; "arrived at noon" has no lexicon words and goes to the model
+    assert _sentiment(client, "So grateful and happy today", "cascade") == "positive"
+    assert _sentiment(client, "The truck arrived at noon, late", "cascade") == "negative"
+
+
+def test_unknown_engine(client):
+    resp = client.post("/psychology/sentiment", params={"engine": "nope"}, json={"text": "hi"})
+    assert resp.status_code == 400
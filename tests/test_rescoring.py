@@ -0,0 +1,55 @@
+import pytest
+
+from app.backend import rescoring, sentiment_engines
+from app.backend.sentiment_engines import SentimentEngine
+
+
+class StubEngine(SentimentEngine):
+    name = "transformer"
+    calls = []
+
+    def analyze_batch(self, texts):
+        self.calls.append(list(texts))
+        return [{"label": "POSITIVE" if "thanks" in t else "NEGATIVE", "score": 0.9, "engine": self.name}
+                for t in texts]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    StubEngine.calls = []
+    monkeypatch.setitem(sentiment_engines._FACTORIES, "transformer", StubEngine)
+    monkeypatch.delitem(sentiment_engines._instances, "transformer", raising=False)
+    monkeypatch.setattr(rescoring, "_pool", lambda workers: rescoring.ThreadPoolExecutor(workers))
+    monkeypatch.setattr(rescoring, "SENTIMENT_RESCORE_STATE", str(tmp_path / "rescore_state.json"))
+    source = rescoring.WorkflowSource(tmp_path / "workflow.db")
+    source.store.init_schema()
+    monkeypatch.setitem(rescoring.SOURCES, "workflow", lambda: source)
+    return source.store
+
+
+def _moods(store):
+    rows = store._conn().execute("SELECT id, mood, mood_model FROM donations ORDER BY id").fetchall()
+    return {i: (mood, model) for i, mood, model in rows}
+
+
+def test_chunks_resume_and_skip_labelled(store):
+    ids = store.insert_many([{"donor_name": "d", "note": "thanks a lot" if i % 2 else "late again"}
+                             for i in range(10)])
+    store.insert({"donor_name": "d", "note": "  "})  # nothing to score
+
+    first = rescoring.rescore("workflow", chunk_size=3, batch_size=2, workers=2, limit=4, model="m@1")
+    assert (first["scored"], first["last_id"]) == (4, ids[3])
+    assert [len(batch) for batch in StubEngine.calls] == [2, 1, 1]  # chunks of 3 then 1, batches of 2
+
+    StubEngine.calls.clear()
+    second = rescoring.rescore("workflow", chunk_size=3, batch_size=2, workers=2, model="m@1")
+    assert (second["resumed_from"], second["scored"]) == (ids[3], 6)
+    assert sum(len(b) for b in StubEngine.calls) == 6
+
+    moods = _moods(store)
+    assert all(moods[i] == ("POSITIVE" if n % 2 else "NEGATIVE", "m@1") for n, i in enumerate(ids))
+
+    # a restart with the same model finds nothing stale; a new model re-labels everything
+    StubEngine.calls.clear()
+    assert rescoring.rescore("workflow", restart=True, model="m@1")["scored"] == 0
+    assert rescoring.rescore("workflow", model="m@2")["scored"] == 10
@@ -0,0 +1,14 @@
+import threading
+
+from app.backend.workflow.store import DonationStore
+
+
+def test_init_schema_on_new_store(tmp_path):
+    store = DonationStore(tmp_path / "donations.db")
+    worker = threading.Thread(target=store.init_schema, daemon=True)
+    worker.start()
+    worker.join(timeout=10)
+    assert not worker.is_alive(), "init_schema deadlocked on a fresh store"
+
+    donation_id = store.insert({"donor_name": "Ayesha", "note": "two bags of rice"})
+    assert [d["id"] for d in store.list_by_status("Open")] == [donation_id]